@@ -0,0 +1,63 @@
+"""Refreshes a fleet with the asyncio client and with the threaded one, against the local stand-in server.
+
+The server applies the real limits per token and adds a fixed latency per request. The last run drives a sync
+Agent and an AsyncAgent on the same token at once; they spend one budget, so neither collects 429s.
+
+    python -m benchmarks.aio [ships] [latency]
+"""
+import asyncio
+import sys
+import threading
+import time
+from spacetraders import Agent
+from spacetraders.aio import AsyncAgent
+from spacetraders.utils import RateLimitedPoolManager
+from .server import GameState, MockServer
+from .workflows import REAL_LIMITS
+
+
+def fresh_limiter():
+    RateLimitedPoolManager.LIMITERS.pop("benchmark-token", None)
+
+
+async def refresh_async(base_url: str, ships: int) -> float:
+    async with AsyncAgent("benchmark-token", base_url, max_connections=ships) as agent:
+        fleet = await agent.fleet
+        await asyncio.sleep(1.1)  # the fleet listing only used the per second window; let it refill
+        start = time.perf_counter()
+        await agent.map_ships(lambda ship: ship.refresh(), fleet)
+        return time.perf_counter() - start
+
+
+def refresh_sync(base_url: str, ships: int) -> float:
+    agent = Agent("benchmark-token", base_url, max_connections=ships)
+    fleet = agent.fleet
+    time.sleep(1.1)
+    start = time.perf_counter()
+    agent.map_ships(lambda ship: ship.refresh(), fleet)
+    return time.perf_counter() - start
+
+
+def main():
+    ships = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.15
+    print(f"{ships} ships, {latency * 1000:.0f} ms latency")
+    for label, run in (("Agent.map_ships", lambda url: refresh_sync(url, ships)),
+                       ("AsyncAgent.map_ships", lambda url: asyncio.run(refresh_async(url, ships)))):
+        fresh_limiter()
+        with MockServer(GameState(ships=ships), rate_limits=REAL_LIMITS, latency=latency) as server:
+            seconds = run(server.base_url)
+            print(f"{label:<28}{seconds:8.2f} s{ships / seconds:8.1f} ships/s{server.throttled:6} 429s")
+    fresh_limiter()
+    with MockServer(GameState(ships=ships), rate_limits=REAL_LIMITS, latency=latency) as server:
+        start = time.perf_counter()
+        sync = threading.Thread(target=refresh_sync, args=(server.base_url, ships))
+        sync.start()
+        asyncio.run(refresh_async(server.base_url, ships))
+        sync.join()
+        seconds = time.perf_counter() - start
+        print(f"{'both on one token':<28}{seconds:8.2f} s{2 * ships / seconds:8.1f} ships/s{server.throttled:6} 429s")
+
+
+if __name__ == "__main__":
+    main()
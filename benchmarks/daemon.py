@@ -0,0 +1,73 @@
+"""Short scripts run as separate processes against the local stand-in server, directly and through the daemon.
+
+Each script lists the fleet, finds the markets in its system and reads the agent's credits, starting cold as
+a new process does. The server applies the real limits per token. Run directly, every process has its own
+limiter, so scripts started together overrun the budget and collect 429s; through the daemon they share one
+limiter, and systems and waypoints come from the daemon's memory after the first script.
+
+    python -m benchmarks.daemon [scripts] [rounds]
+"""
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from spacetraders import Agent, WaypointTrait
+from spacetraders.daemon import Daemon
+from spacetraders.utils import RateLimitException
+from .server import MockServer
+from .workflows import REAL_LIMITS
+
+
+def script(base_url: str, socket: str | None, results):
+    start = time.perf_counter()
+    agent = Agent.connect("BENCH", socket) if socket else Agent("benchmark-token", base_url)
+    try:
+        ship = agent.fleet[0]
+        list(ship.nav.find_traits((WaypointTrait.MARKETPLACE,)))
+        agent.credits
+    except RateLimitException:
+        results.put(None)
+    else:
+        results.put(time.perf_counter() - start)
+
+
+def run(server: MockServer, socket: str | None, scripts: int, rounds: int) -> tuple[float, float, int, int, int]:
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    requests, throttled = server.total, server.throttled
+    times = []
+    for _ in range(rounds):
+        processes = [context.Process(target=script, args=(server.base_url, socket, results)) for _ in range(scripts)]
+        for process in processes:
+            process.start()
+        times += [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+    finished = [t for t in times if t is not None]
+    return (statistics.median(finished) if finished else float("nan"), max(finished, default=float("nan")), len(times) - len(finished),
+            server.total - requests - (server.throttled - throttled), server.throttled - throttled)
+
+
+def main():
+    scripts = int(sys.argv[1]) if len(sys.argv) > 1 else 6
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+    print(f"{scripts} scripts at a time, {rounds} rounds")
+    print(f"{'':<10}{'p50 s':>8}{'max s':>8}{'failed':>8}{'requests':>10}{'429s':>6}")
+    with MockServer(rate_limits=REAL_LIMITS) as server:
+        row = run(server, None, scripts, rounds)
+        print(f"{'direct':<10}{row[0]:>8.3f}{row[1]:>8.3f}{row[2]:>8}{row[3]:>10}{row[4]:>6}")
+    with MockServer(rate_limits=REAL_LIMITS) as server:
+        path = os.path.join(tempfile.mkdtemp(), "daemon.sock")
+        daemon = Daemon(Agent("benchmark-token", server.base_url), path)
+        threading.Thread(target=daemon.serve_forever, daemon=True).start()
+        row = run(server, path, scripts, rounds)
+        daemon.shutdown()
+        daemon.server_close()
+        print(f"{'daemon':<10}{row[0]:>8.3f}{row[1]:>8.3f}{row[2]:>8}{row[3]:>10}{row[4]:>6}")
+
+
+if __name__ == "__main__":
+    main()
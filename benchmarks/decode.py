@@ -0,0 +1,88 @@
+"""Decode throughput of each installed JSON codec on API sized payloads.
+
+    python -m benchmarks.decode [body.json ...]
+
+Without arguments it uses synthetic waypoint, market, fleet and error bodies; pass saved response bodies to
+measure those instead.
+"""
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from spacetraders import codec
+from spacetraders.enums import Goods
+from spacetraders.utils import ClientError, handle_error
+from .models import ship_json, waypoint_json
+
+
+class Response:
+    retries = None
+
+    def __init__(self, status: int, data: bytes):
+        self.status = status
+        self.data = data
+
+
+def payloads() -> dict[str, bytes]:
+    rng = random.Random(0)
+    market = {
+        "symbol": "X1-B000-00001X",
+        "exports": [], "imports": [], "exchange": [],
+        "tradeGoods": [
+            {"symbol": str(good).upper(), "type": "EXCHANGE", "tradeVolume": 60, "supply": "MODERATE",
+             "purchasePrice": rng.randint(10, 5000), "sellPrice": rng.randint(10, 5000)}
+            for good in rng.sample(list(Goods), 30)
+        ],
+    }
+    return {
+        "waypoint page": json.dumps({"data": [waypoint_json(i, rng) for i in range(20)], "meta": {"total": 80, "page": 1, "limit": 20}}).encode(),
+        "market": json.dumps({"data": market}).encode(),
+        "fleet page": json.dumps({"data": [ship_json(i, rng) for i in range(20)], "meta": {"total": 20, "page": 1, "limit": 20}}).encode(),
+        "4xx error": json.dumps({"error": {"code": 4214, "message": "Ship is in transit", "data": {"secondsToArrival": 12}}}).encode(),
+    }
+
+
+def legacy(status: int, body: bytes):
+    """The old handle_error + r.json() path: one parse per access, three on an unrecognised 4xx."""
+    if status == 200:
+        return json.loads(body)['data']
+    json.loads(body)['error']['code']
+    raise ClientError(json.loads(body)['error'])
+
+
+def single(status: int, body: bytes):
+    response = handle_error(Response(status, body))
+    return codec.decode(response)['data']
+
+
+def rate(fn, status: int, body: bytes, seconds: float = 0.3) -> float:
+    n, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for _ in range(50):
+            try:
+                fn(status, body)
+            except ClientError:
+                pass
+        n += 50
+    return n / (time.perf_counter() - start)
+
+
+def main():
+    bodies = {Path(p).name: Path(p).read_bytes() for p in sys.argv[1:]} or payloads()
+    names = codec.available()
+    print(f"{'payload':<16}{'bytes':>9}  {'legacy json':>12}" + "".join(f"{name:>12}" for name in names) + "   (responses/s)")
+    try:
+        for label, body in bodies.items():
+            status = 400 if b'"error"' in body[:16] else 200
+            row = f"{label:<16}{len(body):>9,}  {rate(legacy, status, body):>12,.0f}"
+            for name in names:
+                codec.set_codec(name)
+                row += f"{rate(single, status, body):>12,.0f}"
+            print(row)
+    finally:
+        codec.set_codec(None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Refreshes every ship of a fleet one after another and with Agent.map_ships, against the local stand-in server.
+
+Both the server and the client apply the real limits, and the server adds a fixed latency per request. Sequential
+requests are paced by the round trip; concurrent ones only by the limiter, so a fleet that fits in the burst
+window refreshes in about one round trip.
+
+    python -m benchmarks.gather [ships] [latency]
+"""
+import sys
+import time
+from spacetraders import Agent
+from spacetraders.ratelimit import RateBudget, RateLimiter
+from .server import GameState, MockServer
+from .workflows import REAL_LIMITS
+
+
+def timed(ships: int, latency: float, connections: int, concurrent: bool) -> tuple[float, int]:
+    with MockServer(GameState(ships=ships), rate_limits=REAL_LIMITS, latency=latency) as server:
+        agent = Agent("benchmark-token", server.base_url, RateLimiter(RateBudget(REAL_LIMITS)), max_connections=connections)
+        fleet = agent.fleet
+        time.sleep(1.1)  # the fleet listing only used the per second window; let it refill
+        start = time.perf_counter()
+        if concurrent:
+            agent.map_ships(lambda ship: ship.refresh(), fleet)
+        else:
+            for ship in fleet:
+                ship.refresh()
+        return time.perf_counter() - start, server.throttled
+
+
+def main():
+    ships = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.15
+    print(f"{ships} ships, {latency * 1000:.0f} ms latency")
+    for label, connections, concurrent in (("sequential", 1, False), ("map_ships, 1 connection", 1, True),
+                                           ("map_ships, 10 connections", 10, True)):
+        seconds, throttled = timed(ships, latency, connections, concurrent)
+        print(f"{label:<28}{seconds:8.2f} s{ships / seconds:8.1f} ships/s{throttled:6} 429s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Requests and credits for emptying a full hold, against the local stand-in server.
+
+A hauler docked at a market holds several hundred units of four ores, more than one trade volume of each, which
+the previous sell_all could not sell at all. Each sale moves the stand-in's price against the seller by 5% per
+trade volume. "fetched" starts without quotes, so sell_all reads the market first; "planned" has the quotes in the
+market book already; "spread" also considers the three nearest other markets.
+
+    python -m benchmarks.liquidate [units per good]
+"""
+import sys
+from spacetraders import Agent, WaypointTrait
+from spacetraders.market import Market
+from spacetraders.marketbook import MarketBook
+from spacetraders.ratelimit import RateBudget, RateLimiter
+from .server import ORES, GameState, MockServer
+from .workflows import UNLIMITED
+
+
+def run(units: int, mode: str) -> tuple[int, int, int, int]:
+    state = GameState(ships=2)
+    cargo = state.ships["BENCH-2"]["cargo"]
+    cargo["capacity"] = 4 * units
+    for ore in ORES[:4]:
+        state.add_cargo(state.ships["BENCH-2"], ore, units)
+    Market.BOOK = MarketBook()
+    with MockServer(state) as server:
+        if mode != "fetched":
+            for symbol, market in state.markets.items():
+                Market.BOOK.record(symbol, market["tradeGoods"])
+        agent = Agent("benchmark-token", server.base_url, RateLimiter(RateBudget(UNLIMITED)))
+        hauler = agent.fleet[1]
+        here = hauler.nav.waypoint
+        markets = sorted((wp for wp in hauler.nav.find_traits((WaypointTrait.MARKETPLACE,)) if wp.id != here.id),
+                         key=lambda wp: (wp.model.x - here.model.x) ** 2 + (wp.model.y - here.model.y) ** 2)
+        credits, requests = state.agent["credits"], server.total
+        hauler.sell_all(markets=markets[:3] if mode == "spread" else ())
+        return server.total - requests, server.requests["sell"], state.agent["credits"] - credits, 1 + server.requests["navigate"]
+
+
+def main():
+    units = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    print(f"{'':<10}{'requests':>10}{'sells':>8}{'credits':>12}{'markets':>9}")
+    for mode in ("fetched", "planned", "spread"):
+        requests, sells, credits, stops = run(units, mode)
+        print(f"{mode:<10}{requests:>10}{sells:>8}{credits:>12}{stops:>9}")
+
+
+if __name__ == "__main__":
+    main()
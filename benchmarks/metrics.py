@@ -0,0 +1,38 @@
+"""Per request cost of the metrics hook, disabled and enabled, against the local stand-in server.
+
+    python -m benchmarks.metrics [requests]
+"""
+import sys
+import time
+from spacetraders import Agent
+from spacetraders.ratelimit import RateBudget, RateLimiter
+from .server import MockServer
+from .workflows import UNLIMITED
+
+
+def timed(agent: Agent, n: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        agent.refresh()
+    return (time.perf_counter() - start) / n
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    with MockServer() as server:
+        agent = Agent("benchmark-token", server.base_url, RateLimiter(RateBudget(UNLIMITED)))
+        timed(agent, 100)
+        rows = [("disabled", timed(agent, n))]
+        agent.enable_metrics()
+        rows.append(("enabled", timed(agent, n)))
+        agent.enable_metrics(trace=True)
+        rows.append(("enabled + trace", timed(agent, n)))
+        # repeat the baseline last so drift in the server does not favour either side
+        agent.pm.metrics = None
+        rows.append(("disabled", timed(agent, n)))
+    for label, seconds in rows:
+        print(f"{label:<16}{seconds * 1e6:9.1f} us/request")
+
+
+if __name__ == "__main__":
+    main()
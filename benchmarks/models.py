@@ -0,0 +1,104 @@
+"""Memory held by 10k waypoints and 500 ships as raw response dicts versus parsed models, and accessor throughput.
+
+    python -m benchmarks.models [waypoints] [ships]
+"""
+import gc
+import json
+import random
+import sys
+import time
+import tracemalloc
+from spacetraders.enums import Goods, ShipStatus, WaypointTrait, WaypointType
+from spacetraders.models import ShipInfo, WaypointInfo
+from spacetraders.ship import Ship
+from spacetraders.waypoint import Waypoint
+
+
+def waypoint_json(i: int, rng: random.Random) -> dict:
+    system = f"X1-B{i // 40:03d}"
+    return {
+        "symbol": f"{system}-{i:05d}X",
+        "systemSymbol": system,
+        "type": str(rng.choice(list(WaypointType))).upper(),
+        "x": rng.randint(-80, 80),
+        "y": rng.randint(-80, 80),
+        "orbitals": [],
+        "traits": [
+            {"symbol": str(trait).upper(), "name": str(trait).title(), "description": "A long description of the trait " * 3}
+            for trait in rng.sample(list(WaypointTrait), 4)
+        ],
+    }
+
+
+def ship_json(i: int, rng: random.Random) -> dict:
+    goods = rng.sample(list(Goods), 4)
+    return {
+        "symbol": f"AGENT-{i:X}",
+        "registration": {"name": f"AGENT-{i:X}", "factionSymbol": "COSMIC", "role": "EXCAVATOR"},
+        "nav": {
+            "systemSymbol": "X1-B000",
+            "waypointSymbol": f"X1-B000-{rng.randint(0, 39):05d}X",
+            "route": {"arrival": "2026-01-01T00:00:00+00:00"},
+            "status": "IN_ORBIT",
+            "flightMode": "CRUISE",
+        },
+        "engine": {"symbol": "ENGINE_IMPULSE_DRIVE_I", "speed": 30},
+        "fuel": {"current": rng.randint(0, 400), "capacity": 400},
+        "cargo": {
+            "capacity": 60,
+            "units": 40,
+            "inventory": [{"symbol": str(good).upper(), "name": str(good), "description": "", "units": 10} for good in goods],
+        },
+    }
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    held = build()
+    elapsed = time.perf_counter() - start
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return held, size, elapsed
+
+
+def rate(fn, n: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return n / (time.perf_counter() - start)
+
+
+def main():
+    n_waypoints = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    n_ships = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    rng = random.Random(0)
+    waypoint_text = json.dumps([waypoint_json(i, rng) for i in range(n_waypoints)])
+    ship_text = json.dumps([ship_json(i, rng) for i in range(n_ships)])
+
+    _, raw, _ = measure(lambda: (json.loads(waypoint_text), json.loads(ship_text)))
+    waypoints, ships = json.loads(waypoint_text), json.loads(ship_text)
+    held, models, parse = measure(lambda: (
+        [WaypointInfo.from_json(d) for d in waypoints],
+        [ShipInfo.from_json(d) for d in ships],
+    ))
+    print(f"{n_waypoints} waypoints + {n_ships} ships")
+    print(f"  response dicts   {raw / 1e6:7.1f} MB")
+    print(f"  parsed models    {models / 1e6:7.1f} MB  ({parse * 1000:.0f} ms to parse)")
+
+    wp = Waypoint(None, waypoints[0]["symbol"], waypoints[0])
+    ship = Ship(None, ships[0]["symbol"], ships[0])
+    with ship.snapshot(), wp.snapshot():
+        print("  accessor calls per second, parsing the cached dict each call vs the parsed model")
+        print(f"    traits     dict {rate(lambda: tuple(WaypointTrait(t['symbol'].lower()) for t in wp.get_data()['traits']), 100_000):>11,.0f}"
+              f"   model {rate(lambda: wp.traits, 100_000):>11,.0f}")
+        print(f"    inventory  dict {rate(lambda: {Goods(i['symbol'].lower()): i['units'] for i in ship.get_data()['cargo']['inventory']}, 100_000):>11,.0f}"
+              f"   model {rate(lambda: ship.inventory, 100_000):>11,.0f}")
+        print(f"    status     dict {rate(lambda: ShipStatus(ship.nav.get_data()['status'].lower()), 100_000):>11,.0f}"
+              f"   model {rate(lambda: ship.nav.status, 100_000):>11,.0f}")
+    del held
+
+
+if __name__ == "__main__":
+    main()
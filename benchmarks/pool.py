@@ -0,0 +1,57 @@
+"""Aggregate throughput of an AgentPool as agents are added, against the local stand-in server.
+
+The server and every client limiter apply the SpaceTraders windows scaled up by SCALE, per token. Each agent
+refreshes its own data in a loop for the given duration. With a limiter per token the pool's request rate grows
+with the number of agents; the shared column forces every agent through one limiter, as all clients did before.
+
+    python -m benchmarks.pool [max_agents] [seconds]
+"""
+import sys
+import time
+from spacetraders import Agent, AgentPool
+from spacetraders.ratelimit import RateBudget, RateLimiter
+from .server import MockServer
+
+# small enough that eight tokens stay well below what the stand-in server can answer
+SCALE = 5
+WINDOWS = ((2 * SCALE, 1 / SCALE), (10 * SCALE, 10 / SCALE))
+MARGIN = 0.1 / SCALE
+
+
+def throughput(agents: int, duration: float, shared: bool) -> tuple[float, int]:
+    with MockServer(rate_limits=WINDOWS) as server:
+        limiter = RateLimiter(RateBudget(WINDOWS, MARGIN))
+        pool = AgentPool()
+        for i in range(agents):
+            pool.add(Agent(f"token-{i}", server.base_url, limiter if shared else RateLimiter(RateBudget(WINDOWS, MARGIN))))
+
+        def work(agent: Agent):
+            while time.monotonic() < deadline:
+                agent.refresh()
+
+        deadline = time.monotonic() + duration
+        pool.map(work)
+        pool.close()
+        return (server.total - server.throttled) / duration, server.throttled
+
+
+def main():
+    max_agents = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    duration = float(sys.argv[2]) if len(sys.argv) > 2 else 3.0
+    now = 0.0
+    budget = RateBudget(WINDOWS, MARGIN, clock=lambda: now)
+    while now < duration:
+        now += budget.try_acquire(now)
+    best = budget.granted / duration
+    print(f"one token allows {best:.1f} req/s over {duration:.1f}s")
+    print(f"{'agents':>6}{'per token':>12}{'ideal':>10}{'scaling':>10}{'shared':>10}{'429s':>6}")
+    agents = 1
+    while agents <= max_agents:
+        rate, throttled = throughput(agents, duration, shared=False)
+        shared, shared_throttled = throughput(agents, duration, shared=True)
+        print(f"{agents:>6}{rate:>12.1f}{best * agents:>10.1f}{rate / (best * agents):>10.2f}{shared:>10.1f}{throttled + shared_throttled:>6}")
+        agents *= 2
+
+
+if __name__ == "__main__":
+    main()
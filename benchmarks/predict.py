@@ -0,0 +1,57 @@
+"""Requests spent by a polling loop while a ship flies between two markets, against the local stand-in server.
+
+The loop reads status, fuel and cargo every interval until the ship has arrived, as scripts waiting on a flight
+do. "predicted" is the library as shipped, where ship state is advanced locally by the game's rules; "polled"
+restores the previous 2 s cache lifetime without prediction, so every expiry costs a request and arrivals are
+only noticed at the next expiry.
+
+    python -m benchmarks.predict [trips] [interval]
+"""
+import sys
+import time
+from spacetraders import Agent, ShipStatus, WaypointTrait
+from spacetraders.ratelimit import RateBudget, RateLimiter
+from spacetraders.ship import Nav, Ship
+from spacetraders.utils import GameObject
+from .server import GameState, MockServer
+from .workflows import UNLIMITED, nearest
+
+
+def trips(n: int, interval: float) -> tuple[int, int, float]:
+    with MockServer(GameState(ships=2, time_scale=0.05)) as server:
+        agent = Agent("benchmark-token", server.base_url, RateLimiter(RateBudget(UNLIMITED)))
+        ship = agent.fleet[0]
+        markets = list(ship.nav.find_traits((WaypointTrait.MARKETPLACE,)))
+        stops = [nearest(ship.nav.waypoint, markets), ship.nav.waypoint]
+        ship.orbit()
+        polls, requests, flying = 0, 0, 0.0
+        for i in range(n):
+            ship.navigate(stops[i % 2])
+            before, start = server.total, time.monotonic()
+            while ship.nav.status == ShipStatus.IN_TRANSIT:
+                ship.fuel, ship.full
+                polls += 1
+                time.sleep(interval)
+            requests += server.total - before
+            flying += time.monotonic() - start
+        return polls, requests, flying
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    interval = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+    print(f"{'':<12}{'polls':>8}{'requests':>10}{'flight s':>10}")
+    polls, requests, flying = trips(n, interval)
+    print(f"{'predicted':<12}{polls:>8}{requests:>10}{flying:>10.1f}")
+    shipped = Nav.TTL, Ship.TTL, Nav.predict, Ship.predict
+    Nav.TTL = Ship.TTL = 2.0
+    Nav.predict = Ship.predict = GameObject.predict
+    try:
+        polls, requests, flying = trips(n, interval)
+    finally:
+        Nav.TTL, Ship.TTL, Nav.predict, Ship.predict = shipped
+    print(f"{'polled':<12}{polls:>8}{requests:>10}{flying:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
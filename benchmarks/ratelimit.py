@@ -0,0 +1,66 @@
+"""Microbenchmark for RateLimiter under thread contention.
+
+Scales the SpaceTraders windows down by SCALE so a run takes a few seconds, then compares
+the rate achieved by contending threads with the best rate a single greedy caller could
+reach against the same budget on a simulated clock. The per-thread spread includes the
+initial burst, which goes to whichever thread leaves the start barrier first.
+
+    python -m benchmarks.ratelimit [threads] [seconds]
+"""
+import sys
+import time
+from threading import Barrier, Thread
+from spacetraders.ratelimit import RateBudget, RateLimiter
+
+SCALE = 20
+WINDOWS = ((2 * SCALE, 1 / SCALE), (10 * SCALE, 10 / SCALE))
+MARGIN = 0.1 / SCALE
+
+
+def allowed(duration: float) -> int:
+    now = 0.0
+    budget = RateBudget(WINDOWS, MARGIN, clock=lambda: now)
+    while True:
+        delay = budget.try_acquire(now)
+        if delay > 0:
+            now += delay
+        if now >= duration:
+            return budget.granted
+
+
+def contended(threads: int, duration: float) -> tuple[int, list[int]]:
+    limiter = RateLimiter(RateBudget(WINDOWS, MARGIN))
+    counts = [0] * threads
+    barrier = Barrier(threads + 1)
+
+    def worker(i: int):
+        barrier.wait()
+        while True:
+            limiter.acquire()
+            if time.monotonic() >= deadline:
+                return
+            counts[i] += 1
+
+    workers = [Thread(target=worker, args=(i,)) for i in range(threads)]
+    for w in workers:
+        w.start()
+    deadline = time.monotonic() + duration
+    barrier.wait()
+    for w in workers:
+        w.join()
+    return sum(counts), counts
+
+
+def main():
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    duration = float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+    best = allowed(duration)
+    total, counts = contended(threads, duration)
+    print(f"threads:    {threads}")
+    print(f"allowed:    {best} requests in {duration:.1f}s ({best / duration:.1f}/s)")
+    print(f"achieved:   {total} requests ({total / duration:.1f}/s, {total / best:.1%} of allowed)")
+    print(f"per thread: min {min(counts)}, max {max(counts)}")
+
+
+if __name__ == "__main__":
+    main()
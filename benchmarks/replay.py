@@ -0,0 +1,63 @@
+"""Records a trading session against the local stand-in server, then replays it offline.
+
+The session lists the fleet, finds markets, and hauls ore between two of them. The replay runs the same code
+with no server, from the recording alone, first as fast as it can and then with the recorded latencies; its
+final credits and cargo must match the live run's.
+
+    python -m benchmarks.replay [trips] [path]
+"""
+import os
+import sys
+import tempfile
+import time
+from spacetraders import Agent, Goods, WaypointTrait
+from spacetraders.market import Market
+from spacetraders.marketbook import MarketBook
+from spacetraders.ratelimit import RateBudget, RateLimiter
+from spacetraders.ship import Nav
+from spacetraders.transport import Recorder, Replayer, Transport
+from spacetraders.utils import StaticGameObject
+from .server import MockServer
+from .workflows import UNLIMITED, go, nearest
+
+
+def session(agent: Agent, trips: int) -> tuple[int, dict]:
+    Nav.CACHED_SYSTEMS.clear()
+    StaticGameObject.STORE = None
+    Market.BOOK = MarketBook()
+    hauler = agent.fleet[1]
+    markets = list(hauler.nav.find_traits((WaypointTrait.MARKETPLACE,)))
+    stops = [markets[0], nearest(markets[0], markets)]
+    for i in range(trips):
+        go(hauler, stops[i % 2])
+        hauler.dock()
+        hauler.refuel()
+        hauler.sell_all()
+        hauler.buy(Goods.IRON_ORE, 20)
+    return agent.credits, hauler.inventory
+
+
+def timed(base_url: str, transport: Transport, trips: int, limiter: RateLimiter | None = None):
+    start = time.perf_counter()
+    result = session(Agent("benchmark-token", base_url, limiter, transport=transport), trips)
+    return time.perf_counter() - start, result
+
+
+def main():
+    trips = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    path = sys.argv[2] if len(sys.argv) > 2 else os.path.join(tempfile.mkdtemp(), "session.jsonl.gz")
+    with MockServer(latency=0.002) as server, Recorder(path) as recorder:
+        live, expected = timed(server.base_url, recorder, trips, RateLimiter(RateBudget(UNLIMITED)))
+        base_url = server.base_url
+    print(f"recorded {recorder.recorded} exchanges in {os.path.getsize(path)} bytes ({path})")
+    print(f"{'':<24}{'seconds':>9}{'req/s':>10}  matches")
+    print(f"{'live':<24}{live:>9.3f}{recorder.recorded / live:>10.0f}  -")
+    for label, latency in (("replay", 0.0), ("replay, recorded latency", True)):
+        replayer = Replayer(path, latency=latency)
+        seconds, result = timed(base_url, replayer, trips)
+        served = replayer.stats["served"] + replayer.stats["repeated"]
+        print(f"{label:<24}{seconds:>9.3f}{served / seconds:>10.0f}  {result == expected}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Times RoutePlanner matrix construction, first plans and cached plans on synthetic systems.
+
+    python -m benchmarks.route [waypoints ...]
+"""
+import random
+import sys
+import time
+from spacetraders.route import RoutePlanner
+
+
+def synthetic(n: int, seed: int = 0) -> list[dict]:
+    rng = random.Random(seed)
+    return [
+        {
+            "symbol": f"X1-BENCH-{i:05d}",
+            "x": rng.randint(-800, 800),
+            "y": rng.randint(-800, 800),
+            "traits": [{"symbol": "MARKETPLACE"}] if rng.random() < 0.2 else [],
+        }
+        for i in range(n)
+    ]
+
+
+def main():
+    sizes = [int(n) for n in sys.argv[1:]] or [50, 200, 500, 1000]
+    rng = random.Random(1)
+    for n in sizes:
+        waypoints = synthetic(n)
+        start = time.perf_counter()
+        planner = RoutePlanner.from_waypoints(waypoints, speed=30)
+        build = time.perf_counter() - start
+        pairs = [(rng.choice(waypoints)["symbol"], rng.choice(waypoints)["symbol"]) for _ in range(20)]
+        start = time.perf_counter()
+        plans = [planner.plan(a, b, fuel=200, capacity=400) for a, b in pairs]
+        cold = (time.perf_counter() - start) / len(pairs)
+        start = time.perf_counter()
+        for a, b in pairs * 50:
+            planner.plan(a, b, fuel=200, capacity=400)
+        warm = (time.perf_counter() - start) / (len(pairs) * 50)
+        hops = sum(len(plan.hops) for plan in plans) / len(plans)
+        print(f"{n:>5} waypoints: matrices {build * 1000:7.1f} ms, plan {cold * 1000:6.2f} ms, cached {warm * 1e6:5.2f} us, {hops:.1f} hops avg")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,650 @@
+"""Local stand-in for the SpaceTraders v2 API, for benchmarks and experiments.
+
+Implements the endpoints the library uses: status, agent, ships, nav, surveys, extract, market trading, contracts,
+factions, systems and waypoints. Payloads follow the shape of the real API, lists are paginated, and with
+rate limits enabled the server answers 429 with the same headers as the real one. Game time can be scaled
+down so flights and cooldowns take a fraction of a second.
+
+    python -m benchmarks.server [port]
+"""
+import json
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from math import hypot
+from urllib.parse import parse_qs, urlsplit
+from spacetraders.enums import FactionSymbol, Goods, SystemType, WaypointTrait, WaypointType
+from spacetraders.ratelimit import RateBudget
+
+ORES = ("IRON_ORE", "COPPER_ORE", "ALUMINUM_ORE", "QUARTZ_SAND", "SILICON_CRYSTALS", "ICE_WATER")
+GOODS = [str(good).upper() for good in Goods]
+TYPES = [str(t).upper() for t in WaypointType if t not in (WaypointType.ASTEROID_FIELD, WaypointType.JUMP_GATE)]
+TRAITS = [str(t).upper() for t in WaypointTrait if t not in (WaypointTrait.MARKETPLACE, WaypointTrait.SHIPYARD, WaypointTrait.UNCHARTED)]
+EXTRACT_COOLDOWN = 70
+SURVEY_COOLDOWN = 60
+# fraction a price moves against the trader for every trade volume traded
+MARKET_IMPACT = 0.05
+SURVEY_LIFETIME = 900
+# extractions a survey supports before it is exhausted
+SURVEY_SIZES = {"SMALL": 3, "MODERATE": 6, "LARGE": 10}
+
+
+class GameError(Exception):
+    def __init__(self, status: int, code: int, message: str, data: dict | None = None):
+        super().__init__(message)
+        self.status = status
+        self.body = {"error": {"message": message, "code": code, **({"data": data} if data is not None else {})}}
+
+
+def timestamp(when: datetime) -> str:
+    return when.isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+class GameState:
+    """Deterministic universe, agent, fleet and contracts, mutated by the request handlers."""
+
+    def __init__(self, systems: int = 4, waypoints: int = 40, ships: int = 10, seed: int = 0, time_scale: float = 0.0):
+        rng = self.rng = random.Random(seed)
+        self.time_scale = time_scale
+        self.lock = threading.RLock()
+        self.reset_date = "2026-01-01"
+        self.systems: dict[str, dict] = {}
+        self.waypoints: dict[str, dict] = {}
+        self.markets: dict[str, dict] = {}
+        for s in range(systems):
+            symbol = f"X1-B{s:03d}"
+            members = []
+            for i in range(waypoints):
+                wp_type = "ASTEROID_FIELD" if i % 8 == 1 else rng.choice(TYPES)
+                traits = rng.sample(TRAITS, 2)
+                if i % 3 == 0:
+                    traits.append("MARKETPLACE")
+                if i % 10 == 0:
+                    traits.append("SHIPYARD")
+                if rng.random() < 0.1:
+                    traits.append("UNCHARTED")
+                wp = {
+                    "symbol": f"{symbol}-{chr(65 + i % 26)}{i}",
+                    "type": wp_type,
+                    "systemSymbol": symbol,
+                    "x": rng.randint(-100, 100),
+                    "y": rng.randint(-100, 100),
+                    "orbitals": [],
+                    "faction": {"symbol": "COSMIC"},
+                    "traits": [
+                        {"symbol": t, "name": t.replace("_", " ").title(), "description": f"This waypoint is notable for its {t.lower()}."}
+                        for t in traits
+                    ],
+                    "chart": {"submittedBy": "COSMIC", "submittedOn": "2026-01-01T00:00:00.000Z"},
+                }
+                self.waypoints[wp["symbol"]] = wp
+                members.append(wp)
+                if "MARKETPLACE" in traits:
+                    self.markets[wp["symbol"]] = self._market(wp["symbol"])
+            self.systems[symbol] = {
+                "symbol": symbol,
+                "sectorSymbol": "X1",
+                "type": str(rng.choice(list(SystemType))).upper(),
+                "x": rng.randint(-5000, 5000),
+                "y": rng.randint(-5000, 5000),
+                "waypoints": [{"symbol": wp["symbol"], "type": wp["type"], "x": wp["x"], "y": wp["y"]} for wp in members],
+                "factions": [],
+            }
+        home = next(iter(self.systems))
+        self.headquarters = next(wp for wp in self.waypoints.values() if wp["systemSymbol"] == home and "SHIPYARD" in self._traits(wp))["symbol"]
+        self.agent = {"accountId": "bench", "symbol": "BENCH", "headquarters": self.headquarters, "credits": 150_000, "startingFaction": "COSMIC", "shipCount": ships}
+        self.ships = {f"BENCH-{i + 1:X}": self._ship(f"BENCH-{i + 1:X}", i) for i in range(ships)}
+        self.cooldowns: dict[str, float] = {}
+        self.arrivals: dict[str, float] = {}
+        self.surveys: dict[str, dict] = {}
+        market_symbols = [symbol for symbol in self.markets if symbol.startswith(home)]
+        self.contracts = {
+            f"contract-{i}": {
+                "id": f"contract-{i}",
+                "factionSymbol": "COSMIC",
+                "type": "PROCUREMENT",
+                "terms": {
+                    "deadline": timestamp(datetime.now(timezone.utc) + timedelta(days=7)),
+                    "payment": {"onAccepted": 10_000, "onFulfilled": 40_000},
+                    "deliver": [{"tradeSymbol": ORES[i % len(ORES)], "destinationSymbol": rng.choice(market_symbols), "unitsRequired": 60, "unitsFulfilled": 0}],
+                },
+                "accepted": False,
+                "fulfilled": False,
+                "expiration": timestamp(datetime.now(timezone.utc) + timedelta(days=1)),
+                "deadlineToAccept": timestamp(datetime.now(timezone.utc) + timedelta(days=1)),
+            }
+            for i in range(3)
+        }
+
+    @staticmethod
+    def _traits(wp: dict) -> set[str]:
+        return {trait["symbol"] for trait in wp["traits"]}
+
+    def _market(self, symbol: str) -> dict:
+        rng = self.rng
+        goods = list(ORES) + rng.sample([g for g in GOODS if g not in ORES], 6)
+        trade_goods = []
+        for good in goods:
+            base = rng.randint(10, 3000)
+            trade_goods.append({
+                "symbol": good,
+                "type": rng.choice(("EXPORT", "IMPORT", "EXCHANGE")),
+                "tradeVolume": rng.choice((60, 100) if good in ORES else (10, 20, 60, 100)),
+                "supply": rng.choice(("SCARCE", "LIMITED", "MODERATE", "HIGH", "ABUNDANT")),
+                "purchasePrice": base + rng.randint(1, base // 5 + 1),
+                "sellPrice": base,
+            })
+
+        def listing(kind: str) -> list[dict]:
+            return [{"symbol": g["symbol"], "name": g["symbol"].title(), "description": ""} for g in trade_goods if g["type"] == kind]
+
+        return {"symbol": symbol, "exports": listing("EXPORT"), "imports": listing("IMPORT"), "exchange": listing("EXCHANGE"), "transactions": [], "tradeGoods": trade_goods}
+
+    def _ship(self, symbol: str, i: int) -> dict:
+        here = self.waypoints[self.headquarters]
+        return {
+            "symbol": symbol,
+            "registration": {"name": symbol, "factionSymbol": "COSMIC", "role": "COMMAND" if i == 0 else "EXCAVATOR"},
+            "nav": {
+                "systemSymbol": here["systemSymbol"],
+                "waypointSymbol": here["symbol"],
+                "route": {
+                    "destination": {"symbol": here["symbol"], "type": here["type"], "systemSymbol": here["systemSymbol"], "x": here["x"], "y": here["y"]},
+                    "origin": {"symbol": here["symbol"], "type": here["type"], "systemSymbol": here["systemSymbol"], "x": here["x"], "y": here["y"]},
+                    "departureTime": "2026-01-01T00:00:00.000Z",
+                    "arrival": "2026-01-01T00:00:00.000Z",
+                },
+                "status": "DOCKED",
+                "flightMode": "CRUISE",
+            },
+            "crew": {"current": 0, "required": 0, "capacity": 0, "rotation": "STRICT", "morale": 100, "wages": 0},
+            "frame": {"symbol": "FRAME_DRONE", "name": "Drone", "condition": 100, "moduleSlots": 3, "mountingPoints": 2, "fuelCapacity": 400},
+            "reactor": {"symbol": "REACTOR_CHEMICAL_I", "name": "Chemical Reactor", "condition": 100, "powerOutput": 15},
+            "engine": {"symbol": "ENGINE_IMPULSE_DRIVE_I", "name": "Impulse Drive", "condition": 100, "speed": 30},
+            "cooldown": {"shipSymbol": symbol, "totalSeconds": 0, "remainingSeconds": 0},
+            "modules": [{"symbol": "MODULE_CARGO_HOLD_I", "capacity": 30, "name": "Cargo Hold"}],
+            "mounts": [{"symbol": "MOUNT_MINING_LASER_I", "name": "Mining Laser", "strength": 10}]
+            + ([{"symbol": "MOUNT_SURVEYOR_I", "name": "Surveyor", "strength": 1}] if i == 0 else []),
+            "cargo": {"capacity": 40, "units": 0, "inventory": []},
+            "fuel": {"current": 400, "capacity": 400, "consumed": {"amount": 0, "timestamp": "2026-01-01T00:00:00.000Z"}},
+        }
+
+    def game_seconds(self, seconds: float) -> int:
+        """Whole game seconds of a duration, shrunk by time_scale."""
+        return round(seconds * self.time_scale)
+
+    def ship(self, symbol: str) -> dict:
+        try:
+            ship = self.ships[symbol]
+        except KeyError:
+            raise GameError(404, 404, f"Ship {symbol} not found")
+        arrival = self.arrivals.get(symbol)
+        if arrival is not None and time.time() >= arrival:
+            ship["nav"]["status"] = "IN_ORBIT"
+            del self.arrivals[symbol]
+        return ship
+
+    def require(self, ship: dict, status: str):
+        if ship["nav"]["status"] == "IN_TRANSIT":
+            raise GameError(400, 4214, "Ship is currently in transit", {"secondsToArrival": 1})
+        if ship["nav"]["status"] != status:
+            code = 4244 if status == "DOCKED" else 4236
+            raise GameError(400, code, f"Ship must be {status.lower().replace('_', ' ')}")
+
+    def market_view(self, symbol: str) -> dict:
+        market = self.markets[symbol]
+        present = any(s["nav"]["waypointSymbol"] == symbol and s["nav"]["status"] != "IN_TRANSIT" for s in self.ships.values())
+        return market if present else {k: v for k, v in market.items() if k not in ("tradeGoods", "transactions")}
+
+    def trade_good(self, waypoint: str, good: str) -> dict:
+        market = self.markets.get(waypoint)
+        found = next((g for g in market["tradeGoods"] if g["symbol"] == good), None) if market else None
+        if found is None:
+            raise GameError(400, 4602, f"Market at {waypoint} does not trade {good}")
+        return found
+
+    def add_cargo(self, ship: dict, good: str, units: int):
+        cargo = ship["cargo"]
+        for item in cargo["inventory"]:
+            if item["symbol"] == good:
+                item["units"] += units
+                break
+        else:
+            cargo["inventory"].append({"symbol": good, "name": good.title(), "description": "", "units": units})
+        cargo["inventory"] = [item for item in cargo["inventory"] if item["units"] > 0]
+        cargo["units"] += units
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: "MockServer"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.dispatch("GET")
+
+    def do_POST(self):
+        self.dispatch("POST")
+
+    def do_PATCH(self):
+        self.dispatch("PATCH")
+
+    def dispatch(self, method: str):
+        server = self.server
+        parts = urlsplit(self.path)
+        path = parts.path.removeprefix("/v2").rstrip("/") or "/"
+        query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length)) if length else {}
+        if server.latency:
+            time.sleep(server.latency)
+        headers = {}
+        with server.state.lock:
+            budget = server.budget(self.headers.get("Authorization"))
+            if budget is not None:
+                now = time.monotonic()
+                delay = budget.try_acquire(now)
+                windows = budget.windows
+                remaining = sum(window.remaining for window in windows if window.available(now))
+                reset_in = delay or windows[0].wait(now) or windows[0].period
+                reset = datetime.now(timezone.utc) + timedelta(seconds=reset_in)
+                headers = {
+                    "x-ratelimit-type": "IP_ADDRESS",
+                    "x-ratelimit-limit-per-second": str(windows[0].limit),
+                    "x-ratelimit-limit-burst": str(windows[-1].limit),
+                    "x-ratelimit-remaining": str(remaining),
+                    "x-ratelimit-reset": timestamp(reset),
+                }
+                if delay > 0:
+                    server.throttled += 1
+                    headers["retry-after"] = f"{delay:.3f}"
+                    return self.send(429, {"error": {"message": "You have reached your API limit.", "code": 429, "data": {"retryAfter": delay}}}, headers)
+            for route_method, pattern, name in ROUTES:
+                if route_method == method and (match := pattern.fullmatch(path)):
+                    server.requests[name] += 1
+                    try:
+                        status, payload = getattr(self, name)(*match.groups(), query=query, body=body)
+                    except GameError as e:
+                        status, payload = e.status, e.body
+                    return self.send(status, payload, headers)
+        server.requests["not_found"] += 1
+        self.send(404, {"error": {"message": f"No route for {method} {path}", "code": 404}}, headers)
+
+    def send(self, status: int, payload: dict, headers: dict[str, str]):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    @property
+    def state(self) -> GameState:
+        return self.server.state
+
+    @staticmethod
+    def page(items: list, query: dict) -> tuple[int, dict]:
+        page, limit = int(query.get("page", 1)), int(query.get("limit", 10))
+        if not 1 <= limit <= 20:
+            raise GameError(422, 400, "limit must be between 1 and 20")
+        return 200, {"data": items[(page - 1) * limit:page * limit], "meta": {"total": len(items), "page": page, "limit": limit}}
+
+    def status(self, query, body):
+        return 200, {"status": "SpaceTraders is currently online and available to play", "version": "v2", "resetDate": self.state.reset_date}
+
+    def agent(self, query, body):
+        return 200, {"data": self.state.agent}
+
+    def ship_list(self, query, body):
+        return self.page([self.state.ship(symbol) for symbol in self.state.ships], query)
+
+    def ship_get(self, symbol, query, body):
+        return 200, {"data": self.state.ship(symbol)}
+
+    def nav_get(self, symbol, query, body):
+        return 200, {"data": self.state.ship(symbol)["nav"]}
+
+    def nav_patch(self, symbol, query, body):
+        ship = self.state.ship(symbol)
+        ship["nav"]["flightMode"] = body["flightMode"]
+        return 200, {"data": ship["nav"]}
+
+    def dock(self, symbol, query, body):
+        ship = self.state.ship(symbol)
+        if ship["nav"]["status"] == "IN_TRANSIT":
+            self.state.require(ship, "IN_ORBIT")
+        ship["nav"]["status"] = "DOCKED"
+        return 200, {"data": {"nav": ship["nav"]}}
+
+    def orbit(self, symbol, query, body):
+        ship = self.state.ship(symbol)
+        if ship["nav"]["status"] == "IN_TRANSIT":
+            self.state.require(ship, "DOCKED")
+        ship["nav"]["status"] = "IN_ORBIT"
+        return 200, {"data": {"nav": ship["nav"]}}
+
+    def navigate(self, symbol, query, body):
+        state = self.state
+        ship = state.ship(symbol)
+        state.require(ship, "IN_ORBIT")
+        origin = state.waypoints[ship["nav"]["waypointSymbol"]]
+        try:
+            destination = state.waypoints[body["waypointSymbol"]]
+        except KeyError:
+            raise GameError(404, 404, f"Waypoint {body.get('waypointSymbol')} not found")
+        distance = round(hypot(destination["x"] - origin["x"], destination["y"] - origin["y"]))
+        fuel = distance if ship["nav"]["flightMode"] != "DRIFT" else 1
+        if fuel > ship["fuel"]["current"]:
+            raise GameError(400, 4203, "Navigate request failed. Ship has insufficient fuel.", {"fuelRequired": fuel, "fuelAvailable": ship["fuel"]["current"]})
+        seconds = state.game_seconds(max(distance, 1) * 25 / ship["engine"]["speed"] + 15)
+        now = datetime.now(timezone.utc)
+        ship["fuel"]["current"] -= fuel
+        ship["fuel"]["consumed"] = {"amount": fuel, "timestamp": timestamp(now)}
+        ship["nav"]["waypointSymbol"] = destination["symbol"]
+        ship["nav"]["route"] = {
+            "origin": {k: origin[k] for k in ("symbol", "type", "systemSymbol", "x", "y")},
+            "destination": {k: destination[k] for k in ("symbol", "type", "systemSymbol", "x", "y")},
+            "departureTime": timestamp(now),
+            "arrival": timestamp(now + timedelta(seconds=seconds)),
+        }
+        if seconds:
+            ship["nav"]["status"] = "IN_TRANSIT"
+            state.arrivals[symbol] = time.time() + seconds
+        else:
+            ship["nav"]["status"] = "IN_ORBIT"
+        return 200, {"data": {"fuel": ship["fuel"], "nav": ship["nav"], "events": []}}
+
+    def refuel(self, symbol, query, body):
+        state = self.state
+        ship = state.ship(symbol)
+        state.require(ship, "DOCKED")
+        units = ship["fuel"]["capacity"] - ship["fuel"]["current"]
+        try:
+            price = state.trade_good(ship["nav"]["waypointSymbol"], "FUEL")["purchasePrice"]
+        except GameError:
+            price = 1
+        cost = -(-units // 100) * price
+        ship["fuel"]["current"] = ship["fuel"]["capacity"]
+        state.agent["credits"] -= cost
+        return 200, {"data": {"agent": state.agent, "fuel": ship["fuel"], "transaction": {"shipSymbol": symbol, "units": units, "totalPrice": cost}}}
+
+    def _at_asteroid(self, symbol: str, total: int) -> tuple[dict, float]:
+        state = self.state
+        ship = state.ship(symbol)
+        state.require(ship, "IN_ORBIT")
+        if state.waypoints[ship["nav"]["waypointSymbol"]]["type"] != "ASTEROID_FIELD":
+            raise GameError(400, 4205, "Ship must be at an asteroid to extract")
+        now = time.time()
+        ready = state.cooldowns.get(symbol, 0.0)
+        if now < ready:
+            remaining = max(round(ready - now), 1)
+            raise GameError(409, 4000, "Ship action is still on cooldown", {"cooldown": {
+                "shipSymbol": symbol, "totalSeconds": state.game_seconds(total), "remainingSeconds": remaining,
+                "expiration": timestamp(datetime.fromtimestamp(ready, timezone.utc)),
+            }})
+        return ship, now
+
+    def _cooldown(self, symbol: str, ship: dict, now: float, total: int) -> dict:
+        seconds = self.state.game_seconds(total)
+        self.state.cooldowns[symbol] = now + seconds
+        cooldown = ship["cooldown"] = {"shipSymbol": symbol, "totalSeconds": seconds, "remainingSeconds": seconds,
+                                       "expiration": timestamp(datetime.fromtimestamp(now + seconds, timezone.utc))}
+        return cooldown
+
+    def _extract(self, symbol: str, deposits) -> tuple[int, dict]:
+        state = self.state
+        ship, now = self._at_asteroid(symbol, EXTRACT_COOLDOWN)
+        cargo = ship["cargo"]
+        if cargo["units"] >= cargo["capacity"]:
+            raise GameError(400, 4228, "Ship cargo is full")
+        good = state.rng.choice(deposits)
+        units = min(state.rng.randint(3, 10), cargo["capacity"] - cargo["units"])
+        state.add_cargo(ship, good, units)
+        cooldown = self._cooldown(symbol, ship, now, EXTRACT_COOLDOWN)
+        return 201, {"data": {"cooldown": cooldown, "extraction": {"shipSymbol": symbol, "yield": {"symbol": good, "units": units}}, "cargo": cargo, "events": []}}
+
+    def extract(self, symbol, query, body):
+        return self._extract(symbol, ORES)
+
+    def extract_survey(self, symbol, query, body):
+        state = self.state
+        signature = body.get("signature")
+        found = state.surveys.get(signature)
+        if found is None or found["survey"]["symbol"] != state.ship(symbol)["nav"]["waypointSymbol"]:
+            raise GameError(400, 4220, "Ship survey failed. Target signature is no longer in range or valid.")
+        if time.time() >= found["expires"]:
+            raise GameError(400, 4221, f"Ship survey failed. Survey {signature} has expired.")
+        if found["remaining"] <= 0:
+            raise GameError(400, 4224, f"Ship extract failed. Survey {signature} has been exhausted.")
+        status, payload = self._extract(symbol, [deposit["symbol"] for deposit in found["survey"]["deposits"]])
+        found["remaining"] -= 1
+        return status, payload
+
+    def survey(self, symbol, query, body):
+        state = self.state
+        rng = state.rng
+        ship, now = self._at_asteroid(symbol, SURVEY_COOLDOWN)
+        if not any(mount["symbol"].startswith("MOUNT_SURVEYOR") for mount in ship["mounts"]):
+            raise GameError(400, 4245, "Ship is missing a surveyor mount")
+        waypoint = ship["nav"]["waypointSymbol"]
+        lifetime = max(state.game_seconds(SURVEY_LIFETIME), 60)
+        surveys = []
+        for _ in range(rng.randint(1, 3)):
+            ores = rng.sample(ORES, 3)
+            size = rng.choice(list(SURVEY_SIZES))
+            survey = {
+                "signature": f"{waypoint}-{rng.getrandbits(32):08X}",
+                "symbol": waypoint,
+                "deposits": [{"symbol": rng.choice(ores)} for _ in range(rng.randint(3, 7))],
+                "expiration": timestamp(datetime.fromtimestamp(now + lifetime, timezone.utc)),
+                "size": size,
+            }
+            state.surveys[survey["signature"]] = {"survey": survey, "remaining": SURVEY_SIZES[size], "expires": now + lifetime}
+            surveys.append(survey)
+        cooldown = self._cooldown(symbol, ship, now, SURVEY_COOLDOWN)
+        return 201, {"data": {"cooldown": cooldown, "surveys": surveys}}
+
+    def _trade(self, symbol: str, body: dict, selling: bool):
+        state = self.state
+        ship = state.ship(symbol)
+        state.require(ship, "DOCKED")
+        good, units = body["symbol"], body["units"]
+        quote = state.trade_good(ship["nav"]["waypointSymbol"], good)
+        if units > quote["tradeVolume"]:
+            raise GameError(400, 4604, f"Market only accepts {quote['tradeVolume']} units per transaction", {"tradeVolume": quote["tradeVolume"]})
+        price = quote["sellPrice"] if selling else quote["purchasePrice"]
+        if selling:
+            held = next((item["units"] for item in ship["cargo"]["inventory"] if item["symbol"] == good), 0)
+            if held < units:
+                raise GameError(400, 4219, f"Ship does not have {units} units of {good}")
+            state.add_cargo(ship, good, -units)
+            state.agent["credits"] += price * units
+            quote["sellPrice"] = max(1, round(price * (1 - MARKET_IMPACT * units / quote["tradeVolume"])))
+        else:
+            if ship["cargo"]["units"] + units > ship["cargo"]["capacity"]:
+                raise GameError(400, 4217, "Ship does not have enough cargo space")
+            if state.agent["credits"] < price * units:
+                raise GameError(400, 4600, "Agent does not have enough credits")
+            state.add_cargo(ship, good, units)
+            state.agent["credits"] -= price * units
+            quote["purchasePrice"] = round(price * (1 + MARKET_IMPACT * units / quote["tradeVolume"]))
+        transaction = {"waypointSymbol": ship["nav"]["waypointSymbol"], "shipSymbol": symbol, "tradeSymbol": good,
+                       "type": "SELL" if selling else "PURCHASE", "units": units, "pricePerUnit": price,
+                       "totalPrice": price * units, "timestamp": timestamp(datetime.now(timezone.utc))}
+        return 201, {"data": {"agent": state.agent, "cargo": ship["cargo"], "transaction": transaction}}
+
+    def sell(self, symbol, query, body):
+        return self._trade(symbol, body, True)
+
+    def purchase(self, symbol, query, body):
+        return self._trade(symbol, body, False)
+
+    def market(self, system, waypoint, query, body):
+        if waypoint not in self.state.markets:
+            raise GameError(400, 4603, f"Waypoint {waypoint} does not have a marketplace")
+        return 200, {"data": self.state.market_view(waypoint)}
+
+    def contract_list(self, query, body):
+        return self.page(list(self.state.contracts.values()), query)
+
+    def contract(self, id, query, body):
+        try:
+            return 200, {"data": self.state.contracts[id]}
+        except KeyError:
+            raise GameError(404, 404, f"Contract {id} not found")
+
+    def contract_accept(self, id, query, body):
+        _, data = self.contract(id, query, body)
+        contract = data["data"]
+        if not contract["accepted"]:
+            contract["accepted"] = True
+            self.state.agent["credits"] += contract["terms"]["payment"]["onAccepted"]
+        return 200, {"data": {"agent": self.state.agent, "contract": contract}}
+
+    def contract_deliver(self, id, query, body):
+        _, data = self.contract(id, query, body)
+        contract = data["data"]
+        ship = self.state.ship(body["shipSymbol"])
+        self.state.require(ship, "DOCKED")
+        for delivery in contract["terms"]["deliver"]:
+            if delivery["tradeSymbol"] == body["tradeSymbol"]:
+                self.state.add_cargo(ship, body["tradeSymbol"], -body["units"])
+                delivery["unitsFulfilled"] += body["units"]
+        return 200, {"data": {"contract": contract, "cargo": ship["cargo"]}}
+
+    def contract_fulfill(self, id, query, body):
+        _, data = self.contract(id, query, body)
+        contract = data["data"]
+        contract["fulfilled"] = True
+        self.state.agent["credits"] += contract["terms"]["payment"]["onFulfilled"]
+        return 200, {"data": {"agent": self.state.agent, "contract": contract}}
+
+    def factions(self, query, body):
+        return self.page([
+            {"symbol": str(f).upper(), "name": str(f).title(), "description": "", "headquarters": self.state.headquarters, "traits": [], "isRecruiting": True}
+            for f in FactionSymbol
+        ], query)
+
+    def system_list(self, query, body):
+        return self.page(list(self.state.systems.values()), query)
+
+    def system(self, symbol, query, body):
+        try:
+            return 200, {"data": self.state.systems[symbol]}
+        except KeyError:
+            raise GameError(404, 404, f"System {symbol} not found")
+
+    def waypoint_list(self, system, query, body):
+        return self.page([wp for wp in self.state.waypoints.values() if wp["systemSymbol"] == system], query)
+
+    def waypoint(self, system, symbol, query, body):
+        try:
+            return 200, {"data": self.state.waypoints[symbol]}
+        except KeyError:
+            raise GameError(404, 404, f"Waypoint {symbol} not found")
+
+
+SEGMENT = r"([^/]+)"
+ROUTES = [(method, re.compile(pattern.replace("{}", SEGMENT)), name) for method, pattern, name in (
+    ("GET", "/", "status"),
+    ("GET", "/my/agent", "agent"),
+    ("GET", "/my/ships", "ship_list"),
+    ("GET", "/my/ships/{}", "ship_get"),
+    ("GET", "/my/ships/{}/nav", "nav_get"),
+    ("PATCH", "/my/ships/{}/nav", "nav_patch"),
+    ("POST", "/my/ships/{}/dock", "dock"),
+    ("POST", "/my/ships/{}/orbit", "orbit"),
+    ("POST", "/my/ships/{}/navigate", "navigate"),
+    ("POST", "/my/ships/{}/refuel", "refuel"),
+    ("POST", "/my/ships/{}/extract", "extract"),
+    ("POST", "/my/ships/{}/extract/survey", "extract_survey"),
+    ("POST", "/my/ships/{}/survey", "survey"),
+    ("POST", "/my/ships/{}/sell", "sell"),
+    ("POST", "/my/ships/{}/purchase", "purchase"),
+    ("GET", "/my/contracts", "contract_list"),
+    ("GET", "/my/contracts/{}", "contract"),
+    ("POST", "/my/contracts/{}/accept", "contract_accept"),
+    ("POST", "/my/contracts/{}/deliver", "contract_deliver"),
+    ("POST", "/my/contracts/{}/fulfill", "contract_fulfill"),
+    ("GET", "/factions", "factions"),
+    ("GET", "/systems", "system_list"),
+    ("GET", "/systems/{}", "system"),
+    ("GET", "/systems/{}/waypoints", "waypoint_list"),
+    ("GET", "/systems/{}/waypoints/{}", "waypoint"),
+    ("GET", "/systems/{}/waypoints/{}/market", "market"),
+)]
+
+
+class MockServer(ThreadingHTTPServer):
+    """Serves a GameState on 127.0.0.1 from a background thread.
+
+    rate_limits takes RateBudget windows, e.g. ((2, 1), (10, 10)) for the real limits; None disables throttling.
+    Like the real server, each token (Authorization header) gets its own budget.
+    latency adds a fixed delay to every response.
+    """
+
+    daemon_threads = True
+    # clients opening a connection per concurrent request overflow the default backlog of 5
+    request_queue_size = 64
+
+    def __init__(self, state: GameState | None = None, port: int = 0, rate_limits=None, latency: float = 0.0):
+        super().__init__(("127.0.0.1", port), Handler)
+        self.state = state if state is not None else GameState()
+        self.rate_limits = rate_limits
+        self.budgets: dict[str | None, RateBudget] = {}
+        self.latency = latency
+        self.requests: Counter[str] = Counter()
+        self.throttled = 0
+        self._thread = None
+
+    def budget(self, token: str | None) -> RateBudget | None:
+        if self.rate_limits is None:
+            return None
+        budget = self.budgets.get(token)
+        if budget is None:
+            budget = self.budgets[token] = RateBudget(self.rate_limits, margin=0.0)
+        return budget
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v2"
+
+    @property
+    def total(self) -> int:
+        return sum(self.requests.values()) + self.throttled
+
+    def start(self) -> "MockServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self) -> "MockServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8080
+    server = MockServer(port=port, rate_limits=((2, 1), (30, 60)), state=GameState(time_scale=1.0))
+    print(f"serving {server.base_url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
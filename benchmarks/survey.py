@@ -0,0 +1,53 @@
+"""Value extracted per request with and without surveys, against the local stand-in server.
+
+A miner fills its hold a number of times at an asteroid field and sells at the nearest market. In the survey run
+the command ship, which carries a surveyor, surveys whenever no cached survey for the field is worth using and the miner
+extracts with the survey worth most at the market it sells to. Prices are those of every market in the system,
+as a hauler visiting them would have recorded them in the market book.
+
+    python -m benchmarks.survey [holds]
+"""
+import sys
+from spacetraders import Agent, WaypointType
+from spacetraders.market import Market
+from spacetraders.ratelimit import RateBudget, RateLimiter
+from spacetraders.ship import Ship
+from spacetraders.survey import SurveyCache
+from .server import GameState, MockServer
+from .workflows import UNLIMITED, go, nearest
+
+
+def run(holds: int, surveys: bool) -> SurveyCache:
+    state = GameState(ships=2)
+    with MockServer(state) as server:
+        for symbol, market in state.markets.items():
+            Market.BOOK.record(symbol, market["tradeGoods"])
+        agent = Agent("benchmark-token", server.base_url, RateLimiter(RateBudget(UNLIMITED)))
+        surveyor, miner = agent.fleet
+        asteroid = next(miner.nav.find_type(WaypointType.ASTEROID_FIELD))
+        market = nearest(asteroid, list(miner.nav.find_traits(("marketplace",))))
+        cache = Ship.SURVEYS = SurveyCache(Market.BOOK, lambda good, system: Market.BOOK.quote(market.id, good).sell_price)
+        go(surveyor, asteroid)
+        go(miner, asteroid)
+        for _ in range(holds):
+            miner.extract_until_full(surveys, surveyor)
+            go(miner, market)
+            miner.dock()
+            miner.refuel()
+            miner.sell_all()
+            go(miner, asteroid)
+    return cache
+
+
+def main():
+    holds = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    print(f"{'':<10}{'surveys':>8}{'extracts':>10}{'bare':>6}{'rejected':>10}{'value/extract':>15}{'value/request':>15}")
+    for label, surveys in (("bare", False), ("surveyed", True)):
+        stats = run(holds, surveys).stats
+        per_extract = (stats.value + stats.bare_value) / (stats.extractions + stats.bare)
+        print(f"{label:<10}{stats.surveys:>8}{stats.extractions:>10}{stats.bare:>6}{stats.rejected:>10}"
+              f"{per_extract:>15.0f}{stats.value_per_request:>15.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Times TradeOptimizer matrix construction and route ranking on synthetic systems.
+
+    python -m benchmarks.trade [markets ...]
+"""
+import random
+import sys
+import time
+from spacetraders.enums import Goods
+from spacetraders.marketbook import MarketBook
+from spacetraders.route import RoutePlanner
+from spacetraders.trade import TradeOptimizer
+from .route import synthetic
+
+
+def quotes(book: MarketBook, waypoints: list[dict], goods_per_market: int = 12, seed: int = 0):
+    rng = random.Random(seed)
+    goods = list(Goods)[:60]
+    for wp in waypoints:
+        for good in rng.sample(goods, goods_per_market):
+            base = rng.randint(20, 4000)
+            book.record(wp["symbol"], [{
+                "symbol": str(good).upper(),
+                "purchasePrice": base + rng.randint(0, base // 5),
+                "sellPrice": base - rng.randint(0, base // 5) + rng.randint(-base // 4, base // 4),
+                "tradeVolume": rng.choice((10, 20, 60, 100)),
+            }])
+
+
+def main():
+    sizes = [int(n) for n in sys.argv[1:]] or [50, 100, 200, 400]
+    for n in sizes:
+        waypoints = synthetic(n)
+        for wp in waypoints:
+            wp["traits"] = [{"symbol": "MARKETPLACE"}]
+        book = MarketBook()
+        quotes(book, waypoints)
+        planner = RoutePlanner.from_waypoints(waypoints, speed=30)
+        start = time.perf_counter()
+        optimizer = TradeOptimizer.from_book(book, planner, capacity=400)
+        build = time.perf_counter() - start
+        optimizer.routes(80)
+        start = time.perf_counter()
+        for _ in range(20):
+            best = optimizer.routes(80, credits=200_000, n=10)
+        rank = (time.perf_counter() - start) / 20
+        print(f"{n:>4} markets x {len(optimizer.goods)} goods: build {build * 1000:6.1f} ms, "
+              f"rank {len(optimizer):>7,} trades {rank * 1000:6.1f} ms, best {best[0].profit_per_second:.1f} cr/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Builds a synthetic universe and times grid index queries against a brute force scan.
+
+    python -m benchmarks.universe [systems] [queries]
+"""
+import io
+import json
+import random
+import sys
+import time
+from math import hypot
+from spacetraders.enums import SystemType
+from spacetraders.universe import Universe
+
+
+def synthetic(n: int, seed: int = 0) -> list[dict]:
+    rng = random.Random(seed)
+    types = [str(t).upper() for t in SystemType]
+    return [
+        {
+            "symbol": f"X1-{i:05d}",
+            "type": rng.choice(types),
+            "x": int(rng.gauss(0, 15000)),
+            "y": int(rng.gauss(0, 15000)),
+            "waypoints": [{}] * rng.randint(0, 30),
+        }
+        for i in range(n)
+    ]
+
+
+def timed(f, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        f()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 12000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    systems = synthetic(n)
+    dump = json.dumps(systems)
+    start = time.perf_counter()
+    universe = Universe.from_json(io.StringIO(dump))
+    universe.nearest(0, 0)
+    load = time.perf_counter() - start
+    rng = random.Random(1)
+    points = [(rng.randint(-30000, 30000), rng.randint(-30000, 30000)) for _ in range(queries)]
+    it = iter(points * 4)
+
+    nearest = timed(lambda: universe.nearest(*next(it), n=10), queries)
+    typed = timed(lambda: universe.nearest(*next(it), n=5, system_type=SystemType.BLACK_HOLE), queries)
+    radius = timed(lambda: universe.within(*next(it), 2000), queries)
+
+    def brute():
+        x, y = next(it)
+        sorted(((hypot(s["x"] - x, s["y"] - y), s["symbol"]) for s in systems))[:10]
+    scan = timed(brute, max(queries // 20, 1))
+
+    x, y = points[0]
+    expected = [s for _, s in sorted((hypot(s["x"] - x, s["y"] - y), s["symbol"]) for s in systems)[:10]]
+    assert [s for s, _ in universe.nearest(x, y, 10)] == expected
+
+    print(f"systems:            {n} (stream parse + index {load * 1000:.0f} ms)")
+    print(f"nearest 10:         {nearest * 1e6:.0f} us/query")
+    print(f"nearest 5 by type:  {typed * 1e6:.0f} us/query")
+    print(f"within r=2000:      {radius * 1e6:.0f} us/query")
+    print(f"brute force scan:   {scan * 1e6:.0f} us/query")
+
+
+if __name__ == "__main__":
+    main()
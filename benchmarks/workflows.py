@@ -0,0 +1,140 @@
+"""Times representative client workflows against the local stand-in server.
+
+Each workflow is repeated and reported as requests per operation, p50/p99 operation latency and throughput.
+By default neither the server nor the client limiter throttles, so the numbers measure the library itself.
+--limits both applies the real 2 req/s (+10 per 10 s burst) limits on both sides; --limits server only on the
+server, so the client runs into 429s and retries. --latency adds a fixed server delay.
+
+    python -m benchmarks.workflows [--repeat N] [--limits off|both|server] [--latency SECONDS]
+"""
+import argparse
+import statistics
+import time
+from spacetraders import Agent, Goods, WaypointTrait, WaypointType
+from spacetraders.ratelimit import RateBudget, RateLimiter
+from spacetraders.ship import Nav, Ship
+from spacetraders.utils import RateLimitedPoolManager, StaticGameObject
+from .server import GameState, MockServer
+
+REAL_LIMITS = ((2, 1), (10, 10))
+UNLIMITED = ((1_000_000, 1),)
+
+
+class Result:
+    def __init__(self, name: str):
+        self.name = name
+        self.latencies: list[float] = []
+        self.requests = 0
+        self.throttled = 0
+
+    def row(self) -> str:
+        n = len(self.latencies)
+        ordered = sorted(self.latencies)
+        p50 = statistics.median(ordered)
+        p99 = ordered[min(n - 1, round(0.99 * (n - 1)))]
+        total = sum(ordered)
+        return (f"{self.name:<24}{n:>6}{self.requests / n:>10.1f}{p50 * 1000:>10.2f}{p99 * 1000:>10.2f}"
+                f"{n / total:>10.1f}{self.requests / total:>10.1f}{self.throttled:>8}")
+
+
+def measure(server: MockServer, result: Result, op, setup=None):
+    if setup is not None:
+        setup()
+    requests, throttled = server.total, server.throttled
+    start = time.perf_counter()
+    op()
+    result.latencies.append(time.perf_counter() - start)
+    result.requests += server.total - requests
+    result.throttled += server.throttled - throttled
+
+
+def nearest(origin, candidates):
+    here = origin.get_data()
+    return min(
+        (wp for wp in candidates if wp.id != origin.id),
+        key=lambda wp: (wp.get_data()['x'] - here['x']) ** 2 + (wp.get_data()['y'] - here['y']) ** 2,
+    )
+
+
+def go(ship: Ship, waypoint):
+    if ship.nav.status == "docked":
+        ship.orbit()
+    ship.navigate(waypoint)
+    ship.wait_for_arrival()
+
+
+def run(repeat: int, limits: str, latency: float) -> list[Result]:
+    RateLimitedPoolManager.LIMITERS["benchmark-token"] = RateLimiter(RateBudget(REAL_LIMITS if limits == "both" else UNLIMITED))
+    state = GameState(ships=4)
+    with MockServer(state, rate_limits=REAL_LIMITS if limits != "off" else None, latency=latency) as server:
+        agent = Agent("benchmark-token", server.base_url)
+        results = []
+
+        fleet = Result("fleet listing")
+        for _ in range(repeat):
+            measure(server, fleet, lambda: Agent("benchmark-token", server.base_url).fleet)
+        results.append(fleet)
+
+        hauler, miner = agent.fleet[1], agent.fleet[2]
+        traits = (WaypointTrait.MARKETPLACE, WaypointTrait.SHIPYARD)
+        cold = Result("find_traits (cold)")
+        for _ in range(repeat):
+            measure(server, cold, lambda: list(hauler.nav.find_traits(traits, (WaypointTrait.UNCHARTED,))),
+                    lambda: (Nav.CACHED_SYSTEMS.clear(), setattr(StaticGameObject, "STORE", None)))
+        results.append(cold)
+        warm = Result("find_traits (warm)")
+        for _ in range(repeat):
+            measure(server, warm, lambda: list(hauler.nav.find_traits(traits, (WaypointTrait.UNCHARTED,))))
+        results.append(warm)
+
+        markets = list(hauler.nav.find_traits((WaypointTrait.MARKETPLACE,)))
+        stops = [markets[0], nearest(markets[0], markets)]
+        go(hauler, stops[0])
+        hauler.dock()
+        hauler.buy(Goods.IRON_ORE, 20)
+
+        def haul(i: int):
+            go(hauler, stops[i % 2])
+            hauler.dock()
+            hauler.refuel()
+            hauler.sell_all()
+            hauler.buy(Goods.IRON_ORE, 20)
+
+        loop = Result("navigate/dock/sell_all")
+        for i in range(repeat):
+            measure(server, loop, lambda: haul(i + 1))
+        results.append(loop)
+
+        asteroid = next(miner.nav.find_type(WaypointType.ASTEROID_FIELD))
+        market = nearest(asteroid, markets)
+
+        def unload():
+            go(miner, market)
+            miner.dock()
+            miner.refuel()
+            miner.sell_all()
+            go(miner, asteroid)
+
+        mine = Result("extract_until_full")
+        go(miner, asteroid)
+        for _ in range(repeat):
+            measure(server, mine, miner.extract_until_full)
+            unload()
+        results.append(mine)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--limits", choices=("off", "both", "server"), default="off", help="where to apply the real rate limits")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds of server latency per request")
+    args = parser.parse_args()
+    results = run(args.repeat, args.limits, args.latency)
+    print(f"{'workflow':<24}{'ops':>6}{'req/op':>10}{'p50 ms':>10}{'p99 ms':>10}{'ops/s':>10}{'req/s':>10}{'429s':>8}")
+    for result in results:
+        print(result.row())
+
+
+if __name__ == "__main__":
+    main()
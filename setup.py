@@ -9,5 +9,6 @@ setuptools.setup(
     url='https://www.python.org/sigs/distutils-sig/',
     packages=setuptools.find_packages(),
     python_requires='>=3.11',
-    install_requires=['urllib3', "xdg-base-dirs"]
+    install_requires=['urllib3', "xdg-base-dirs"],
+    extras_require={'planning': ['numpy'], 'fast': ['orjson']}
 )
@@ -1,5 +1,6 @@
 from .agent import Agent  # noqa # pylint: disable=unused-import
+from .pool import AgentPool  # noqa # pylint: disable=unused-import
 from .enums import (  # noqa # pylint: disable=unused-import
     FactionSymbol, ShipStatus, FlightMode, ShipType, WaypointType,
-    WaypointTrait, Goods
+    WaypointTrait, Goods, SystemType
 )
@@ -1,51 +1,74 @@
 from urllib3 import request
 from urllib3.util.retry import Retry, RequestHistory
+from concurrent.futures import ThreadPoolExecutor
 from functools import cache, cached_property
+from typing import Callable, Iterable, Iterator, TypeVar
 import json
 from xdg_base_dirs import xdg_data_home
 from pathlib import Path
+from .codec import decode
 from .enums import FactionSymbol
-from .utils import URL_BASE, GameObject, handle_error, RateLimitedPoolManager
+from .metrics import Metrics
+from .ratelimit import RateLimiter
+from .store import StaticStore
+from .transport import DaemonTransport, Transport, socket_path
+from .utils import URL_BASE, GameObject, StaticGameObject, RateLimitedPoolManager, handle_error, paginate, stored_list
 from .contract import Contract
 from .faction import Faction
 from .waypoint import Waypoint
 from .ship import Ship
 
+T = TypeVar("T")
+
 
 class Agent(GameObject):
-    def __init__(self, token: str):
+    TTL = 5.0
+
+    def __init__(self, token: str | None, base_url: str = URL_BASE, limiter: RateLimiter | None = None, max_connections: int = 10,
+                 transport: Transport | None = None):
         self.token = token
+        self.max_connections = max_connections
         h = tuple(RequestHistory(None, None, None, None, None) for _ in range(3))  # Makes backoff work
-        r = Retry(allowed_methods=('DELETE', 'GET', 'POST', 'HEAD', 'OPTIONS', 'PUT', 'TRACE'), backoff_factor=0.4, history=h, respect_retry_after_header=True)
-        self.pm = RateLimitedPoolManager(retries=r, num_pools=1, block=True, maxsize=1, headers={
-            "Authorization": f"Bearer {token}"
-        })
+        r = Retry(allowed_methods=('DELETE', 'GET', 'POST', 'HEAD', 'OPTIONS', 'PUT', 'TRACE'), backoff_factor=0.4, history=h, respect_retry_after_header=False)  # 429s are retried by the rate limiter
+        headers = {"Authorization": f"Bearer {token}"} if token is not None else {}
+        super().__init__(RateLimitedPoolManager(retries=r, num_pools=1, block=True, maxsize=max_connections, base_url=base_url, token=token,
+                                                limiter=limiter, transport=transport, headers=headers), None)
 
     @property
     def url(self) -> str:
         return "/my/agent"
 
     @classmethod
-    def register(cls, name: str, faction: FactionSymbol):
+    def register(cls, name: str, faction: FactionSymbol, base_url: str = URL_BASE):
         r = request(
             "POST",
-            URL_BASE + "/register",
+            base_url + "/register",
             json={
                 "symbol": name,
                 "faction": str(faction).upper()
             }
         )
         if r.status != 201:
-            raise Exception(r.json())
-        return cls(r.json()['data']['token'])
+            raise Exception(decode(r))
+        return cls(decode(r)['data']['token'], base_url)
 
     @classmethod
-    def load(cls, name: str, local: bool = False):
+    def load(cls, name: str, local: bool = False, base_url: str = URL_BASE):
         with open(cls._token_path(local), "r") as f:
             tokens = json.load(f)
-            return cls(tokens[name.upper()])
+            return cls(tokens[name.upper()], base_url)
+
+    @classmethod
+    def connect(cls, symbol: str, path: Path | str | None = None):
+        """An agent whose requests go through the daemon serving symbol (python -m spacetraders.daemon).
+
+        It holds no token: the daemon adds its own to every request.
+        """
+        return cls(None, transport=DaemonTransport(path if path is not None else socket_path(symbol)))
 
     def save_token(self, local: bool = False):
+        if self.token is None:
+            raise RuntimeError("this agent has no token to save, its requests go through a daemon")
         tokens = {}
         try:
             with open(Agent._token_path(local), "r") as f:
@@ -64,24 +87,82 @@ class Agent(GameObject):
         p = p / "tokens.json"
         return p
 
+    def iter_contracts(self, limit: int = 20, prefetch: int = 0) -> Iterator[Contract]:
+        for d in paginate(self.pm, "/my/contracts", limit, prefetch):
+            yield Contract(self.pm, d['id'], d, self)
+
     @property
     def contracts(self) -> list[Contract]:
-        r = handle_error(self.pm.request("GET", URL_BASE + "/my/contracts"))
-        return [Contract(self.pm, d['id']) for d in r.json()['data']]
+        return list(self.iter_contracts())
+
+    def iter_fleet(self, limit: int = 20, prefetch: int = 0) -> Iterator[Ship]:
+        for d in paginate(self.pm, "/my/ships", limit, prefetch):
+            yield Ship(self.pm, d['symbol'], d, self)
 
     @property
     def fleet(self) -> list[Ship]:
-        r = handle_error(self.pm.request("GET", URL_BASE + "/my/ships"))
-        return [Ship(self.pm, d['symbol']) for d in r.json()['data']]
+        return list(self.iter_fleet())
+
+    @cached_property
+    def executor(self) -> ThreadPoolExecutor:
+        return ThreadPoolExecutor(max_workers=self.max_connections, thread_name_prefix="spacetraders")
+
+    def gather(self, calls: Iterable[Callable[[], T]], return_exceptions: bool = False) -> list[T]:
+        """Runs the calls concurrently, as fast as the rate limiter allows, and returns their results in order.
+
+        On the first exception the calls not yet started are cancelled and it is raised, unless return_exceptions
+        puts exceptions in the results instead.
+        """
+        futures = [self.executor.submit(call) for call in calls]
+        try:
+            if return_exceptions:
+                return [future.exception() or future.result() for future in futures]
+            return [future.result() for future in futures]
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def map_ships(self, fn: Callable[[Ship], T], ships: Iterable[Ship] | None = None, return_exceptions: bool = False) -> list[T]:
+        """Calls fn on every ship in the fleet, or on ships, concurrently."""
+        ships = self.fleet if ships is None else ships
+        return self.gather([lambda ship=ship: fn(ship) for ship in ships], return_exceptions)
 
     @property
     def credits(self) -> int:
         return self.get_data()['credits']
 
+    def iter_factions(self, limit: int = 20, prefetch: int = 0) -> Iterator[Faction]:
+        for d in paginate(self.pm, "/factions", limit, prefetch):
+            yield Faction(self.pm, d['symbol'], d)
+
     @cached_property
     def factions(self) -> list[Faction]:
-        r = handle_error(self.pm.request("GET", URL_BASE + "/factions"))
-        return [Faction(self.pm, d['symbol']) for d in r.json()['data']]
+        data = stored_list(self.pm, "/factions", lambda d: f"/factions/{d['symbol']}")
+        return [Faction(self.pm, d['symbol'], d) for d in data]
+
+    def enable_metrics(self, trace: bool = False) -> Metrics:
+        """Starts recording per endpoint request metrics, and request spans too with trace."""
+        metrics = self.pm.metrics = Metrics(trace, self.pm.base_url)
+        return metrics
+
+    def metrics_text(self) -> str:
+        """The recorded metrics and cache hit ratios in the Prometheus text format."""
+        if self.pm.metrics is None:
+            raise RuntimeError("metrics are not being recorded, call enable_metrics() first")
+        dispatcher = getattr(self.pm, "dispatcher", None)
+        return self.pm.metrics.prometheus(coalesced=dispatcher.coalesced if dispatcher is not None else None)
+
+    def enable_store(self, path: Path | str | None = None, check_reset: bool = True) -> StaticStore:
+        store = StaticStore(path)
+        if check_reset:
+            store.validate(decode(handle_error(self.pm.request("GET", self.pm.base_url + "/")))['resetDate'])
+        return self.use_store(store)
+
+    def use_store(self, store: StaticStore) -> StaticStore:
+        """Reads and writes static data through store, which also becomes the default for other agents."""
+        self.pm.store = store
+        StaticGameObject.STORE = store
+        return store
 
     @cached_property
     def headquarters(self) -> Waypoint:
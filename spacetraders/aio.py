@@ -0,0 +1,602 @@
+import asyncio
+import ssl
+import time
+from collections import deque
+from datetime import datetime, timezone, timedelta
+from functools import cached_property
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, Iterable, Self
+from urllib.parse import urlencode, urlsplit
+from .agent import Agent, T
+from .codec import decode, encode
+from .contract import Contract
+from .dispatch import AsyncDispatcher, Priority
+from .enums import FactionSymbol, FlightMode, Goods, ShipStatus, ShipType, WaypointTrait, WaypointType
+from .faction import Faction
+from .liquidation import VISIT_COST
+from .market import Market
+from .metrics import Metrics
+from .models import Survey
+from .ratelimit import AsyncRateLimiter
+from .ship import Nav, Ship
+from .store import StaticStore
+from .shipyard import Shipyard
+from .system import System
+from .transport import Transport
+from .survey import error_code, survey_rejected
+from .utils import URL_BASE, GameObject, ClientError, CooldownError, RateLimitedPoolManager, handle_error, response_data, store_for
+from .waypoint import TraitError, Waypoint, WaypointIndex
+
+
+class NotLoadedError(RuntimeError):
+    pass
+
+
+async def sleep_until(when: datetime):
+    await asyncio.sleep(max((when - datetime.now(timezone.utc)).total_seconds(), 0))
+
+
+class AsyncResponse:
+    retries = None
+
+    def __init__(self, status: int, headers: dict[str, str], data: bytes):
+        self.status = status
+        self.headers = headers
+        self.data = data
+
+    def json(self):
+        return decode(self)
+
+
+class AsyncClient:
+    """Rate limited HTTP/1.1 keep-alive client built directly on asyncio streams.
+
+    Like RateLimitedPoolManager, requests are ordered and merged by a dispatcher and go out through transport.
+    """
+
+    max_throttled_retries = 3
+
+    def __init__(self, token: str | None = None, base_url: str = URL_BASE, limiter: AsyncRateLimiter | None = None,
+                 max_connections: int = 4, transport: Transport | None = None):
+        self.base_url = base_url
+        self.transport = transport if transport is not None else Transport()
+        if limiter is None:
+            limiter = AsyncRateLimiter(shared=self.transport.limiter() or RateLimitedPoolManager.limiter_for(token))
+        self.limiter = limiter
+        self.dispatcher = AsyncDispatcher(self.limiter)
+        self.headers = {"Accept": "application/json"}
+        if token is not None:
+            self.headers["Authorization"] = f"Bearer {token}"
+        self._idle: dict[tuple[str, str, int], deque] = {}
+        self._connections = asyncio.BoundedSemaphore(max_connections)
+        self.metrics: Metrics | None = None
+        self.store: StaticStore | None = None
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        for connections in self._idle.values():
+            while connections:
+                _, writer = connections.popleft()
+                writer.close()
+
+    def priority(self, priority: Priority):
+        return self.dispatcher.priority(priority)
+
+    async def request(self, method: str, url: str, fields: dict | None = None, json: dict | None = None, priority: Priority | None = None) -> AsyncResponse:
+        if fields:
+            url += ("&" if "?" in url else "?") + urlencode(fields)
+        body = encode(json) if json is not None else None
+        if priority is None:
+            priority = self.dispatcher.priority_for(method)
+        if method != "GET" or body is not None:
+            return await self._request(method, url, body, priority)
+        return await self.dispatcher.coalesce(url, lambda: self._request(method, url, body, priority))
+
+    async def _request(self, method: str, url: str, body: bytes | None, priority: Priority) -> AsyncResponse:
+        metrics = self.metrics
+        for attempt in range(self.max_throttled_retries + 1):
+            started = time.perf_counter() if metrics is not None else 0.0
+            await self.dispatcher.acquire(priority)
+            acquired = time.perf_counter() if metrics is not None else 0.0
+            response = await self.transport.asend(self, method, url, body, priority)
+            if metrics is not None:
+                metrics.record(method, url, response.status, started, acquired, time.perf_counter(), attempt)
+            await self.limiter.observe(response.status, response.headers)
+            if response.status != 429:
+                break
+        return response
+
+    async def _connect(self, key: tuple[str, str, int]):
+        idle = self._idle.setdefault(key, deque())
+        if idle:
+            return idle.popleft(), True
+        scheme, host, port = key
+        context = ssl.create_default_context() if scheme == "https" else None
+        return await asyncio.open_connection(host, port, ssl=context), False
+
+    async def _send(self, method: str, url: str, body: bytes) -> AsyncResponse:
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == "https" else 80))
+        target = parts.path + (f"?{parts.query}" if parts.query else "")
+        lines = [f"{method} {target} HTTP/1.1", f"Host: {parts.netloc}", f"Content-Length: {len(body)}"]
+        lines += [f"{name}: {value}" for name, value in self.headers.items()]
+        if body:
+            lines.append("Content-Type: application/json")
+        request = ("\r\n".join(lines) + "\r\n\r\n").encode() + body
+        async with self._connections:
+            return await self._exchange(key, method, request)
+
+    async def _exchange(self, key: tuple[str, str, int], method: str, request: bytes) -> AsyncResponse:
+        while True:
+            (reader, writer), reused = await self._connect(key)
+            try:
+                writer.write(request)
+                await writer.drain()
+                response, keep_alive = await self._read(reader, method)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                writer.close()
+                if reused:
+                    continue
+                raise
+            if keep_alive:
+                self._idle[key].append((reader, writer))
+            else:
+                writer.close()
+            return response
+
+    @staticmethod
+    async def _read(reader: asyncio.StreamReader, method: str) -> tuple[AsyncResponse, bool]:
+        status = 100
+        while 100 <= status < 200:  # interim responses come before the real one
+            status = int((await reader.readuntil(b"\r\n")).split()[1])
+            headers = {}
+            while (line := await reader.readuntil(b"\r\n")) != b"\r\n":
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+        if method == "HEAD" or status in (204, 304):
+            # never has a body, whatever the headers say
+            data = b""
+        elif headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while size := int((await reader.readuntil(b"\r\n")).split(b";")[0], 16):
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            while await reader.readuntil(b"\r\n") != b"\r\n":
+                pass
+            data = b"".join(chunks)
+        elif "content-length" in headers:
+            data = await reader.readexactly(int(headers["content-length"]))
+        else:
+            data = await reader.read()
+            return AsyncResponse(status, headers, data), False
+        keep_alive = headers.get("connection", "").lower() != "close"
+        return AsyncResponse(status, headers, data), keep_alive
+
+
+async def apaginate(client: AsyncClient, path: str, limit: int = 20, prefetch: int = 0) -> AsyncIterator[dict]:
+    if not 1 <= limit <= 20:
+        raise ValueError("limit must be between 1 and 20")
+
+    async def page(n: int) -> tuple[list[dict], int]:
+        body = decode(handle_error(await client.request("GET", client.base_url + path, fields={"page": n, "limit": limit}, priority=Priority.SCAN)))
+        return body['data'], body['meta']['total']
+
+    data, total = await page(1)
+    for item in data:
+        yield item
+    if not data:
+        return
+    pages = -(-total // limit)
+    pending = deque()
+    next_page = 2
+    try:
+        while True:
+            while next_page <= pages and len(pending) < max(prefetch, 1):
+                pending.append(asyncio.ensure_future(page(next_page)))
+                next_page += 1
+            if not pending:
+                return
+            data, _ = await pending.popleft()
+            if not data:
+                return
+            for item in data:
+                yield item
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+class AsyncGameObject(GameObject):
+    """Mixin turning a GameObject into its asyncio counterpart.
+
+    Reads are served from the last loaded state; await load_data() or refresh() to fetch.
+    """
+
+    async def fetch(self) -> dict:
+        return response_data(await self.pm.request("GET", self.pm.base_url + self.url))
+
+    async def refresh(self) -> dict:
+        data = await self.fetch()
+        self.seed(data)
+        self._store(data)
+        return data
+
+    async def load_data(self) -> dict:
+        if self._data is None and (stored := self._stored()) is not None:
+            self.seed(stored)
+        hit = not self.expired
+        self.cache_stats().record(hit)
+        return self._advance() if hit else await self.refresh()
+
+    def get_data(self) -> dict:
+        if self._data is None:
+            raise NotLoadedError(f"{type(self).__name__} {self.id} has no data yet, await load_data() first")
+        return self._advance()
+
+    async def _action(self, action: str, json: dict | None = None, expected: int = 200) -> dict:
+        data = response_data(await self.pm.request(
+            "POST",
+            self.pm.base_url + self.url + "/" + action,
+            json=json
+        ), expected)
+        self.apply(data)
+        return data
+
+    def __repr__(self):
+        if self._data is None:
+            return f"{type(self).__name__}(id={self.id})"
+        return super().__repr__()
+
+
+class AsyncMarket(AsyncGameObject, Market):
+    pass
+
+
+class AsyncShipyard(AsyncGameObject, Shipyard):
+    @property
+    async def ships(self) -> dict[ShipType, int]:
+        data = await self.load_data()
+        if 'ships' not in data:
+            data = await self.refresh()
+        return self._prices(data)
+
+    async def buy_ship(self, ship_type: ShipType):
+        handle_error(await self.pm.request(
+            "POST",
+            self.pm.base_url + "/my/ships",
+            json={
+                "shipType": str(ship_type).upper(),
+                "waypointSymbol": self.id
+            }
+        ), 201)
+
+
+class AsyncWaypoint(AsyncGameObject, Waypoint):
+    @cached_property
+    def shipyard(self) -> AsyncShipyard:
+        if WaypointTrait.SHIPYARD in self.traits:
+            return AsyncShipyard(self.pm, self.id)
+        else:
+            raise TraitError("Trait SHIPYARD not found at this waypoint")
+
+    @cached_property
+    def market(self) -> AsyncMarket:
+        if WaypointTrait.MARKETPLACE in self.traits:
+            return AsyncMarket(self.pm, self.id)
+        else:
+            raise TraitError("Trait MARKETPLACE not found at this waypoint")
+
+
+class AsyncSystem(AsyncGameObject, System):
+    def __init__(self, pm: AsyncClient, id: str, data: dict | None = None):
+        super().__init__(pm, id, data)
+        self._waypoints = None
+        self._index = None
+
+    async def iter_waypoints(self, limit: int = 20, prefetch: int = 0) -> AsyncIterator[AsyncWaypoint]:
+        async for d in apaginate(self.pm, f"/systems/{self.id}/waypoints", limit, prefetch):
+            yield AsyncWaypoint(self.pm, d['symbol'], d)
+
+    @property
+    async def waypoints(self) -> list[AsyncWaypoint]:
+        if self._waypoints is None:
+            path = f"/systems/{self.id}/waypoints"
+            store = store_for(self.pm)
+            data = store.get(path) if store is not None else None
+            if data is None:
+                data = [d async for d in apaginate(self.pm, path)]
+                if store is not None:
+                    store.put_many({path: data, **{f"{path}/{d['symbol']}": d for d in data}})
+            self._waypoints = [AsyncWaypoint(self.pm, d['symbol'], d) for d in data]
+        return self._waypoints
+
+    @property
+    async def index(self) -> WaypointIndex:
+        if self._index is None:
+            self._index = WaypointIndex(await self.waypoints)
+        return self._index
+
+    async def query(self, traits: tuple[WaypointTrait, ...] = (), exclude: tuple[WaypointTrait, ...] = (),
+                    any_of: tuple[WaypointTrait, ...] = (), wp_type: WaypointType | None = None) -> list[AsyncWaypoint]:
+        return (await self.index).query(traits, exclude, any_of, wp_type)
+
+
+class AsyncNav(AsyncGameObject, Nav):
+    CACHED_SYSTEMS: dict[tuple[object, str], AsyncSystem] = {}
+
+    @property
+    def system(self) -> AsyncSystem:
+        key = (self.pm, self.model.system)
+        try:
+            return self.CACHED_SYSTEMS[key]
+        except KeyError:
+            system = AsyncSystem(self.pm, key[1])
+            self.CACHED_SYSTEMS[key] = system
+            return system
+
+    @property
+    def waypoint(self) -> AsyncWaypoint:
+        return AsyncWaypoint(self.pm, self.model.waypoint)
+
+    async def find_traits(self, traits: tuple[WaypointTrait], exclude: tuple[WaypointTrait, ...] = ()) -> AsyncIterator[AsyncWaypoint]:
+        for wp in await self.system.query(traits, exclude):
+            yield wp
+
+    async def find_type(self, wp_type: WaypointType) -> AsyncIterator[AsyncWaypoint]:
+        for wp in (await self.system.index).of_type(wp_type):
+            yield wp
+
+
+class AsyncShip(AsyncGameObject, Ship):
+    def __init__(self, pm: AsyncClient, id: str, data: dict | None = None, agent: GameObject | None = None):
+        super().__init__(pm, id, data, agent)
+        self.nav = AsyncNav(pm, id, data['nav'] if data is not None else None)
+
+    async def refresh(self) -> dict:
+        data = await super().refresh()
+        self.nav.seed(data['nav'])
+        self._cooldown = data.get('cooldown', self._cooldown)
+        return data
+
+    async def _action(self, action: str, json: dict | None = None, expected: int = 200) -> dict:
+        try:
+            return await super()._action(action, json, expected)
+        except ClientError as e:
+            self._rejected(e)
+            raise
+
+    async def navigate(self, wp: Waypoint) -> timedelta:
+        await self._action("navigate", {"waypointSymbol": wp.id})
+        return self.nav.eta
+
+    async def set_flight_mode(self, mode: FlightMode):
+        data = response_data(await self.pm.request(
+            "PATCH",
+            self.pm.base_url + self.nav.url,
+            json={"flightMode": str(mode).upper()}
+        ))
+        self.apply({'nav': data})
+
+    async def dock(self):
+        await self._action("dock")
+
+    async def orbit(self):
+        await self._action("orbit")
+
+    async def survey(self) -> list[Survey]:
+        surveys = [Survey.from_json(d) for d in (await self._action("survey", expected=201))['surveys']]
+        self.SURVEYS.surveyed()
+        self.SURVEYS.add(surveys)
+        return surveys
+
+    async def extract(self, survey: Survey | None = None) -> tuple[int, Goods, int]:
+        await self.nav.load_data()
+        if survey is None:
+            return self._extracted(await self._action("extract", expected=201), None)
+        try:
+            return self._extracted(await self._action("extract/survey", survey.data, 201), survey)
+        except ClientError as e:
+            if survey_rejected(e):
+                self.SURVEYS.rejected(survey, error_code(e))
+            raise
+
+    async def extract_until_full(self, surveys: bool = True, surveyor: "AsyncShip | None" = None):
+        await self.load_data()
+        await self.nav.load_data()
+        if surveyor is not None:
+            await surveyor.nav.load_data()
+        while not self.full:
+            survey = await self._next_survey(surveyor) if surveys else None
+            try:
+                delay = (await self.extract(survey))[0]
+            except ClientError as e:
+                delay = self._extract_failed(e, survey)
+            await asyncio.sleep(delay)
+
+    async def _next_survey(self, surveyor: "AsyncShip | None") -> Survey | None:
+        survey, surveyor = self._survey_choice(surveyor)
+        if surveyor is not None:
+            try:
+                await surveyor.survey()
+            except CooldownError:
+                return None
+            survey = self.SURVEYS.best(self.nav.model.waypoint)
+        return survey
+
+    async def refuel(self):
+        await self._action("refuel")
+
+    async def warp(self, destination: str):
+        await self._action("warp", {"waypointSymbol": destination})
+
+    async def sell(self, item: Goods, units: int) -> dict:
+        return (await self._action("sell", {
+            "symbol": str(item).upper(),
+            "units": units
+        }, 201))['transaction']
+
+    async def _sell_chunks(self, item: Goods, units: int) -> int:
+        credits, volume = 0, units
+        while units > 0:
+            chunk = min(units, volume)
+            try:
+                credits += (await self.sell(item, chunk))['totalPrice']
+            except ClientError as e:
+                volume = self._trade_volume(e, chunk)
+                continue
+            units -= chunk
+        return credits
+
+    async def sell_all(self, do_not_sell: tuple[Goods] | None = None, markets: Iterable[Waypoint] = (), visit_cost: float = VISIT_COST) -> int:
+        await self.load_data()
+        await self.nav.load_data()
+        cargo = self._for_sale(do_not_sell)
+        if not cargo:
+            return 0
+        here = self.nav.model.waypoint
+        if not self._quotes(here, cargo):
+            await AsyncMarket(self.pm, here).refresh()
+        credits = 0
+        for stop in self._liquidation(cargo, markets, visit_cost):
+            if stop.waypoint != self.nav.model.waypoint:
+                if self.nav.status == ShipStatus.DOCKED:
+                    await self.orbit()
+                await self.navigate(AsyncWaypoint(self.pm, stop.waypoint))
+                await self.wait_for_arrival()
+            if self.nav.status != ShipStatus.DOCKED:
+                await self.dock()
+            for sale in stop.sales:
+                credits += await self._sell_chunks(sale.good, sale.units)
+        return credits
+
+    async def buy(self, item: Goods, units: int) -> dict:
+        return (await self._action("purchase", {
+            "symbol": str(item).upper(),
+            "units": units
+        }, 201))['transaction']
+
+    async def transfer(self, item: Goods, units: int, ship: Self):
+        await self._action("transfer", {
+            "tradeSymbol": str(item).upper(),
+            "units": units,
+            "shipSymbol": ship.id
+        })
+        ship.receive(item, units)
+
+    async def wait_for_arrival(self):
+        data = await self.nav.load_data()
+        if data['status'] == "IN_TRANSIT":
+            await sleep_until(datetime.fromisoformat(data['route']['arrival']))
+
+    async def wait_for_cooldown(self):
+        if self._cooldown is not None and 'expiration' in self._cooldown:
+            await sleep_until(datetime.fromisoformat(self._cooldown['expiration']))
+
+
+class AsyncContract(AsyncGameObject, Contract):
+    async def accept(self):
+        await self._action("accept")
+
+    async def deliver(self, good: Goods, units: int, ship: Ship):
+        data = await self._action("deliver", {
+            "shipSymbol": ship.id,
+            "tradeSymbol": str(good).upper(),
+            "units": units
+        })
+        ship.apply({'cargo': data['cargo']})
+
+    async def fulfill(self):
+        await self._action("fulfill")
+
+
+class AsyncFaction(AsyncGameObject, Faction):
+    @property
+    def headquarters(self) -> AsyncWaypoint:
+        return AsyncWaypoint(self.pm, self.get_data()['headquarters'])
+
+
+class AsyncAgent(AsyncGameObject, Agent):
+    def __init__(self, token: str | None, base_url: str = URL_BASE, max_connections: int = 4, limiter: AsyncRateLimiter | None = None,
+                 transport: Transport | None = None):
+        self.token = token
+        self.max_connections = max_connections
+        GameObject.__init__(self, AsyncClient(token, base_url, limiter, max_connections, transport), None)
+        self._factions = None
+
+    @classmethod
+    async def register(cls, name: str, faction: FactionSymbol, base_url: str = URL_BASE):
+        async with AsyncClient(base_url=base_url) as client:
+            r = await client.request(
+                "POST",
+                base_url + "/register",
+                json={
+                    "symbol": name,
+                    "faction": str(faction).upper()
+                }
+            )
+        if r.status != 201:
+            raise Exception(decode(r))
+        return cls(decode(r)['data']['token'], base_url)
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        await self.pm.close()
+
+    async def save_token(self, local: bool = False):
+        if self.token is not None:
+            await self.load_data()
+        Agent.save_token(self, local)
+
+    async def enable_store(self, path: Path | str | None = None, check_reset: bool = True) -> StaticStore:
+        store = StaticStore(path)
+        if check_reset:
+            store.validate(decode(handle_error(await self.pm.request("GET", self.pm.base_url + "/")))['resetDate'])
+        return self.use_store(store)
+
+    async def iter_contracts(self, limit: int = 20, prefetch: int = 0) -> AsyncIterator[AsyncContract]:
+        async for d in apaginate(self.pm, "/my/contracts", limit, prefetch):
+            yield AsyncContract(self.pm, d['id'], d, self)
+
+    @property
+    async def contracts(self) -> list[AsyncContract]:
+        return [contract async for contract in self.iter_contracts()]
+
+    async def iter_fleet(self, limit: int = 20, prefetch: int = 0) -> AsyncIterator[AsyncShip]:
+        async for d in apaginate(self.pm, "/my/ships", limit, prefetch):
+            yield AsyncShip(self.pm, d['symbol'], d, self)
+
+    @property
+    async def fleet(self) -> list[AsyncShip]:
+        return [ship async for ship in self.iter_fleet()]
+
+    async def gather(self, calls: Iterable[Awaitable[T]], return_exceptions: bool = False) -> list[T]:
+        return await asyncio.gather(*calls, return_exceptions=return_exceptions)
+
+    async def map_ships(self, fn: Callable[[AsyncShip], Awaitable[T]], ships: Iterable[AsyncShip] | None = None,
+                        return_exceptions: bool = False) -> list[T]:
+        ships = await self.fleet if ships is None else ships
+        return await self.gather([fn(ship) for ship in ships], return_exceptions)
+
+    async def iter_factions(self, limit: int = 20, prefetch: int = 0) -> AsyncIterator[AsyncFaction]:
+        async for d in apaginate(self.pm, "/factions", limit, prefetch):
+            yield AsyncFaction(self.pm, d['symbol'], d)
+
+    @property
+    async def factions(self) -> list[AsyncFaction]:
+        if self._factions is None:
+            self._factions = [faction async for faction in self.iter_factions()]
+        return self._factions
+
+    @property
+    def headquarters(self) -> AsyncWaypoint:
+        return AsyncWaypoint(self.pm, self.get_data()['headquarters'])
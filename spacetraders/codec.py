@@ -0,0 +1,83 @@
+from json import dumps as json_dumps, loads as json_loads
+from typing import Any, Callable, NamedTuple
+
+
+class Codec(NamedTuple):
+    name: str
+    loads: Callable[[bytes | str], Any]
+    dumps: Callable[[Any], bytes]
+    # what loads raises on a body that is not JSON
+    error: type[Exception] = ValueError
+
+
+def _json() -> Codec:
+    return Codec("json", json_loads, lambda obj: json_dumps(obj).encode())
+
+
+def _orjson() -> Codec:
+    import orjson
+    return Codec("orjson", orjson.loads, orjson.dumps)
+
+
+def _msgspec() -> Codec:
+    import msgspec
+    return Codec("msgspec", msgspec.json.decode, msgspec.json.encode, msgspec.DecodeError)
+
+
+CODECS: dict[str, Callable[[], Codec]] = {"orjson": _orjson, "msgspec": _msgspec, "json": _json}
+
+
+def load_codec(name: str | None = None) -> Codec:
+    """The named codec, or the fastest one installed when name is None."""
+    if name is not None:
+        return CODECS[name]()
+    for factory in CODECS.values():
+        try:
+            return factory()
+        except ImportError:
+            continue
+    return _json()
+
+
+def available() -> list[str]:
+    found = []
+    for name, factory in CODECS.items():
+        try:
+            factory()
+        except ImportError:
+            continue
+        found.append(name)
+    return found
+
+
+CODEC = load_codec()
+
+
+def set_codec(codec: Codec | str | None):
+    global CODEC
+    CODEC = codec if isinstance(codec, Codec) else load_codec(codec)
+
+
+def decode(response) -> Any:
+    """Parses a response body at most once, keeping the result on the response for later callers."""
+    try:
+        return response.decoded
+    except AttributeError:
+        pass
+    data = response.data
+    decoded = CODEC.loads(data) if data else None
+    response.decoded = decoded
+    return decoded
+
+
+def decode_error() -> type[Exception]:
+    """The exception the current codec raises for a body that is not JSON."""
+    return CODEC.error
+
+
+def loads(data: bytes | str) -> Any:
+    return CODEC.loads(data)
+
+
+def encode(obj: Any) -> bytes:
+    return CODEC.dumps(obj)
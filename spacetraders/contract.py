@@ -1,9 +1,18 @@
+from datetime import datetime
 from .enums import Goods
+from .models import ContractTerms
 from .ship import Ship
-from .utils import URL_BASE, GameObject, handle_error
+from .utils import GameObject
 
 
 class Contract(GameObject):
+    TTL = 30.0
+    MODEL = ContractTerms
+
+    def __init__(self, pm, id: str, data: dict | None = None, agent: GameObject | None = None):
+        super().__init__(pm, id, data)
+        self.agent = agent
+
     @property
     def url(self) -> str:
         return f"/my/contracts/{self.id}"
@@ -16,35 +25,41 @@ class Contract(GameObject):
             f"deadline={data['terms']['deadline']})"
         )
 
+    def parse(self, data: dict) -> ContractTerms:
+        return ContractTerms.from_json(data['terms'])
+
+    @property
+    def terms(self) -> ContractTerms:
+        return self.model
+
+    @property
+    def deadline(self) -> datetime:
+        return self.model.deadline
+
     @property
     def accepted(self):
         return self.get_data()['accepted']
 
+    def apply(self, data: dict):
+        if 'contract' in data:
+            self.seed(data['contract'])
+        if 'agent' in data and self.agent is not None:
+            self.agent.seed(data['agent'])
+
     def accept(self):
-        handle_error(self.pm.request(
-            "POST",
-            URL_BASE + self.url + "/accept",
-        ))
+        self._action("accept")
 
     def deliver(self, good: Goods, units: int, ship: Ship):
-        handle_error(self.pm.request(
-            "POST",
-            URL_BASE + self.url + "/deliver",
-            json={
-                "shipSymbol": ship.id,
-                "tradeSymbol": str(good).upper(),
-                "units": units
-            }
-        ))
+        data = self._action("deliver", {
+            "shipSymbol": ship.id,
+            "tradeSymbol": str(good).upper(),
+            "units": units
+        })
+        ship.apply({'cargo': data['cargo']})
 
     def fulfill(self):
-        handle_error(self.pm.request(
-            "POST",
-            URL_BASE + self.url + "/fulfill",
-        ))
+        self._action("fulfill")
 
     @property
     def items(self) -> dict[Goods, int]:
-        data = self.get_data()
-        deliveries = data['terms']['deliver']
-        return dict(map(lambda d: (Goods(d['tradeSymbol'].lower()), d['unitsRequired']), deliveries))
+        return {d.good: d.units_required for d in self.model.deliver}
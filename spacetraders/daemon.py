@@ -0,0 +1,135 @@
+"""Local daemon owning one agent's token, rate limit budget, connection pool and caches.
+
+Scripts connect with Agent.connect(symbol) and keep the usual Agent and Ship API; their requests are sent by the
+daemon, so every script shares one budget, and static data (systems, waypoints, factions) is served from its
+memory once any script has read it.
+
+    python -m spacetraders.daemon <agent symbol> [--socket PATH] [--local] [--base-url URL] [--fresh SECONDS]
+"""
+from collections import Counter
+from pathlib import Path
+from socketserver import StreamRequestHandler, ThreadingUnixStreamServer
+from threading import Lock
+import argparse
+import os
+import re
+import time
+from .agent import Agent
+from .codec import encode, loads
+from .dispatch import Priority
+from .transport import KEPT_HEADERS, socket_path
+from .utils import URL_BASE
+
+# responses that only change on a server reset; markets, shipyards and construction sites are live
+STATIC = re.compile(r"^/(systems|factions)(/|\?|$)")
+LIVE = re.compile(r"/(market|shipyard|construction)(\?|$)")
+
+
+class Handler(StreamRequestHandler):
+    server: "Daemon"
+
+    def handle(self):
+        for line in self.rfile:
+            request = loads(line)
+            status, headers, data = self.server.forward(request["m"], request["u"], request["b"], request.get("p"))
+            self.wfile.write(encode({"s": status, "h": headers, "d": data}) + b"\n")
+            self.wfile.flush()
+
+
+class Daemon(ThreadingUnixStreamServer):
+    """Serves an agent's requests to local clients over a Unix socket.
+
+    Requests are dispatched with their client's priority. Successful static GETs are kept for the daemon's lifetime.
+    Other GETs under /my are kept for fresh seconds, so scripts polling the same ship share a response; any other
+    request clears those, and a GET that overlapped one is not kept.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, agent: Agent, path: Path | str, fresh: float = 1.0):
+        self.agent = agent
+        self.pm = agent.pm
+        self.path = Path(path)
+        self.fresh = fresh
+        self.static: dict[str, tuple[int, dict, str]] = {}
+        self.recent: dict[str, tuple[float, tuple[int, dict, str]]] = {}
+        self.stats: Counter[str] = Counter()
+        self._generation = 0
+        self._mutating = 0
+        self._lock = Lock()
+        if self.path.exists():
+            self.path.unlink()
+        super().__init__(str(self.path), Handler)
+
+    def _cached(self, path: str) -> tuple[int, dict, str] | None:
+        with self._lock:
+            entry = self.static.get(path)
+            if entry is not None:
+                return entry
+            recent = self.recent.get(path)
+            if recent is not None and time.monotonic() - recent[0] <= self.fresh:
+                return recent[1]
+        return None
+
+    def forward(self, method: str, path: str, body: str | None, priority: int | None = None) -> tuple[int, dict, str]:
+        if method == "GET" and (entry := self._cached(path)) is not None:
+            self.stats["cached"] += 1
+            return entry
+        headers = dict(self.pm.headers)
+        if body is not None:
+            headers["Content-Type"] = "application/json"
+        with self._lock:
+            generation = self._generation
+            if method != "GET":
+                self._generation += 1
+                self._mutating += 1
+        try:
+            response = self.pm.urlopen(method, self.pm.base_url + path, body=body.encode() if body is not None else None,
+                                       headers=headers, priority=Priority(priority) if priority is not None else None)
+        except Exception as e:
+            self.stats["failed"] += 1
+            return 502, {"content-type": "application/json"}, encode({"error": {"message": str(e), "code": 502}}).decode()
+        finally:
+            if method != "GET":
+                with self._lock:
+                    self._generation += 1
+                    self._mutating -= 1
+                    self.recent.clear()
+        self.stats["forwarded"] += 1
+        entry = (response.status, {name: response.headers[name] for name in KEPT_HEADERS if name in response.headers}, response.data.decode())
+        if method == "GET" and response.status == 200:
+            with self._lock:
+                if STATIC.match(path) and not LIVE.search(path):
+                    self.static[path] = entry
+                elif self.fresh > 0 and path.startswith("/my/") and generation == self._generation and not self._mutating:
+                    # not kept if a mutation overlapped this request, which may have read the state before it
+                    self.recent[path] = (time.monotonic(), entry)
+        return entry
+
+    def server_close(self):
+        super().server_close()
+        if self.path.exists():
+            os.unlink(self.path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("symbol", help="agent symbol, as saved with Agent.save_token")
+    parser.add_argument("--socket", help="socket path (default: in the runtime directory)")
+    parser.add_argument("--local", action="store_true", help="read the token from ./tokens.json")
+    parser.add_argument("--base-url", default=URL_BASE)
+    parser.add_argument("--fresh", type=float, default=1.0, help="seconds to share GET responses under /my between clients")
+    args = parser.parse_args()
+    agent = Agent.load(args.symbol, args.local, args.base_url)
+    daemon = Daemon(agent, args.socket or socket_path(args.symbol), args.fresh)
+    print(f"serving {args.symbol.upper()} on {daemon.path}")
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.server_close()
+
+
+if __name__ == "__main__":
+    main()
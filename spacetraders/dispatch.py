@@ -0,0 +1,155 @@
+from concurrent.futures import Future
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from threading import Lock, local
+from typing import Awaitable, Callable, TypeVar
+import asyncio
+import time
+from .ratelimit import AsyncRateLimiter, RateLimiter
+
+T = TypeVar("T")
+
+
+class Priority(IntEnum):
+    MUTATION = 0
+    REFRESH = 1
+    SCAN = 2
+
+
+class WaitStats:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, wait: float):
+        self.count += 1
+        self.total += wait
+        self.max = max(self.max, wait)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def __repr__(self):
+        return f"WaitStats(count={self.count}, mean={self.mean:.3f}, max={self.max:.3f})"
+
+
+class Dispatcher:
+    """Orders requests by Priority through a RateLimiter and merges identical in-flight GETs."""
+
+    def __init__(self, limiter: RateLimiter):
+        self.limiter = limiter
+        self.waits = {priority: WaitStats() for priority in Priority}
+        self.coalesced = 0
+        self._inflight: dict[str, Future] = {}
+        self._lock = Lock()
+        self._local = local()
+
+    @contextmanager
+    def priority(self, priority: Priority):
+        previous = getattr(self._local, "priority", None)
+        self._local.priority = priority
+        try:
+            yield
+        finally:
+            self._local.priority = previous
+
+    def _current(self) -> Priority | None:
+        return getattr(self._local, "priority", None)
+
+    def priority_for(self, method: str) -> Priority:
+        priority = self._current()
+        if priority is not None:
+            return priority
+        return Priority.REFRESH if method in ("GET", "HEAD") else Priority.MUTATION
+
+    def _waited(self, priority: Priority, wait: float):
+        with self._lock:
+            self.waits[priority].record(wait)
+
+    def acquire(self, priority: Priority):
+        start = time.monotonic()
+        self.limiter.acquire(priority)
+        self._waited(priority, time.monotonic() - start)
+
+    def coalesce(self, key: str, send: Callable[[], T]) -> T:
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+            else:
+                self.coalesced += 1
+        if not leader:
+            return future.result()
+        try:
+            result = send()
+        except BaseException as e:
+            with self._lock:
+                del self._inflight[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            del self._inflight[key]
+        future.set_result(result)
+        return result
+
+    def stats(self) -> dict:
+        queued = self.limiter.queued()
+        return {
+            "queued": {priority.name: queued.get(priority, 0) for priority in Priority},
+            "waits": {priority.name: self.waits[priority] for priority in Priority},
+            "coalesced": self.coalesced,
+        }
+
+
+class AsyncDispatcher(Dispatcher):
+    """asyncio counterpart of Dispatcher; priority() applies to the current task."""
+
+    def __init__(self, limiter: AsyncRateLimiter):
+        super().__init__(limiter)
+        self._priority: ContextVar[Priority | None] = ContextVar("priority", default=None)
+
+    @contextmanager
+    def priority(self, priority: Priority):
+        token = self._priority.set(priority)
+        try:
+            yield
+        finally:
+            self._priority.reset(token)
+
+    def _current(self) -> Priority | None:
+        return self._priority.get()
+
+    async def acquire(self, priority: Priority):
+        start = time.monotonic()
+        await self.limiter.acquire(priority)
+        self._waited(priority, time.monotonic() - start)
+
+    async def coalesce(self, key: str, send: Callable[[], Awaitable[T]]) -> T:
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = asyncio.get_running_loop().create_future()
+            else:
+                self.coalesced += 1
+        if not leader:
+            return await asyncio.shield(future)
+        try:
+            result = await send()
+        except BaseException as e:
+            with self._lock:
+                del self._inflight[key]
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                future.exception()  # retrieved, so a leader without followers logs nothing
+            raise
+        with self._lock:
+            del self._inflight[key]
+        future.set_result(result)
+        return result
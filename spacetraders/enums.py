@@ -226,3 +226,16 @@ class ContractType(StrEnum):
     PROCUREMENT = auto()
     TRANSPORT = auto()
     SHUTTLE = auto()
+
+
+class SystemType(StrEnum):
+    NEUTRON_STAR = auto()
+    RED_STAR = auto()
+    ORANGE_STAR = auto()
+    BLUE_STAR = auto()
+    YOUNG_STAR = auto()
+    WHITE_DWARF = auto()
+    BLACK_HOLE = auto()
+    HYPERGIANT = auto()
+    NEBULA = auto()
+    UNSTABLE = auto()
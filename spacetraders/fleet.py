@@ -0,0 +1,176 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone, timedelta
+from itertools import count
+from threading import Condition, Thread
+from typing import Callable
+import heapq
+import time
+from .contract import Contract
+from .ship import Ship
+from .utils import CooldownError, GameObject
+
+Task = Callable[[Ship], "datetime | timedelta | float | bool | None"]
+
+
+class ScheduleStats:
+    def __init__(self):
+        self.scheduled = 0
+        self.dispatched = 0
+        self.failed = 0
+        self.lateness_total = 0.0
+        self.lateness_max = 0.0
+
+    def record(self, lateness: float):
+        self.dispatched += 1
+        self.lateness_total += lateness
+        self.lateness_max = max(self.lateness_max, lateness)
+
+    @property
+    def lateness_mean(self) -> float:
+        return self.lateness_total / self.dispatched if self.dispatched else 0.0
+
+
+class Fleet:
+    """Wakes ship tasks from a single deadline heap and runs them on a small worker pool.
+
+    A task is called with its ship and returns when it wants to run next: a datetime, a
+    timedelta or number of seconds, True for as soon as the ship is ready (arrived and
+    off cooldown, as reported by its last mutation), or None or False to stop.
+    """
+
+    def __init__(self, agent: GameObject | None = None, workers: int = 4):
+        self.pm = agent.pm if agent is not None else None
+        self.stats = ScheduleStats()
+        self.errors: list[tuple[Ship, Exception]] = []
+        self._heap: list[tuple[float, int, Ship, Task]] = []
+        self._seq = count()
+        self._cond = Condition()
+        self._running: set[str] = set()
+        self._deferred: dict[str, list[tuple[float, Ship, Task]]] = {}
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._thread = None
+        self._stopped = False
+        self._started = time.monotonic()
+        self._granted = self.pm.limiter.budget.granted if self.pm is not None else 0
+
+    @staticmethod
+    def _deadline(when: datetime | timedelta | float | None) -> float:
+        now = time.monotonic()
+        if when is None:
+            return now
+        if isinstance(when, datetime):
+            return now + (when - datetime.now(timezone.utc)).total_seconds()
+        if isinstance(when, timedelta):
+            return now + when.total_seconds()
+        return now + when
+
+    def schedule(self, ship: Ship, task: Task, when: datetime | timedelta | float | None = None):
+        with self._cond:
+            heapq.heappush(self._heap, (self._deadline(when), next(self._seq), ship, task))
+            self.stats.scheduled += 1
+            self._cond.notify()
+
+    def when_ready(self, ship: Ship, task: Task):
+        self.schedule(ship, task, ship.ready_at)
+
+    def after_arrival(self, ship: Ship, task: Task):
+        self.schedule(ship, task, ship.nav.arrival)
+
+    def after_cooldown(self, ship: Ship, task: Task):
+        self.schedule(ship, task, ship.cooldown_expiration)
+
+    def before_deadline(self, contract: Contract, ship: Ship, task: Task, lead: timedelta = timedelta()):
+        self.schedule(ship, task, contract.deadline - lead)
+
+    def due_within(self, seconds: float) -> int:
+        horizon = time.monotonic() + seconds
+        with self._cond:
+            return sum(1 for deadline, *_ in self._heap if deadline <= horizon)
+
+    def metrics(self) -> dict:
+        elapsed = time.monotonic() - self._started
+        with self._cond:
+            pending, running = len(self._heap), len(self._running)
+        metrics = {
+            "scheduled": self.stats.scheduled,
+            "dispatched": self.stats.dispatched,
+            "failed": self.stats.failed,
+            "pending": pending,
+            "running": running,
+            "due_next_1s": self.due_within(1),
+            "due_next_10s": self.due_within(10),
+            "lateness_mean": self.stats.lateness_mean,
+            "lateness_max": self.stats.lateness_max,
+        }
+        if self.pm is not None:
+            budget = self.pm.limiter.budget
+            sustained = budget.windows[0].limit / budget.windows[0].period
+            rate = (budget.granted - self._granted) / elapsed if elapsed else 0.0
+            metrics.update({
+                "request_rate": rate,
+                "request_ceiling": sustained,
+                "utilization": rate / sustained,
+                "limiter_waiting": self.pm.limiter.waiting,
+            })
+        return metrics
+
+    def _run(self, deadline: float, ship: Ship, task: Task):
+        with self._cond:
+            self.stats.record(max(time.monotonic() - deadline, 0.0))
+        try:
+            when = task(ship)
+        except CooldownError as e:
+            if isinstance(e.args[0], dict) and 'cooldown' in e.args[0]:
+                ship.apply({'cooldown': e.args[0]['cooldown']})
+            when = True
+        except Exception as e:
+            with self._cond:
+                self.stats.failed += 1
+                self.errors.append((ship, e))
+            when = None
+        if when is True:
+            when = ship.ready_at
+        with self._cond:
+            if when is not None and when is not False:
+                heapq.heappush(self._heap, (self._deadline(when), next(self._seq), ship, task))
+                self.stats.scheduled += 1
+            self._running.discard(ship.id)
+            for deadline, deferred_ship, deferred_task in self._deferred.pop(ship.id, ()):
+                heapq.heappush(self._heap, (deadline, next(self._seq), deferred_ship, deferred_task))
+            self._cond.notify()
+
+    def _next(self, until_idle: bool):
+        with self._cond:
+            while True:
+                if self._stopped:
+                    return None
+                if self._heap:
+                    delay = self._heap[0][0] - time.monotonic()
+                    if delay <= 0:
+                        deadline, _, ship, task = heapq.heappop(self._heap)
+                        if ship.id in self._running:
+                            self._deferred.setdefault(ship.id, []).append((deadline, ship, task))
+                            continue
+                        self._running.add(ship.id)
+                        return deadline, ship, task
+                    self._cond.wait(delay)
+                elif until_idle and not self._running:
+                    return None
+                else:
+                    self._cond.wait()
+
+    def run(self, until_idle: bool = True):
+        while (item := self._next(until_idle)) is not None:
+            self._executor.submit(self._run, *item)
+
+    def start(self):
+        self._thread = Thread(target=self.run, args=(False,), daemon=True)
+        self._thread.start()
+
+    def stop(self, wait: bool = True):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+        self._executor.shutdown(wait=wait)
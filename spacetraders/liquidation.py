@@ -0,0 +1,75 @@
+from dataclasses import dataclass
+from typing import Mapping
+from .enums import Goods
+from .marketbook import Observation
+
+# assumed fall in a market's sell price for every trade volume sold there
+IMPACT = 0.05
+# credits another stop has to earn over selling elsewhere, covering its fuel and flight time
+VISIT_COST = 5000.0
+TRADE_VOLUME_ERROR = 4604
+
+
+@dataclass(frozen=True, slots=True)
+class Sale:
+    waypoint: str
+    good: Goods
+    units: int
+    price: float
+
+    @property
+    def value(self) -> float:
+        return self.units * self.price
+
+
+@dataclass(frozen=True, slots=True)
+class Stop:
+    waypoint: str
+    sales: tuple[Sale, ...]
+
+    @property
+    def value(self) -> float:
+        return sum(sale.value for sale in self.sales)
+
+
+def _allocate(cargo: Mapping[Goods, int], quotes: Mapping[str, Mapping[Goods, Observation]], markets: list[str], impact: float) -> list[Sale]:
+    sales = []
+    for good, units in cargo.items():
+        sold = {wp: 0 for wp in markets if good in quotes[wp]}
+        while units > 0 and sold:
+            def marginal(wp: str) -> float:
+                return quotes[wp][good].sell_price * (1 - impact) ** sold[wp]
+
+            wp = max(sold, key=marginal)
+            chunk = min(units, quotes[wp][good].trade_volume)
+            sales.append(Sale(wp, good, chunk, marginal(wp)))
+            sold[wp] += 1
+            units -= chunk
+    return sales
+
+
+def plan_liquidation(cargo: Mapping[Goods, int], quotes: Mapping[str, Mapping[Goods, Observation]], here: str,
+                     visit_cost: float = VISIT_COST, impact: float = IMPACT) -> list[Stop]:
+    """Splits cargo into sales of at most each market's trade volume, one request each.
+
+    Every chunk goes to the market paying most for it, assuming a market's price for a good falls by impact for
+    each trade volume sold there. Other markets than here are dropped, least useful first, while what they add over
+    selling elsewhere does not cover visit_cost. The stop here comes first, then the others by value; sales within a
+    stop are ordered by price, highest first. Goods no market quotes are not planned.
+    """
+    markets = [here, *(wp for wp in quotes if wp != here)]
+    sales = _allocate(cargo, quotes, markets, impact)
+    total = sum(sale.value for sale in sales)
+    while len(markets) > 1:
+        gains = {}
+        for wp in markets[1:]:
+            without = _allocate(cargo, quotes, [m for m in markets if m != wp], impact)
+            gains[wp] = (total - sum(sale.value for sale in without), without)
+        wp = min(gains, key=lambda m: gains[m][0])
+        gain, without = gains[wp]
+        if gain >= visit_cost:
+            break
+        markets.remove(wp)
+        sales, total = without, total - gain
+    stops = [Stop(wp, tuple(sorted((s for s in sales if s.waypoint == wp), key=lambda s: -s.price))) for wp in markets]
+    return [stops[0]] + sorted((stop for stop in stops[1:] if stop.sales), key=lambda stop: -stop.value)
@@ -1,35 +1,47 @@
 from .utils import GameObject, wp_to_system
 from .enums import Goods
+from .marketbook import MarketBook
+from .models import MarketInfo, TradeGood
 
 
 class Market(GameObject):
+    TTL = 10.0
+    BOOK: MarketBook = MarketBook()
+    MODEL = MarketInfo
+
+    def seed(self, data: dict):
+        super().seed(data)
+        if 'tradeGoods' in data:
+            self.BOOK.record(self.id, data['tradeGoods'])
+
     @property
     def url(self) -> str:
         return f"/systems/{wp_to_system(self.id)}/waypoints/{self.id}/market"
 
     @property
     def exports(self) -> list[Goods]:
-        return [Goods(item['symbol'].lower()) for item in self.get_data()['exports']]
+        return list(self.model.exports)
 
     @property
     def imports(self) -> list[Goods]:
-        return [Goods(item['symbol'].lower()) for item in self.get_data()['imports']]
+        return list(self.model.imports)
 
     @property
     def exchange(self) -> list[Goods]:
-        return [Goods(item['symbol'].lower()) for item in self.get_data()['exchange']]
+        return list(self.model.exchange)
+
+    @property
+    def trade_goods(self) -> tuple[TradeGood, ...]:
+        return self.model.trade_goods
 
     def details(self, item: Goods) -> dict:
-        for i in self.get_data()['tradeGoods']:
-            if i['symbol'] == str(item).upper():
-                return i
-        return {}
+        # prices are only current when this fetch saw them, i.e. from a ship docked here
+        if 'tradeGoods' not in self.get_data():
+            return {}
+        return self.BOOK.quotes.get((self.id, item), {})
 
     def cargo_value(self, inventory: dict[Goods, int]) -> int:
-        data = self.get_data()['tradeGoods']
-        total = 0
-        for item, quantity in inventory.items():
-            for i in data:
-                if i['symbol'] == str(item).upper():
-                    total += i['sellPrice'] * quantity
-        return total
+        if 'tradeGoods' not in self.get_data():
+            return 0
+        quotes = self.BOOK.quotes
+        return sum(quotes[(self.id, item)]['sellPrice'] * quantity for item, quantity in inventory.items() if (self.id, item) in quotes)
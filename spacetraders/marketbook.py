@@ -0,0 +1,201 @@
+from datetime import timedelta
+from pathlib import Path
+from threading import Lock
+from typing import Iterable, Iterator, NamedTuple
+import json
+import mmap
+import struct
+import time
+from .enums import Goods
+from .models import GOODS
+from .utils import wp_to_system
+
+RECORD = struct.Struct("<dIiii")
+HEADER = struct.Struct("<8sQ")
+MAGIC = b"STPRICE1"
+
+
+class Observation(NamedTuple):
+    time: float
+    waypoint: str
+    good: Goods
+    purchase_price: int
+    sell_price: int
+    trade_volume: int
+
+
+class PriceHistory:
+    """Append-only fixed width price records, held in memory or in a memory-mapped file."""
+
+    def __init__(self, path: Path | str | None = None, capacity: int = 4096):
+        self.path = path
+        self._file = None
+        self._lock = Lock()
+        if path is None:
+            self._buffer = bytearray(HEADER.size + capacity * RECORD.size)
+            self.count = 0
+            return
+        exists = Path(path).exists() and Path(path).stat().st_size >= HEADER.size
+        self._file = open(path, "r+b" if exists else "w+b")
+        if not exists:
+            self._file.truncate(HEADER.size + capacity * RECORD.size)
+        self._buffer = mmap.mmap(self._file.fileno(), 0)
+        magic, count = HEADER.unpack_from(self._buffer, 0)
+        if exists and magic != MAGIC:
+            raise ValueError(f"{path} is not a price history file")
+        self.count = count if exists else 0
+        HEADER.pack_into(self._buffer, 0, MAGIC, self.count)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _grow(self, needed: int):
+        size = max(len(self._buffer) * 2, needed)
+        if self._file is None:
+            self._buffer.extend(bytes(size - len(self._buffer)))
+        else:
+            self._buffer.close()
+            self._file.truncate(size)
+            self._buffer = mmap.mmap(self._file.fileno(), 0)
+
+    def append(self, when: float, key: int, purchase: int, sell: int, volume: int):
+        """Adds a record, keeping records in time order: an older one is inserted where it belongs."""
+        with self._lock:
+            end = HEADER.size + (self.count + 1) * RECORD.size
+            if end > len(self._buffer):
+                self._grow(end)
+            i = self._bisect(when, right=True)
+            at = HEADER.size + i * RECORD.size
+            if i < self.count:
+                self._buffer[at + RECORD.size:end] = self._buffer[at:end - RECORD.size]
+            RECORD.pack_into(self._buffer, at, when, key, purchase, sell, volume)
+            self.count += 1
+            HEADER.pack_into(self._buffer, 0, MAGIC, self.count)
+
+    def time_at(self, i: int) -> float:
+        return struct.unpack_from("<d", self._buffer, HEADER.size + i * RECORD.size)[0]
+
+    def _bisect(self, when: float, right: bool = False) -> int:
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.time_at(mid) < when or right and self.time_at(mid) == when:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def since(self, when: float) -> list[tuple[float, int, int, int, int]]:
+        with self._lock:
+            start = HEADER.size + self._bisect(when) * RECORD.size
+            return list(RECORD.iter_unpack(self._buffer[start:HEADER.size + self.count * RECORD.size]))
+
+    def flush(self):
+        if self._file is not None:
+            self._buffer.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._buffer.close()
+            self._file.close()
+
+
+class MarketBook:
+    """Latest trade good quotes keyed by waypoint and good, plus their price history.
+
+    With a path, the history is memory-mapped to that file and the key table kept beside it.
+    """
+
+    def __init__(self, path: Path | str | None = None):
+        self.keys: dict[tuple[str, Goods], int] = {}
+        self.key_list: list[tuple[str, Goods]] = []
+        self.quotes: dict[tuple[str, Goods], dict] = {}
+        self.latest: dict[tuple[str, Goods], Observation] = {}
+        self.by_good: dict[Goods, set[str]] = {}
+        self.history = PriceHistory(path)
+        self._lock = Lock()
+        self._keys_file = None
+        if path is not None:
+            keys_path = Path(f"{path}.keys")
+            if keys_path.exists():
+                with open(keys_path) as f:
+                    for line in f:
+                        waypoint, good = json.loads(line)
+                        self._key(waypoint, GOODS[good], persist=False)
+            self._keys_file = open(keys_path, "a")
+            for record in self.history.since(0):
+                self._remember(Observation(record[0], *self.key_list[record[1]], *record[2:]))
+
+    def _key(self, waypoint: str, good: Goods, persist: bool = True) -> int:
+        key = (waypoint, good)
+        try:
+            return self.keys[key]
+        except KeyError:
+            i = self.keys[key] = len(self.key_list)
+            self.key_list.append(key)
+            self.by_good.setdefault(good, set()).add(waypoint)
+            if persist and self._keys_file is not None:
+                self._keys_file.write(json.dumps([waypoint, str(good).upper()]) + "\n")
+                self._keys_file.flush()
+            return i
+
+    def _remember(self, observation: Observation):
+        key = (observation.waypoint, observation.good)
+        current = self.latest.get(key)
+        if current is None or current.time <= observation.time:
+            self.latest[key] = observation
+
+    def record(self, waypoint: str, trade_goods: Iterable[dict], when: float | None = None):
+        when = time.time() if when is None else when
+        with self._lock:
+            self._record(waypoint, trade_goods, when)
+
+    def _record(self, waypoint: str, trade_goods: Iterable[dict], when: float):
+        for item in trade_goods:
+            good = GOODS.get(item['symbol'])
+            if good is None:
+                continue
+            key = self._key(waypoint, good)
+            self.quotes[(waypoint, good)] = item
+            self.history.append(when, key, item['purchasePrice'], item['sellPrice'], item['tradeVolume'])
+            self._remember(Observation(when, waypoint, good, item['purchasePrice'], item['sellPrice'], item['tradeVolume']))
+
+    def quote(self, waypoint: str, good: Goods) -> Observation | None:
+        return self.latest.get((waypoint, good))
+
+    def observations(self, good: Goods | None = None, system: str | None = None, within: timedelta | None = None) -> Iterator[Observation]:
+        with self._lock:
+            if within is None:
+                candidates = list(self.latest.values()) if good is None else [o for wp in self.by_good.get(good, ()) if (o := self.latest.get((wp, good)))]
+            else:
+                wanted = None if good is None else {self.keys[(wp, good)] for wp in self.by_good.get(good, ())}
+                key_list = list(self.key_list)
+        if within is None:
+            for observation in candidates:
+                if system is None or wp_to_system(observation.waypoint) == system:
+                    yield observation
+            return
+        for when, key, purchase, sell, volume in self.history.since(time.time() - within.total_seconds()):
+            if wanted is not None and key not in wanted:
+                continue
+            waypoint, item = key_list[key]
+            if system is None or wp_to_system(waypoint) == system:
+                yield Observation(when, waypoint, item, purchase, sell, volume)
+
+    def best_sell(self, good: Goods, system: str | None = None, within: timedelta | None = None) -> Observation | None:
+        """Highest price a market paid for good, optionally limited to a system and a recent window."""
+        return max(self.observations(good, system, within), key=lambda o: o.sell_price, default=None)
+
+    def best_buy(self, good: Goods, system: str | None = None, within: timedelta | None = None) -> Observation | None:
+        """Lowest price a market asked for good, optionally limited to a system and a recent window."""
+        return min(self.observations(good, system, within), key=lambda o: o.purchase_price, default=None)
+
+    def markets(self, system: str | None = None) -> list[str]:
+        with self._lock:
+            keys = list(self.keys)
+        return sorted({wp for wp, _ in keys if system is None or wp_to_system(wp) == system})
+
+    def close(self):
+        self.history.close()
+        if self._keys_file is not None:
+            self._keys_file.close()
@@ -0,0 +1,166 @@
+from bisect import bisect_left
+from collections import Counter
+from pathlib import Path
+from threading import Lock, get_ident
+from urllib.parse import urlsplit
+import json
+import os
+import time
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# path segments followed by an identifier, which is replaced by a placeholder to group requests by endpoint
+COLLECTIONS = {"ships": "{ship}", "contracts": "{contract}", "systems": "{system}", "waypoints": "{waypoint}", "factions": "{faction}"}
+
+
+class CacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.lock = Lock()
+
+    def record(self, hit: bool):
+        with self.lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    @property
+    def ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __repr__(self):
+        return f"CacheStats(hits={self.hits}, misses={self.misses}, ratio={self.ratio:.2f})"
+
+
+CACHE_STATS: dict[str, CacheStats] = {}
+
+
+def endpoint(url: str, base_url: str = "") -> str:
+    """Groups a request URL by endpoint, e.g. /my/ships/AGENT-1/nav -> /my/ships/{ship}/nav."""
+    path = urlsplit(url.removeprefix(base_url)).path if base_url else urlsplit(url).path
+    segments = path.strip("/").split("/")
+    for i in range(1, len(segments)):
+        placeholder = COLLECTIONS.get(segments[i - 1])
+        if placeholder is not None:
+            segments[i] = placeholder
+    return "/" + "/".join(segments)
+
+
+class Histogram:
+    def __init__(self, buckets: tuple[float, ...] = BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th quantile."""
+        rank, seen = q * self.count, 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            seen += count
+            if seen >= rank and count:
+                return bound
+        return 0.0
+
+    def __repr__(self):
+        return f"Histogram(count={self.count}, mean={self.mean:.3f})"
+
+
+class Metrics:
+    """Per endpoint request counts, limiter wait and network time histograms, retries and an optional span log.
+
+    Attached to a client as its metrics attribute; clients skip all of this while it is None.
+    """
+
+    def __init__(self, trace: bool = False, base_url: str = ""):
+        self.base_url = base_url
+        self.requests: Counter[tuple[str, str, int]] = Counter()
+        self.retries: Counter[tuple[str, str, str]] = Counter()
+        self.wait: dict[tuple[str, str], Histogram] = {}
+        self.network: dict[tuple[str, str], Histogram] = {}
+        self.spans: list[dict] | None = [] if trace else None
+        self.origin = time.perf_counter()
+        self._lock = Lock()
+
+    def record(self, method: str, url: str, status: int, started: float, acquired: float, finished: float,
+               attempt: int = 0, transport_retries: int = 0):
+        """Records one request; started, acquired and finished are time.perf_counter() readings."""
+        key = (method, endpoint(url, self.base_url))
+        with self._lock:
+            self.requests[(*key, status)] += 1
+            if attempt:
+                self.retries[(*key, "throttled")] += 1
+            if transport_retries:
+                self.retries[(*key, "transport")] += transport_retries
+            wait = self.wait.get(key)
+            if wait is None:
+                wait = self.wait[key] = Histogram()
+                self.network[key] = Histogram()
+            wait.observe(acquired - started)
+            self.network[key].observe(finished - acquired)
+            if self.spans is not None:
+                name, tid = f"{key[0]} {key[1]}", get_ident()
+                self.spans.append({"name": "limiter", "cat": "wait", "ph": "X", "pid": os.getpid(), "tid": tid,
+                                   "ts": (started - self.origin) * 1e6, "dur": (acquired - started) * 1e6, "args": {"endpoint": name}})
+                self.spans.append({"name": name, "cat": "request", "ph": "X", "pid": os.getpid(), "tid": tid,
+                                   "ts": (acquired - self.origin) * 1e6, "dur": (finished - acquired) * 1e6,
+                                   "args": {"url": url, "status": status, "attempt": attempt}})
+
+    def prometheus(self, cache_stats: dict[str, CacheStats] | None = None, coalesced: int | None = None) -> str:
+        """Metrics in the Prometheus text exposition format."""
+        cache_stats = CACHE_STATS if cache_stats is None else cache_stats
+        lines = ["# TYPE spacetraders_requests_total counter"]
+        with self._lock:
+            for (method, path, status), count in sorted(self.requests.items()):
+                lines.append(f'spacetraders_requests_total{{method="{method}",endpoint="{path}",status="{status}"}} {count}')
+            lines.append("# TYPE spacetraders_retries_total counter")
+            for (method, path, reason), count in sorted(self.retries.items()):
+                lines.append(f'spacetraders_retries_total{{method="{method}",endpoint="{path}",reason="{reason}"}} {count}')
+            for name, histograms in (("limiter_wait", self.wait), ("network", self.network)):
+                lines.append(f"# TYPE spacetraders_{name}_seconds histogram")
+                for (method, path), histogram in sorted(histograms.items()):
+                    labels = f'method="{method}",endpoint="{path}"'
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets + (float("inf"),), histogram.counts):
+                        cumulative += count
+                        le = "+Inf" if bound == float("inf") else repr(bound)
+                        lines.append(f'spacetraders_{name}_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+                    lines.append(f"spacetraders_{name}_seconds_sum{{{labels}}} {histogram.sum}")
+                    lines.append(f"spacetraders_{name}_seconds_count{{{labels}}} {histogram.count}")
+        lines.append("# TYPE spacetraders_cache_lookups_total counter")
+        for name, stats in sorted(cache_stats.items()):
+            lines.append(f'spacetraders_cache_lookups_total{{object="{name}",result="hit"}} {stats.hits}')
+            lines.append(f'spacetraders_cache_lookups_total{{object="{name}",result="miss"}} {stats.misses}')
+        if coalesced is not None:
+            lines.append("# TYPE spacetraders_coalesced_requests_total counter")
+            lines.append(f"spacetraders_coalesced_requests_total {coalesced}")
+        return "\n".join(lines) + "\n"
+
+    def trace(self) -> dict:
+        """The span log as a Chrome trace (chrome://tracing, Perfetto) document."""
+        with self._lock:
+            return {"traceEvents": list(self.spans or ()), "displayTimeUnit": "ms"}
+
+    def write_trace(self, path: Path | str):
+        with open(path, "w") as f:
+            json.dump(self.trace(), f)
+
+    def reset(self):
+        with self._lock:
+            self.requests.clear()
+            self.retries.clear()
+            self.wait.clear()
+            self.network.clear()
+            if self.spans is not None:
+                self.spans.clear()
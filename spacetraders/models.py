@@ -0,0 +1,240 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import StrEnum
+from sys import intern
+from typing import TypeVar
+from .enums import Goods, ShipStatus, FlightMode, WaypointTrait, WaypointType
+from .utils import wp_to_system
+
+E = TypeVar("E", bound=StrEnum)
+
+
+def _table(enum: type[E]) -> dict[str, E]:
+    return {str(member).upper(): member for member in enum}
+
+
+GOODS = _table(Goods)
+SHIP_STATUSES = _table(ShipStatus)
+FLIGHT_MODES = _table(FlightMode)
+WAYPOINT_TRAITS = _table(WaypointTrait)
+WAYPOINT_TYPES = _table(WaypointType)
+TRAIT_BITS = {trait: 1 << i for i, trait in enumerate(WaypointTrait)}
+
+
+def lookup(table: dict[str, E], enum: type[E], symbol: str) -> E:
+    try:
+        return table[symbol]
+    except KeyError:
+        return enum(symbol.lower())
+
+
+def trait_mask(traits) -> int:
+    mask = 0
+    for trait in traits:
+        mask |= TRAIT_BITS[trait]
+    return mask
+
+
+@dataclass(frozen=True, slots=True)
+class Fuel:
+    current: int
+    capacity: int
+
+    @classmethod
+    def from_json(cls, data: dict) -> "Fuel":
+        return cls(data['current'], data['capacity'])
+
+
+@dataclass(frozen=True, slots=True)
+class CargoItem:
+    symbol: Goods
+    units: int
+
+
+@dataclass(frozen=True, slots=True)
+class Cargo:
+    units: int
+    capacity: int
+    items: tuple[CargoItem, ...]
+
+    @classmethod
+    def from_json(cls, data: dict) -> "Cargo":
+        return cls(data['units'], data['capacity'], tuple(
+            CargoItem(lookup(GOODS, Goods, item['symbol']), item['units']) for item in data['inventory']
+        ))
+
+    @property
+    def inventory(self) -> dict[Goods, int]:
+        return {item.symbol: item.units for item in self.items}
+
+    @property
+    def free(self) -> int:
+        return self.capacity - self.units
+
+    @property
+    def full(self) -> bool:
+        return self.units == self.capacity
+
+
+@dataclass(frozen=True, slots=True)
+class NavInfo:
+    system: str
+    waypoint: str
+    status: ShipStatus
+    mode: FlightMode
+    arrival: datetime | None
+
+    @classmethod
+    def from_json(cls, data: dict) -> "NavInfo":
+        status = lookup(SHIP_STATUSES, ShipStatus, data['status'])
+        return cls(
+            intern(data['systemSymbol']),
+            intern(data['waypointSymbol']),
+            status,
+            lookup(FLIGHT_MODES, FlightMode, data['flightMode']),
+            datetime.fromisoformat(data['route']['arrival']) if status == ShipStatus.IN_TRANSIT else None,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class ShipInfo:
+    symbol: str
+    role: str
+    speed: int
+    nav: NavInfo
+    fuel: Fuel
+    cargo: Cargo
+
+    @classmethod
+    def from_json(cls, data: dict) -> "ShipInfo":
+        return cls(
+            intern(data['symbol']),
+            intern(data['registration']['role']),
+            data['engine']['speed'],
+            NavInfo.from_json(data['nav']),
+            Fuel.from_json(data['fuel']),
+            Cargo.from_json(data['cargo']),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class WaypointInfo:
+    symbol: str
+    system: str
+    type: WaypointType
+    x: int
+    y: int
+    traits: tuple[WaypointTrait, ...]
+    trait_mask: int
+
+    @classmethod
+    def from_json(cls, data: dict) -> "WaypointInfo":
+        traits = tuple(lookup(WAYPOINT_TRAITS, WaypointTrait, trait['symbol']) for trait in data['traits'])
+        return cls(
+            intern(data['symbol']),
+            intern(data.get('systemSymbol') or wp_to_system(data['symbol'])),
+            lookup(WAYPOINT_TYPES, WaypointType, data['type']),
+            data['x'],
+            data['y'],
+            traits,
+            trait_mask(traits),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class TradeGood:
+    symbol: Goods
+    supply: str
+    trade_volume: int
+    purchase_price: int
+    sell_price: int
+
+    @classmethod
+    def from_json(cls, data: dict) -> "TradeGood":
+        return cls(
+            lookup(GOODS, Goods, data['symbol']),
+            intern(data.get('supply', '')),
+            data['tradeVolume'],
+            data['purchasePrice'],
+            data['sellPrice'],
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class MarketInfo:
+    symbol: str
+    exports: tuple[Goods, ...]
+    imports: tuple[Goods, ...]
+    exchange: tuple[Goods, ...]
+    trade_goods: tuple[TradeGood, ...]
+
+    @classmethod
+    def from_json(cls, data: dict) -> "MarketInfo":
+        def goods(key: str) -> tuple[Goods, ...]:
+            return tuple(lookup(GOODS, Goods, item['symbol']) for item in data.get(key, ()))
+
+        return cls(
+            intern(data['symbol']),
+            goods('exports'),
+            goods('imports'),
+            goods('exchange'),
+            tuple(TradeGood.from_json(item) for item in data.get('tradeGoods', ())),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class Survey:
+    signature: str
+    waypoint: str
+    deposits: tuple[Goods, ...]
+    expiration: datetime
+    size: str
+    data: dict = field(compare=False, repr=False)  # sent back as is to extract with the survey
+
+    @classmethod
+    def from_json(cls, data: dict) -> "Survey":
+        return cls(
+            data['signature'],
+            intern(data['symbol']),
+            tuple(lookup(GOODS, Goods, d['symbol']) for d in data['deposits']),
+            datetime.fromisoformat(data['expiration']),
+            intern(data['size']),
+            data,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class Delivery:
+    good: Goods
+    destination: str
+    units_required: int
+    units_fulfilled: int
+
+    @property
+    def remaining(self) -> int:
+        return self.units_required - self.units_fulfilled
+
+
+@dataclass(frozen=True, slots=True)
+class ContractTerms:
+    deadline: datetime
+    on_accepted: int
+    on_fulfilled: int
+    deliver: tuple[Delivery, ...]
+
+    @classmethod
+    def from_json(cls, data: dict) -> "ContractTerms":
+        return cls(
+            datetime.fromisoformat(data['deadline']),
+            data['payment']['onAccepted'],
+            data['payment']['onFulfilled'],
+            tuple(
+                Delivery(
+                    lookup(GOODS, Goods, d['tradeSymbol']),
+                    intern(d['destinationSymbol']),
+                    d['unitsRequired'],
+                    d['unitsFulfilled'],
+                )
+                for d in data.get('deliver', ())
+            ),
+        )
@@ -0,0 +1,85 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from threading import Lock
+from typing import Callable, Iterable, Iterator, TypeVar
+import json
+from .agent import Agent
+from .store import StaticStore
+from .utils import URL_BASE
+
+T = TypeVar("T")
+
+
+class AgentPool:
+    """Many agents in one process.
+
+    Each agent keeps its own connection pool and its token's rate limit budget, so adding agents adds
+    throughput. Systems and waypoints are held per agent, so their requests spend that agent's budget;
+    the static store and the market book are shared between them.
+    """
+
+    def __init__(self, tokens: Iterable[str] = (), base_url: str = URL_BASE):
+        self.base_url = base_url
+        self.agents: list[Agent] = []
+        self.store: StaticStore | None = None
+        self._lock = Lock()
+        for token in tokens:
+            self.add(token)
+
+    @classmethod
+    def load(cls, local: bool = False, base_url: str = URL_BASE) -> "AgentPool":
+        """Every agent saved with Agent.save_token."""
+        with open(Agent._token_path(local), "r") as f:
+            return cls(json.load(f).values(), base_url)
+
+    def add(self, agent: Agent | str) -> Agent:
+        if isinstance(agent, str):
+            agent = Agent(agent, self.base_url)
+        with self._lock:
+            self.agents.append(agent)
+            store = self.store
+        if store is not None:
+            agent.use_store(store)
+        return agent
+
+    def __len__(self) -> int:
+        return len(self.agents)
+
+    def __iter__(self) -> Iterator[Agent]:
+        return iter(list(self.agents))
+
+    def __getitem__(self, symbol: str) -> Agent:
+        for agent in self:
+            if agent.get_data()['symbol'] == symbol.upper():
+                return agent
+        raise KeyError(symbol)
+
+    def enable_store(self, path: Path | str | None = None, check_reset: bool = True) -> StaticStore | None:
+        """Shares one static store between every agent, including ones added later, validated once against the
+        server's reset date."""
+        agents = list(self)
+        if not agents:
+            return None
+        self.store = agents[0].enable_store(path, check_reset)
+        for agent in agents[1:]:
+            agent.use_store(self.store)
+        return self.store
+
+    def map(self, fn: Callable[[Agent], T], workers: int | None = None) -> list[T]:
+        """Calls fn on every agent concurrently, one thread per agent unless workers says otherwise."""
+        agents = list(self)
+        if not agents:
+            return []
+        with ThreadPoolExecutor(max_workers=workers or len(agents)) as executor:
+            return list(executor.map(fn, agents))
+
+    def budgets(self) -> list[dict[str, int]]:
+        """Requests granted and throttled so far, and callers waiting, for each agent's limiter in order."""
+        return [
+            {"granted": agent.pm.limiter.budget.granted, "throttled": agent.pm.limiter.budget.throttled, "waiting": agent.pm.limiter.waiting}
+            for agent in self
+        ]
+
+    def close(self):
+        for agent in self:
+            agent.pm.clear()
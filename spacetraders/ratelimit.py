@@ -0,0 +1,194 @@
+from collections import Counter
+from itertools import count
+import asyncio
+import heapq
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from threading import Condition
+from typing import Callable, Mapping
+import time
+
+
+def retry_after_seconds(value: str) -> float | None:
+    """Seconds to wait from a Retry-After header, given as seconds or as an HTTP date; None if it does not parse."""
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return when.timestamp() - time.time()
+
+
+class Window:
+    def __init__(self, limit: int, period: float, margin: float = 0.1):
+        self.limit = limit
+        self.period = period
+        self.margin = margin
+        self.remaining = limit
+        self.reset_at = None
+
+    def available(self, now: float) -> bool:
+        if self.reset_at is not None and now >= self.reset_at:
+            self.remaining = self.limit
+            self.reset_at = None
+        return self.remaining > 0
+
+    def take(self, now: float):
+        if self.remaining == self.limit:
+            self.reset_at = now + self.period + self.margin
+        self.remaining -= 1
+
+    def wait(self, now: float) -> float:
+        if self.available(now):
+            return 0.0
+        return self.reset_at - now
+
+
+class RateBudget:
+    """Request accounting for the SpaceTraders limits, without any locking or sleeping.
+
+    A request is charged to the first window with capacity left, so the default
+    windows allow 2 requests per second plus a burst pool of 10 per 10 seconds.
+    """
+
+    def __init__(self, windows: tuple[tuple[int, float], ...] = ((2, 1), (10, 10)), margin: float = 0.1, clock: Callable[[], float] = time.monotonic):
+        self.windows = [Window(limit, period, margin) for limit, period in windows]
+        self.clock = clock
+        self.blocked_until = 0.0
+        self.granted = 0
+        self.throttled = 0
+
+    def try_acquire(self, now: float) -> float:
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        for window in self.windows:
+            if window.available(now):
+                window.take(now)
+                self.granted += 1
+                return 0.0
+        return min(window.wait(now) for window in self.windows)
+
+    def block(self, seconds: float, now: float):
+        self.blocked_until = max(self.blocked_until, now + seconds)
+
+    def observe(self, status: int, headers: Mapping[str, str], now: float):
+        retry_after = headers.get("retry-after")
+        if status == 429:
+            self.throttled += 1
+            seconds = retry_after_seconds(retry_after) if retry_after is not None else None
+            if seconds is not None:
+                self.block(seconds, now)
+            else:
+                self.block(max(window.wait(now) for window in self.windows), now)
+        if headers.get("x-ratelimit-remaining") == "0" and "x-ratelimit-reset" in headers:
+            try:
+                reset = datetime.fromisoformat(headers["x-ratelimit-reset"]).timestamp()
+            except ValueError:
+                return
+            self.block(reset - time.time(), now)
+
+
+class RateLimiter:
+    """Blocking, thread-safe front end for a RateBudget.
+
+    Waiting callers are served lowest priority value first, in FIFO order within a priority.
+    """
+
+    def __init__(self, budget: RateBudget | None = None):
+        self.budget = budget if budget is not None else RateBudget()
+        self._cond = Condition()
+        self._queue = []
+        self._seq = count()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._queue)
+
+    def queued(self) -> Counter:
+        return Counter(priority for priority, _ in self._queue)
+
+    def acquire(self, priority: int = 0):
+        ticket = (priority, next(self._seq))
+        with self._cond:
+            heapq.heappush(self._queue, ticket)
+            try:
+                while True:
+                    if self._queue[0] == ticket:
+                        delay = self.budget.try_acquire(self.budget.clock())
+                        if delay <= 0:
+                            return
+                        self._cond.wait(delay)
+                    else:
+                        self._cond.wait()
+            finally:
+                self._queue.remove(ticket)
+                heapq.heapify(self._queue)
+                self._cond.notify_all()
+
+    def observe(self, status: int, headers: Mapping[str, str]):
+        with self._cond:
+            self.budget.observe(status, headers, self.budget.clock())
+            self._cond.notify_all()
+
+
+class AsyncRateLimiter:
+    """asyncio counterpart of RateLimiter sharing the same RateBudget accounting.
+
+    With shared, it spends that RateLimiter's budget, so sync and async clients of one token stay within one limit.
+    """
+
+    def __init__(self, budget: RateBudget | None = None, shared: RateLimiter | None = None):
+        self.shared = shared
+        if shared is not None:
+            budget = shared.budget
+        self.budget = budget if budget is not None else RateBudget()
+        self._cond = asyncio.Condition()
+        self._queue = []
+        self._seq = count()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._queue)
+
+    def queued(self) -> Counter:
+        return Counter(priority for priority, _ in self._queue)
+
+    async def acquire(self, priority: int = 0):
+        ticket = (priority, next(self._seq))
+        async with self._cond:
+            heapq.heappush(self._queue, ticket)
+            try:
+                while True:
+                    if self._queue[0] == ticket:
+                        delay = self._try_acquire()
+                        if delay <= 0:
+                            return
+                        try:
+                            await asyncio.wait_for(self._cond.wait(), delay)
+                        except TimeoutError:
+                            pass
+                    else:
+                        await self._cond.wait()
+            finally:
+                self._queue.remove(ticket)
+                heapq.heapify(self._queue)
+                self._cond.notify_all()
+
+    def _try_acquire(self) -> float:
+        if self.shared is None:
+            return self.budget.try_acquire(self.budget.clock())
+        with self.shared._cond:
+            return self.budget.try_acquire(self.budget.clock())
+
+    async def observe(self, status: int, headers: Mapping[str, str]):
+        async with self._cond:
+            if self.shared is None:
+                self.budget.observe(status, headers, self.budget.clock())
+            else:
+                self.shared.observe(status, headers)
+            self._cond.notify_all()
@@ -0,0 +1,212 @@
+from dataclasses import dataclass
+from datetime import timedelta
+import numpy as np
+from .enums import FlightMode, ShipStatus, WaypointTrait
+from .ship import Ship
+from .system import System
+from .waypoint import Waypoint
+
+# (seconds per unit of distance at speed 1, fuel per unit of distance); drifting always burns 1 fuel
+FLIGHT_MODES = {
+    FlightMode.BURN: (12.5, 2),
+    FlightMode.CRUISE: (25, 1),
+    FlightMode.STEALTH: (30, 1),
+    FlightMode.DRIFT: (250, 0),
+}
+
+
+@dataclass(frozen=True, slots=True)
+class Hop:
+    origin: str
+    destination: str
+    mode: FlightMode
+    distance: int
+    fuel: int
+    seconds: int
+    refuel: bool
+
+
+@dataclass(frozen=True, slots=True)
+class Plan:
+    hops: tuple[Hop, ...]
+    refuel_first: bool = False
+
+    @property
+    def seconds(self) -> int:
+        return sum(hop.seconds for hop in self.hops)
+
+    @property
+    def eta(self) -> timedelta:
+        return timedelta(seconds=self.seconds)
+
+    @property
+    def fuel(self) -> int:
+        return sum(hop.fuel for hop in self.hops)
+
+    @property
+    def stops(self) -> list[str]:
+        return [hop.destination for hop in self.hops]
+
+
+class NoRouteError(ValueError):
+    pass
+
+
+class RoutePlanner:
+    """Fuel constrained fastest paths between the waypoints of one system.
+
+    Ships only stop at marketplaces on the way, refuelling to capacity at each stop.
+    """
+
+    CACHED_PLANNERS: dict[tuple[str, int], "RoutePlanner"] = {}
+
+    def __init__(self, symbols: list[str], xs, ys, markets, speed: int = 30):
+        self.symbols = list(symbols)
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.markets = np.asarray(markets, dtype=bool)
+        self.speed = speed
+        coords = np.column_stack((np.asarray(xs, dtype=np.float64), np.asarray(ys, dtype=np.float64)))
+        delta = coords[:, None, :] - coords[None, :, :]
+        self.distances = np.rint(np.sqrt((delta ** 2).sum(axis=2))).astype(np.int64)
+        self.modes = tuple(FLIGHT_MODES)
+        travel = np.maximum(self.distances, 1)
+        self.seconds = np.stack([np.rint(travel * (FLIGHT_MODES[mode][0] / speed) + 15) for mode in self.modes]).astype(np.int64)
+        self.fuel = np.stack([
+            self.distances * FLIGHT_MODES[mode][1] if FLIGHT_MODES[mode][1] else np.minimum(self.distances, 1)
+            for mode in self.modes
+        ]).astype(np.int64)
+        self._plans: dict[tuple, Plan] = {}
+        self._edge_cache: dict[tuple, tuple[np.ndarray, np.ndarray]] = {}
+
+    @classmethod
+    def from_waypoints(cls, waypoints: list[dict], speed: int = 30) -> "RoutePlanner":
+        return cls(
+            [wp['symbol'] for wp in waypoints],
+            [wp['x'] for wp in waypoints],
+            [wp['y'] for wp in waypoints],
+            [any(trait['symbol'] == "MARKETPLACE" for trait in wp['traits']) for wp in waypoints],
+            speed,
+        )
+
+    @classmethod
+    def for_system(cls, system: System, speed: int = 30) -> "RoutePlanner":
+        key = (system.id, speed)
+        try:
+            return cls.CACHED_PLANNERS[key]
+        except KeyError:
+            waypoints = system.waypoints
+            planner = cls(
+                [wp.id for wp in waypoints],
+                [wp.model.x for wp in waypoints],
+                [wp.model.y for wp in waypoints],
+                [WaypointTrait.MARKETPLACE in wp.traits for wp in waypoints],
+                speed,
+            )
+            cls.CACHED_PLANNERS[key] = planner
+            return planner
+
+    def _edges(self, budget: np.ndarray, modes: tuple[FlightMode, ...], rows=slice(None)) -> tuple[np.ndarray, np.ndarray]:
+        allowed = np.array([mode in modes for mode in self.modes])
+        feasible = (self.fuel[:, rows] <= budget[None, :, None]) & allowed[:, None, None]
+        seconds = np.where(feasible, self.seconds[:, rows], np.iinfo(np.int64).max)
+        best = seconds.argmin(axis=0)
+        return np.take_along_axis(seconds, best[None], axis=0)[0], best
+
+    def _refuelled_edges(self, capacity: int, modes: tuple[FlightMode, ...]) -> tuple[np.ndarray, np.ndarray]:
+        key = (capacity, modes)
+        try:
+            return self._edge_cache[key]
+        except KeyError:
+            unlimited = np.iinfo(np.int64).max // 4
+            budget = np.full(len(self.symbols), unlimited) if capacity == 0 else np.where(self.markets, capacity, -1)
+            edges = self._edge_cache[key] = self._edges(budget, modes)
+            return edges
+
+    def travel_times(self, capacity: int, modes: tuple[FlightMode, ...] = (FlightMode.CRUISE, FlightMode.DRIFT), origin: str | None = None, fuel: int | None = None) -> np.ndarray:
+        """Seconds of the fastest direct flight between every pair of waypoints, or from origin to each.
+
+        Flights a full tank cannot make are int64 max.
+        """
+        weights, _ = self._refuelled_edges(capacity, modes)
+        if origin is None:
+            return weights
+        src = self.index[origin]
+        if capacity > 0 and fuel is not None and not self.markets[src]:
+            return self._edges(np.array([fuel]), modes, slice(src, src + 1))[0][0]
+        return weights[src]
+
+    def plan(self, origin: str, destination: str, fuel: int, capacity: int, modes: tuple[FlightMode, ...] = (FlightMode.CRUISE, FlightMode.DRIFT)) -> Plan:
+        key = (origin, destination, fuel, capacity, modes)
+        try:
+            return self._plans[key]
+        except KeyError:
+            plan = self._plans[key] = self._plan(origin, destination, fuel, capacity, modes)
+            return plan
+
+    def _plan(self, origin: str, destination: str, fuel: int, capacity: int, modes: tuple[FlightMode, ...]) -> Plan:
+        src, dst = self.index[origin], self.index[destination]
+        if src == dst:
+            return Plan(())
+        weights, choice = self._refuelled_edges(capacity, modes)
+        origin_weights, origin_choice = weights[src], choice[src]
+        if capacity > 0 and not self.markets[src]:
+            origin_weights, origin_choice = (edges[0] for edges in self._edges(np.array([fuel]), modes, slice(src, src + 1)))
+        infinity = np.iinfo(np.int64).max
+        dist = np.full(len(self.symbols), infinity)
+        previous = np.full(len(self.symbols), -1)
+        dist[src] = 0
+        done = np.zeros(len(self.symbols), dtype=bool)
+        while True:
+            candidates = np.where(done, infinity, dist)
+            u = int(candidates.argmin())
+            if candidates[u] == infinity or u == dst:
+                break
+            done[u] = True
+            row = origin_weights if u == src else weights[u]
+            reachable = row != infinity
+            through = np.where(reachable, dist[u] + np.where(reachable, row, 0), infinity)
+            better = (through < dist) & ~done
+            dist[better] = through[better]
+            previous[better] = u
+        if dist[dst] == infinity:
+            raise NoRouteError(f"No route from {origin} to {destination} with {fuel}/{capacity} fuel")
+        path = [dst]
+        while path[-1] != src:
+            path.append(int(previous[path[-1]]))
+        path.reverse()
+        hops = []
+        for a, b in zip(path, path[1:]):
+            m = int(origin_choice[b] if a == src else choice[a, b])
+            hops.append(Hop(
+                self.symbols[a],
+                self.symbols[b],
+                self.modes[m],
+                int(self.distances[a, b]),
+                int(self.fuel[m, a, b]) if capacity else 0,
+                int(self.seconds[m, a, b]),
+                bool(self.markets[b]) and b != dst,
+            ))
+        return Plan(tuple(hops), capacity > 0 and bool(self.markets[src]) and hops[0].fuel > fuel)
+
+
+def plan_route(ship: Ship, destination: str, modes: tuple[FlightMode, ...] = (FlightMode.CRUISE, FlightMode.DRIFT)) -> Plan:
+    data = ship.get_data()
+    planner = RoutePlanner.for_system(ship.nav.system, data['engine']['speed'])
+    return planner.plan(data['nav']['waypointSymbol'], destination, data['fuel']['current'], data['fuel']['capacity'], modes)
+
+
+def follow(ship: Ship, plan: Plan):
+    if plan.refuel_first:
+        if ship.nav.status != ShipStatus.DOCKED:
+            ship.dock()
+        ship.refuel()
+    for hop in plan.hops:
+        if ship.nav.status == ShipStatus.DOCKED:
+            ship.orbit()
+        if ship.nav.mode != hop.mode:
+            ship.set_flight_mode(hop.mode)
+        ship.navigate(Waypoint(ship.pm, hop.destination))
+        ship.wait_for_arrival()
+        if hop.refuel:
+            ship.dock()
+            ship.refuel()
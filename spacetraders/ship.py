@@ -1,14 +1,26 @@
-from typing import Iterator, Self
+from typing import Iterable, Iterator, Self
 from datetime import datetime, timezone, timedelta
+from contextlib import contextmanager
 import time
 from .enums import ShipStatus, FlightMode, WaypointType, WaypointTrait, Goods
-from .utils import GameObject, URL_BASE, handle_error, CooldownError
+from .liquidation import TRADE_VOLUME_ERROR, VISIT_COST, Sale, Stop, plan_liquidation
+from .market import Market
+from .marketbook import Observation
+from .models import NavInfo, ShipInfo, Survey
+from .survey import SurveyCache, error_code, survey_rejected
+from .utils import GameObject, ClientError, CooldownError, RateLimitException, response_data
 from .system import System
 from .waypoint import Waypoint
 
+# Ship state only changes through our own actions and the rules in predict(), so the server is re-checked rarely
+CONFIDENCE = 300.0
+
 
 class Nav(GameObject):
-    CACHED_SYSTEMS: dict[str, System] = {}
+    TTL = CONFIDENCE
+    # keyed by pool manager too: a system's waypoints and markets request with the token of whoever holds them
+    CACHED_SYSTEMS: dict[tuple[object, str], System] = {}
+    MODEL = NavInfo
 
     @property
     def url(self) -> str:
@@ -16,54 +28,89 @@ class Nav(GameObject):
 
     @property
     def system(self) -> System:
-        symbol = self.get_data()['systemSymbol']
+        key = (self.pm, self.model.system)
         try:
-            return self.CACHED_SYSTEMS[symbol]
+            return self.CACHED_SYSTEMS[key]
         except KeyError:
-            system = System(self.pm, symbol)
-            self.CACHED_SYSTEMS[symbol] = system
+            system = System(self.pm, key[1])
+            self.CACHED_SYSTEMS[key] = system
             return system
 
     @property
     def waypoint(self) -> Waypoint:
-        return Waypoint(self.pm, self.get_data()['waypointSymbol'])
+        return Waypoint(self.pm, self.model.waypoint)
 
     @property
     def status(self) -> ShipStatus:
-        return ShipStatus(self.get_data()['status'].lower())
+        return self.model.status
 
     @property
     def mode(self) -> FlightMode:
-        return FlightMode(self.get_data()['flightMode'].lower())
+        return self.model.mode
+
+    @staticmethod
+    def advance(data: dict) -> dict:
+        """A ship in transit is in orbit at its destination once the arrival time has passed."""
+        if data['status'] != 'IN_TRANSIT' or datetime.fromisoformat(data['route']['arrival']) > datetime.now(timezone.utc):
+            return data
+        return {**data, 'status': 'IN_ORBIT'}
 
-    def find_traits(self, traits: tuple[WaypointTrait]) -> Iterator[Waypoint]:
-        for wp in self.system.waypoints:
-            if all(trait in wp.traits for trait in traits):
-                yield wp
+    def predict(self, data: dict) -> dict:
+        return self.advance(data)
+
+    def find_traits(self, traits: tuple[WaypointTrait], exclude: tuple[WaypointTrait, ...] = ()) -> Iterator[Waypoint]:
+        yield from self.system.query(traits, exclude)
 
     def find_type(self, wp_type: WaypointType) -> Iterator[Waypoint]:
-        for wp in self.system.waypoints:
-            if wp.type == wp_type:
-                yield wp
+        yield from self.system.index.of_type(wp_type)
 
     @property
-    def eta(self) -> int:
-        data = self.get_data()
-        if data['status'] == "IN_TRANSIT":
-            return datetime.fromisoformat(data['route']['arrival']) - datetime.now(timezone.utc)
+    def arrival(self) -> datetime | None:
+        return self.model.arrival
+
+    @property
+    def eta(self) -> timedelta:
+        arrival = self.arrival
+        if arrival is not None:
+            return max(arrival - datetime.now(timezone.utc), timedelta())
         else:
             return timedelta()
 
 
 class Ship(GameObject):
-    def __init__(self, pm, id: str):
-        super().__init__(pm, id)
-        self.nav = Nav(pm, id)
+    TTL = CONFIDENCE
+    MODEL = ShipInfo
+    SURVEYS: SurveyCache = SurveyCache(Market.BOOK)
+
+    def __init__(self, pm, id: str, data: dict | None = None, agent: GameObject | None = None):
+        super().__init__(pm, id, data)
+        self.nav = Nav(pm, id, data['nav'] if data is not None else None)
+        self.agent = agent
+        self._cooldown = data.get('cooldown') if data is not None else None
 
     @property
     def url(self) -> str:
         return f"/my/ships/{self.id}"
 
+    def refresh(self) -> dict:
+        data = super().refresh()
+        self.nav.seed(data['nav'])
+        self._cooldown = data.get('cooldown', self._cooldown)
+        return data
+
+    def predict(self, data: dict) -> dict:
+        nav = Nav.advance(data['nav'])
+        return data if nav is data['nav'] else {**data, 'nav': nav}
+
+    def invalidate(self):
+        super().invalidate()
+        self.nav.invalidate()
+
+    @contextmanager
+    def snapshot(self):
+        with super().snapshot() as data, self.nav.snapshot():
+            yield data
+
     def __repr__(self):
         data = self.get_data()
         return (
@@ -73,95 +120,252 @@ class Ship(GameObject):
             f"status={data['nav']['status']})"
         )
 
-    def navigate(self, wp: Waypoint) -> float:
-        handle_error(self.pm.request(
-            "POST",
-            URL_BASE + self.url + "/navigate",
-            json={"waypointSymbol": wp.id}
-        ))
+    def apply(self, data: dict):
+        if 'nav' in data:
+            self.nav.seed(data['nav'])
+        self.update({key: data[key] for key in ('nav', 'fuel', 'cargo') if key in data})
+        if 'cooldown' in data:
+            self._cooldown = data['cooldown']
+        if 'agent' in data and self.agent is not None:
+            self.agent.seed(data['agent'])
+
+    def _action(self, action: str, json: dict | None = None, expected: int = 200) -> dict:
+        try:
+            return super()._action(action, json, expected)
+        except ClientError as e:
+            self._rejected(e)
+            raise
+
+    def _rejected(self, error: ClientError):
+        if isinstance(error, CooldownError):
+            if isinstance(error.args[0], dict) and 'cooldown' in error.args[0]:
+                self._cooldown = error.args[0]['cooldown']
+        elif not isinstance(error, RateLimitException) and not survey_rejected(error) and error_code(error) != TRADE_VOLUME_ERROR:
+            # the server disagreed with what we predicted, so stop trusting it
+            self.invalidate()
+
+    def receive(self, item: Goods, units: int):
+        """Adds units transferred from another ship to the cached cargo."""
+        with self._lock:
+            if self._data is None:
+                return
+            cargo = self._data['cargo']
+            symbol = str(item).upper()
+            inventory = [{**entry, 'units': entry['units'] + units} if entry['symbol'] == symbol else entry for entry in cargo['inventory']]
+            if not any(entry['symbol'] == symbol for entry in inventory):
+                inventory.append({'symbol': symbol, 'name': symbol.replace('_', ' ').title(), 'description': '', 'units': units})
+            self._data = {**self._data, 'cargo': {**cargo, 'units': cargo['units'] + units, 'inventory': inventory}}
+
+    def navigate(self, wp: Waypoint) -> timedelta:
+        self._action("navigate", {"waypointSymbol": wp.id})
         return self.nav.eta
 
+    def set_flight_mode(self, mode: FlightMode):
+        data = response_data(self.pm.request(
+            "PATCH",
+            self.pm.base_url + self.nav.url,
+            json={"flightMode": str(mode).upper()}
+        ))
+        self.apply({'nav': data})
+
     def dock(self):
-        handle_error(self.pm.request("POST", URL_BASE + self.url + "/dock"))
+        self._action("dock")
 
     def orbit(self):
-        handle_error(self.pm.request("POST", URL_BASE + self.url + "/orbit"))
+        self._action("orbit")
 
-    def extract(self) -> tuple[int, Goods, int]:
-        data = handle_error(self.pm.request("POST", URL_BASE + self.url + "/extract"), 201).json()['data']
+    @staticmethod
+    def _extraction(data: dict) -> tuple[int, Goods, int]:
         return data['cooldown']['remainingSeconds'], Goods(data['extraction']['yield']['symbol'].lower()), data['extraction']['yield']['units']
 
-    def extract_until_full(self):
-        while not self.full:
+    def _extracted(self, data: dict, survey: Survey | None) -> tuple[int, Goods, int]:
+        extraction = self._extraction(data)
+        self.SURVEYS.record(self.nav.model.waypoint, survey, extraction[1], extraction[2])
+        return extraction
+
+    def survey(self) -> list[Survey]:
+        """Surveys the asteroid field the ship is at; the surveys are kept in SURVEYS for any ship mining there."""
+        surveys = [Survey.from_json(d) for d in self._action("survey", expected=201)['surveys']]
+        self.SURVEYS.surveyed()
+        self.SURVEYS.add(surveys)
+        return surveys
+
+    def extract(self, survey: Survey | None = None) -> tuple[int, Goods, int]:
+        if survey is None:
+            return self._extracted(self._action("extract", expected=201), None)
+        try:
+            return self._extracted(self._action("extract/survey", survey.data, 201), survey)
+        except ClientError as e:
+            if survey_rejected(e):
+                self.SURVEYS.rejected(survey, error_code(e))
+            raise
+
+    def _survey_choice(self, surveyor: "Ship | None") -> tuple[Survey | None, "Ship | None"]:
+        """The best cached survey for the waypoint, or None and the surveyor that should survey it again first."""
+        waypoint = self.nav.model.waypoint
+        if surveyor is not None and surveyor.nav.model.waypoint != waypoint:
+            surveyor = None
+        survey = self.SURVEYS.best(waypoint, surveyor is not None)
+        if survey is None and surveyor is not None and surveyor.cooldown <= timedelta():
+            return None, surveyor
+        return survey, None
+
+    def _next_survey(self, surveyor: "Ship | None") -> Survey | None:
+        survey, surveyor = self._survey_choice(surveyor)
+        if surveyor is not None:
             try:
-                time.sleep(self.extract())
+                surveyor.survey()
             except CooldownError:
-                time.sleep(1)
+                return None
+            survey = self.SURVEYS.best(self.nav.model.waypoint)
+        return survey
+
+    def _extract_failed(self, e: ClientError, survey: Survey | None) -> float:
+        """Seconds to wait before extracting again after e; raises e unless it is a cooldown or a rejected survey."""
+        if isinstance(e, CooldownError):
+            return max(self.cooldown.total_seconds(), 1)
+        if survey is None or not survey_rejected(e):
+            raise e
+        return 0
+
+    def extract_until_full(self, surveys: bool = True, surveyor: "Ship | None" = None):
+        """Extracts until the hold is full, with the most valuable cached survey for the waypoint while there is one.
+
+        A surveyor at the same waypoint surveys again whenever no cached survey is worth using and it is off cooldown.
+        """
+        while not self.full:
+            survey = self._next_survey(surveyor) if surveys else None
+            try:
+                delay = self.extract(survey)[0]
+            except ClientError as e:
+                delay = self._extract_failed(e, survey)
+            time.sleep(delay)
 
     def refuel(self):
-        handle_error(self.pm.request("POST", URL_BASE + self.url + "/refuel"))
+        self._action("refuel")
 
     def warp(self, destination: str):
-        handle_error(self.pm.request(
-            "POST",
-            URL_BASE + self.url + "/warp",
-            json={
-                "waypointSymbol": destination
-            }
-        ))
+        self._action("warp", {"waypointSymbol": destination})
+
+    @property
+    def cooldown_expiration(self) -> datetime | None:
+        if self._cooldown is None or 'expiration' not in self._cooldown:
+            return None
+        return datetime.fromisoformat(self._cooldown['expiration'])
+
+    @property
+    def cooldown(self) -> timedelta:
+        expiration = self.cooldown_expiration
+        if expiration is None:
+            return timedelta()
+        return max(expiration - datetime.now(timezone.utc), timedelta())
+
+    @property
+    def ready_at(self) -> datetime:
+        now = datetime.now(timezone.utc)
+        return max(t for t in (now, self.nav.arrival, self.cooldown_expiration) if t is not None)
 
     @property
     def inventory(self) -> dict[Goods, int]:
-        return {Goods(item['symbol'].lower()): item['units'] for item in self.get_data()['cargo']['inventory']}
+        return self.model.cargo.inventory
 
     @property
     def cargo_status(self) -> tuple[int, int]:
-        data = self.get_data()['cargo']
-        return (data['units'], data['capacity'])
+        cargo = self.model.cargo
+        return (cargo.units, cargo.capacity)
 
     @property
     def full(self) -> bool:
-        return len(set(self.cargo_status)) == 1
-
-    def sell(self, item: Goods, units: int):
-        handle_error(self.pm.request(
-            "POST",
-            URL_BASE + self.url + "/sell",
-            json={
-                "symbol": str(item).upper(),
-                "units": units
-            }
-        ), 201)
-
-    def sell_all(self, do_not_sell: tuple[Goods] | None = None):
-        for (good, quantity) in self.inventory.items():
-            if do_not_sell is None or good not in do_not_sell:
-                self.sell(good, quantity)
-
-    def buy(self, item: Goods, units: int):
-        handle_error(self.pm.request(
-            "POST",
-            URL_BASE + self.url + "/buy",
-            json={
-                "symbol": str(Goods).upper(),
-                "units": units
-            }
-        ))
+        return self.model.cargo.full
+
+    def sell(self, item: Goods, units: int) -> dict:
+        return self._action("sell", {
+            "symbol": str(item).upper(),
+            "units": units
+        }, 201)['transaction']
+
+    def _sell_chunks(self, item: Goods, units: int) -> int:
+        """Sells units in as few requests as the market's trade volume allows, learning it from a rejection."""
+        credits, volume = 0, units
+        while units > 0:
+            chunk = min(units, volume)
+            try:
+                credits += self.sell(item, chunk)['totalPrice']
+            except ClientError as e:
+                volume = self._trade_volume(e, chunk)
+                continue
+            units -= chunk
+        return credits
+
+    @staticmethod
+    def _trade_volume(e: ClientError, chunk: int) -> int:
+        """The trade volume a sale of chunk units was rejected for exceeding; raises e for any other rejection."""
+        volume = e.args[0].get('data', {}).get('tradeVolume') if error_code(e) == TRADE_VOLUME_ERROR else None
+        if not volume or volume >= chunk:
+            raise e
+        return volume
+
+    def _quotes(self, waypoint: str, cargo: Iterable[Goods]) -> dict[Goods, Observation]:
+        book = Market.BOOK
+        return {good: quote for good in cargo if (quote := book.quote(waypoint, good)) is not None}
+
+    def _for_sale(self, do_not_sell: tuple[Goods] | None) -> dict[Goods, int]:
+        return {good: units for good, units in self.inventory.items() if do_not_sell is None or good not in do_not_sell}
+
+    def _liquidation(self, cargo: dict[Goods, int], markets: Iterable[Waypoint], visit_cost: float) -> list[Stop]:
+        """The stops sell_all makes, with sales, from the quotes in Market.BOOK for here and markets."""
+        here = self.nav.model.waypoint
+        quotes = {here: self._quotes(here, cargo)}
+        if not quotes[here] and not markets:
+            # nothing known about this market: sell everything and let the server correct the trade volumes
+            return [Stop(here, tuple(Sale(here, good, units, 0.0) for good, units in cargo.items()))]
+        for wp in markets:
+            if wp.id != here and (found := self._quotes(wp.id, cargo)):
+                quotes[wp.id] = found
+        return [stop for stop in plan_liquidation(cargo, quotes, here, visit_cost) if stop.sales]
+
+    def sell_all(self, do_not_sell: tuple[Goods] | None = None, markets: Iterable[Waypoint] = (), visit_cost: float = VISIT_COST) -> int:
+        """Sells the cargo here in as few requests as trade volumes allow, best prices first, and returns the credits.
+
+        With markets, whatever sells for enough more at one of them to cover visit_cost is taken there afterwards,
+        using the quotes in Market.BOOK; the ship ends at the last market it sold at.
+        """
+        cargo = self._for_sale(do_not_sell)
+        if not cargo:
+            return 0
+        here = self.nav.model.waypoint
+        if not self._quotes(here, cargo):
+            Market(self.pm, here).refresh()
+        credits = 0
+        for stop in self._liquidation(cargo, markets, visit_cost):
+            if stop.waypoint != self.nav.model.waypoint:
+                if self.nav.status == ShipStatus.DOCKED:
+                    self.orbit()
+                self.navigate(Waypoint(self.pm, stop.waypoint))
+                self.wait_for_arrival()
+            if self.nav.status != ShipStatus.DOCKED:
+                self.dock()
+            for sale in stop.sales:
+                credits += self._sell_chunks(sale.good, sale.units)
+        return credits
+
+    def buy(self, item: Goods, units: int) -> dict:
+        return self._action("purchase", {
+            "symbol": str(item).upper(),
+            "units": units
+        }, 201)['transaction']
 
     def transfer(self, item: Goods, units: int, ship: Self):
-        handle_error(self.pm.request(
-            "POST",
-            URL_BASE + self.url + "/transfer",
-            json={
-                "tradeSymbol": str(Goods).upper(),
-                "units": units,
-                "shipSymbol": ship.id
-            }
-        ))
+        self._action("transfer", {
+            "tradeSymbol": str(item).upper(),
+            "units": units,
+            "shipSymbol": ship.id
+        })
+        ship.receive(item, units)
 
     def wait_for_arrival(self):
-        time.sleep(self.nav.eta.seconds)
+        time.sleep(self.nav.eta.total_seconds())
 
     @property
     def fuel(self) -> int:
-        return self.get_data()['fuel']['current']
+        return self.model.fuel.current
@@ -1,5 +1,5 @@
 from .enums import ShipType
-from .utils import StaticGameObject, wp_to_system, URL_BASE, handle_error
+from .utils import StaticGameObject, wp_to_system, handle_error
 
 
 class InventoryError(ValueError):
@@ -11,10 +11,21 @@ class Shipyard(StaticGameObject):
     def url(self) -> str:
         return f"/systems/{wp_to_system(self.id)}/waypoints/{self.id}/shipyard"
 
+    def _store(self, data: dict):
+        # ships and transactions are live and only shown to a ship present; the listing of ship types is static
+        super()._store({key: value for key, value in data.items() if key not in ('ships', 'transactions')})
+
     @property
     def ships(self) -> dict[ShipType, int]:
+        data = self.get_data()
+        if 'ships' not in data:
+            data = self.refresh()
+        return self._prices(data)
+
+    @staticmethod
+    def _prices(data: dict) -> dict[ShipType, int]:
         try:
-            ships = self.get_data()['ships']
+            ships = data['ships']
             return {ShipType(ship['type'].lower()): ship['purchasePrice'] for ship in ships}
         except KeyError as e:
             raise InventoryError("No ships available for purchase. Are you docked at the shipyard?") from e
@@ -22,7 +33,7 @@ class Shipyard(StaticGameObject):
     def buy_ship(self, ship_type: ShipType):
         handle_error(self.pm.request(
             "POST",
-            URL_BASE + "/my/ships",
+            self.pm.base_url + "/my/ships",
             json={
                 "shipType": str(ship_type).upper(),
                 "waypointSymbol": self.id
@@ -0,0 +1,69 @@
+from pathlib import Path
+from threading import Lock
+from xdg_base_dirs import xdg_data_home
+import json
+import sqlite3
+from .codec import loads
+
+
+class StaticStore:
+    """SQLite backed cache of static game data, keyed by API path."""
+
+    def __init__(self, path: Path | str | None = None):
+        if path is None:
+            directory = xdg_data_home() / "spacetraders-py"
+            directory.mkdir(parents=True, exist_ok=True)
+            path = directory / "static.sqlite3"
+        self.path = path
+        self._lock = Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS objects (path TEXT PRIMARY KEY, data TEXT NOT NULL)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+
+    def get(self, path: str) -> dict | list | None:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM objects WHERE path = ?", (path,)).fetchone()
+        return loads(row[0]) if row is not None else None
+
+    def put(self, path: str, data: dict | list):
+        self.put_many({path: data})
+
+    def put_many(self, items: dict[str, dict | list]):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO objects (path, data) VALUES (?, ?)",
+                ((path, json.dumps(data)) for path, data in items.items())
+            )
+
+    def __contains__(self, path: str) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM objects WHERE path = ?", (path,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM objects").fetchone()[0]
+
+    @property
+    def reset_date(self) -> str | None:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'reset_date'").fetchone()
+        return row[0] if row is not None else None
+
+    def validate(self, reset_date: str) -> bool:
+        """Drops every entry if the server has been reset since they were stored."""
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'reset_date'").fetchone()
+            if row is not None and row[0] == reset_date:
+                return True
+            self._conn.execute("DELETE FROM objects")
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('reset_date', ?)", (reset_date,))
+            return False
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM objects")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
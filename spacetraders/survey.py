@@ -0,0 +1,158 @@
+from datetime import datetime, timezone
+from threading import Lock
+from typing import Callable, Iterable
+from .enums import Goods
+from .marketbook import MarketBook
+from .models import Survey
+from .utils import ClientError, wp_to_system
+
+# the server will not extract with the survey any more: invalid signature, expired, exhausted
+SURVEY_ERRORS = (4220, 4221, 4224)
+EXHAUSTED = 4224
+SIZES = {"SMALL": 0, "MODERATE": 1, "LARGE": 2}
+# weight of each new exhaustion in the running estimate of how many extractions a survey size supports
+CAPACITY_WEIGHT = 0.25
+
+
+def error_code(error: ClientError) -> int | None:
+    return error.args[0].get('code') if isinstance(error.args[0], dict) else None
+
+
+def survey_rejected(error: ClientError) -> bool:
+    return error_code(error) in SURVEY_ERRORS
+
+
+class SurveyStats:
+    def __init__(self):
+        self.surveys = 0
+        self.surveyed = 0
+        self.rejected = 0
+        self.bare = 0
+        self.bare_value = 0.0
+        self.extractions = 0
+        self.value = 0.0
+
+    @property
+    def requests(self) -> int:
+        return self.surveys + self.rejected + self.bare + self.extractions
+
+    @property
+    def value_per_request(self) -> float:
+        """Market value of everything extracted per survey, extract and rejected request."""
+        requests = self.requests
+        return (self.value + self.bare_value) / requests if requests else 0.0
+
+    @property
+    def value_per_extraction(self) -> float:
+        return self.value / self.extractions if self.extractions else 0.0
+
+    @property
+    def bare_value_per_extraction(self) -> float:
+        return self.bare_value / self.bare if self.bare else 0.0
+
+    def __repr__(self):
+        return (f"SurveyStats(surveys={self.surveys}, extractions={self.extractions}, bare={self.bare}, "
+                f"rejected={self.rejected}, value_per_request={self.value_per_request:.1f})")
+
+
+class SurveyCache:
+    """Surveys by waypoint, dropped once they expire, are used up or the server rejects them.
+
+    How many extractions a survey of each size supports is estimated from the ones the server reports exhausted, a
+    running average that moves by CAPACITY_WEIGHT per exhaustion, so one early exhaustion does not hold back every
+    later survey; surveys are retired once they reach the estimate, before they cost a rejected request.
+
+    A survey is worth the expected sell value of one extraction: the mean price of its deposits, priced by
+    price(good, system), which defaults to the best sell price the market book has seen in the survey's system.
+    """
+
+    def __init__(self, book: MarketBook, price: Callable[[Goods, str], float] | None = None):
+        self.book = book
+        self.price = price if price is not None else self.book_price
+        self.surveys: dict[str, dict[str, Survey]] = {}
+        self.bare: dict[str, tuple[int, float]] = {}
+        self.seen: dict[str, tuple[int, float]] = {}
+        self.uses: dict[str, int] = {}
+        self.capacity: dict[str, float] = {}
+        self.stats = SurveyStats()
+        self._lock = Lock()
+
+    def book_price(self, good: Goods, system: str) -> float:
+        observation = self.book.best_sell(good, system)
+        return observation.sell_price if observation is not None else 0.0
+
+    def add(self, surveys: Iterable[Survey]):
+        valued = [(survey, self.value(survey)) for survey in surveys]
+        with self._lock:
+            for survey, value in valued:
+                self.surveys.setdefault(survey.waypoint, {})[survey.signature] = survey
+                count, total = self.seen.get(survey.waypoint, (0, 0.0))
+                self.seen[survey.waypoint] = (count + 1, total + value)
+                self.stats.surveyed += 1
+
+    def valid(self, waypoint: str) -> list[Survey]:
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            surveys = self.surveys.get(waypoint, {})
+            for signature in [s for s, survey in surveys.items() if survey.expiration <= now or self._used_up(survey)]:
+                del surveys[signature]
+                self.uses.pop(signature, None)
+            return list(surveys.values())
+
+    def _used_up(self, survey: Survey) -> bool:
+        capacity = self.capacity.get(survey.size)
+        return capacity is not None and self.uses.get(survey.signature, 0) >= capacity
+
+    def discard(self, survey: Survey):
+        with self._lock:
+            self.surveys.get(survey.waypoint, {}).pop(survey.signature, None)
+            self.uses.pop(survey.signature, None)
+
+    def value(self, survey: Survey) -> float:
+        if not survey.deposits:
+            return 0.0
+        system = wp_to_system(survey.waypoint)
+        return sum(self.price(good, system) for good in survey.deposits) / len(survey.deposits)
+
+    def floor(self, waypoint: str, resurvey: bool = True) -> float:
+        """What a survey has to be worth to be used at waypoint: the mean unit value of bare extractions, or, when a
+        fresh survey can be made instead, of the surveys made there so far if that is higher."""
+        units, value = self.bare.get(waypoint, (0, 0.0))
+        bare = value / units if units else 0.0
+        if not resurvey:
+            return bare
+        count, total = self.seen.get(waypoint, (0, 0.0))
+        return max(bare, total / count if count else 0.0)
+
+    def best(self, waypoint: str, resurvey: bool = True) -> Survey | None:
+        """The most valuable valid survey for waypoint, if it is worth at least floor(waypoint, resurvey)."""
+        floor = self.floor(waypoint, resurvey)
+        ranked = ((self.value(survey), SIZES.get(survey.size, 0), survey) for survey in self.valid(waypoint))
+        best = max(ranked, key=lambda ranking: ranking[:2], default=None)
+        return best[2] if best is not None and best[0] >= floor else None
+
+    def record(self, waypoint: str, survey: Survey | None, good: Goods, units: int):
+        value = units * self.price(good, wp_to_system(waypoint))
+        with self._lock:
+            if survey is None:
+                self.stats.bare += 1
+                self.stats.bare_value += value
+                bare_units, bare_value = self.bare.get(waypoint, (0, 0.0))
+                self.bare[waypoint] = (bare_units + units, bare_value + value)
+            else:
+                self.stats.extractions += 1
+                self.stats.value += value
+                self.uses[survey.signature] = self.uses.get(survey.signature, 0) + 1
+
+    def rejected(self, survey: Survey, code: int | None = None):
+        with self._lock:
+            uses = self.uses.get(survey.signature, 0)
+            if code == EXHAUSTED and uses:
+                estimate = self.capacity.get(survey.size)
+                self.capacity[survey.size] = uses if estimate is None else estimate + (uses - estimate) * CAPACITY_WEIGHT
+            self.stats.rejected += 1
+        self.discard(survey)
+
+    def surveyed(self):
+        with self._lock:
+            self.stats.surveys += 1
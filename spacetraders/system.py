@@ -1,6 +1,8 @@
 from functools import cached_property
-from .utils import StaticGameObject, URL_BASE, handle_error
-from .waypoint import Waypoint
+from typing import Iterator
+from .utils import StaticGameObject, paginate, stored_list
+from .enums import WaypointTrait, WaypointType
+from .waypoint import Waypoint, WaypointIndex
 
 
 class System(StaticGameObject):
@@ -15,7 +17,22 @@ class System(StaticGameObject):
             f"type={data['type']})"
         )
 
+    def iter_waypoints(self, limit: int = 20, prefetch: int = 0) -> Iterator[Waypoint]:
+        for d in paginate(self.pm, f"/systems/{self.id}/waypoints", limit, prefetch):
+            yield Waypoint(self.pm, d['symbol'], d)
+
+    @cached_property
+    def waypoints(self) -> list[Waypoint]:
+        data = stored_list(self.pm, f"/systems/{self.id}/waypoints", lambda d: f"/systems/{self.id}/waypoints/{d['symbol']}")
+        return [Waypoint(self.pm, d['symbol'], d) for d in data]
+
     @cached_property
-    def waypoints(self):
-        r = handle_error(self.pm.request("GET", URL_BASE + f"/systems/{self.id}/waypoints"))
-        return [Waypoint(self.pm, d['symbol']) for d in r.json()['data']]
+    def index(self) -> WaypointIndex:
+        return WaypointIndex(self.waypoints)
+
+    def query(self, traits: tuple[WaypointTrait, ...] = (), exclude: tuple[WaypointTrait, ...] = (),
+              any_of: tuple[WaypointTrait, ...] = (), wp_type: WaypointType | None = None) -> list[Waypoint]:
+        """Waypoints with all of traits, none of exclude, at least one of any_of and of wp_type, e.g.
+        system.query((WaypointTrait.MARKETPLACE, WaypointTrait.SHIPYARD), exclude=(WaypointTrait.UNCHARTED,))
+        """
+        return self.index.query(traits, exclude, any_of, wp_type)
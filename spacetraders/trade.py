@@ -0,0 +1,153 @@
+from dataclasses import dataclass
+from datetime import timedelta
+import time
+import numpy as np
+from .enums import FlightMode, Goods
+from .market import Market
+from .marketbook import MarketBook
+from .route import RoutePlanner
+from .ship import Ship
+
+
+@dataclass(frozen=True, slots=True)
+class TradeRoute:
+    good: Goods
+    origin: str
+    destination: str
+    units: int
+    purchase_price: int
+    sell_price: int
+    seconds: int
+
+    @property
+    def profit(self) -> int:
+        return self.units * (self.sell_price - self.purchase_price)
+
+    @property
+    def profit_per_second(self) -> float:
+        return self.profit / self.seconds if self.seconds else 0.0
+
+    @property
+    def eta(self) -> timedelta:
+        return timedelta(seconds=self.seconds)
+
+
+class TradeOptimizer:
+    """Ranks every buy here, sell there trade in a system by profit per second.
+
+    purchase, sell and volume are (markets x goods) matrices of the latest quotes, NaN where a market does not
+    trade a good. seconds is the (markets x markets) direct flight time between markets. Every profitable
+    (buy market, sell market, good) triple is flattened into candidate vectors once, so ranking for a given
+    hold is a handful of array operations.
+    """
+
+    def __init__(self, markets: list[str], goods: list[Goods], purchase, sell, volume, seconds):
+        self.markets = list(markets)
+        self.goods = list(goods)
+        self.index = {symbol: i for i, symbol in enumerate(self.markets)}
+        self.purchase = np.asarray(purchase, dtype=np.float64)
+        self.sell = np.asarray(sell, dtype=np.float64)
+        self.volume = np.asarray(volume, dtype=np.float64)
+        self.seconds = np.asarray(seconds, dtype=np.float64)
+        origins, destinations, goods_index = [], [], []
+        for g in range(len(self.goods)):
+            sellers = np.flatnonzero(~np.isnan(self.purchase[:, g]))
+            buyers = np.flatnonzero(~np.isnan(self.sell[:, g]))
+            i, j = (a.ravel() for a in np.meshgrid(sellers, buyers, indexing="ij"))
+            keep = (i != j) & (self.sell[j, g] > self.purchase[i, g]) & np.isfinite(self.seconds[i, j])
+            origins.append(i[keep])
+            destinations.append(j[keep])
+            goods_index.append(np.full(int(keep.sum()), g))
+        self.origin = np.concatenate(origins) if origins else np.empty(0, dtype=np.intp)
+        self.destination = np.concatenate(destinations) if destinations else np.empty(0, dtype=np.intp)
+        self.good = np.concatenate(goods_index) if goods_index else np.empty(0, dtype=np.intp)
+        self.cost = self.purchase[self.origin, self.good]
+        self.margin = self.sell[self.destination, self.good] - self.cost
+        self.batch = np.minimum(self.volume[self.origin, self.good], self.volume[self.destination, self.good])
+        self.flight = self.seconds[self.origin, self.destination]
+
+    def __len__(self) -> int:
+        return len(self.margin)
+
+    @classmethod
+    def from_book(cls, book: MarketBook, planner: RoutePlanner, capacity: int = 0,
+                  modes: tuple[FlightMode, ...] = (FlightMode.CRUISE, FlightMode.DRIFT),
+                  within: timedelta | None = None) -> "TradeOptimizer":
+        """Builds the price matrices from book quotes at the planner's markets, ignoring quotes older than within."""
+        since = -np.inf if within is None else time.time() - within.total_seconds()
+        quotes = [
+            observation for observation in book.latest.values()
+            if observation.waypoint in planner.index and observation.time >= since
+        ]
+        markets = sorted({observation.waypoint for observation in quotes})
+        goods = sorted({observation.good for observation in quotes}, key=str)
+        row = {symbol: i for i, symbol in enumerate(markets)}
+        column = {good: i for i, good in enumerate(goods)}
+        purchase, sell, volume = (np.full((len(markets), len(goods)), np.nan) for _ in range(3))
+        for observation in quotes:
+            i, g = row[observation.waypoint], column[observation.good]
+            purchase[i, g] = observation.purchase_price
+            sell[i, g] = observation.sell_price
+            volume[i, g] = observation.trade_volume
+        rows = [planner.index[symbol] for symbol in markets]
+        seconds = planner.travel_times(capacity, modes)[np.ix_(rows, rows)].astype(np.float64)
+        seconds[seconds >= np.iinfo(np.int64).max] = np.inf
+        return cls(markets, goods, purchase, sell, volume, seconds)
+
+    def routes(self, cargo: int, credits: int | None = None, n: int = 10, approach=None,
+               max_transactions: int | None = None, transaction_seconds: float = 0.5) -> list[TradeRoute]:
+        """The n trades with the best profit per second for a hold of cargo free units.
+
+        Each purchase and sale moves at most tradeVolume units, so a trade costs one request per batch; with
+        max_transactions the units are capped at that many batches to stay ahead of the price moving.
+        approach is an optional per market vector of seconds to reach each buying market first.
+        """
+        if cargo <= 0 or not len(self):
+            return []
+        units = np.full(len(self), float(cargo))
+        if max_transactions is not None:
+            units = np.minimum(units, self.batch * max_transactions)
+        if credits is not None:
+            units = np.minimum(units, np.floor(credits / self.cost))
+        seconds = self.flight + np.ceil(units / self.batch) * 2 * transaction_seconds
+        if approach is not None:
+            seconds = seconds + np.asarray(approach, dtype=np.float64)[self.origin]
+        with np.errstate(invalid="ignore"):
+            rates = np.where(units > 0, units * self.margin / seconds, -np.inf)
+        rates[~np.isfinite(rates)] = -np.inf
+        n = min(n, int(np.isfinite(rates).sum()))
+        if n == 0:
+            return []
+        top = np.argpartition(rates, -n)[-n:]
+        top = top[np.argsort(rates[top])[::-1]]
+        return [
+            TradeRoute(
+                self.goods[self.good[k]],
+                self.markets[self.origin[k]],
+                self.markets[self.destination[k]],
+                int(units[k]),
+                int(self.cost[k]),
+                int(self.cost[k] + self.margin[k]),
+                int(np.ceil(seconds[k])),
+            )
+            for k in top.tolist()
+        ]
+
+
+def best_trades(ship: Ship, n: int = 10, within: timedelta | None = None, max_transactions: int | None = None) -> list[TradeRoute]:
+    """Ranks trades in the ship's system for its free cargo space, counting the flight to each buying market."""
+    data = ship.get_data()
+    planner = RoutePlanner.for_system(ship.nav.system, data['engine']['speed'])
+    capacity = data['fuel']['capacity']
+    optimizer = TradeOptimizer.from_book(Market.BOOK, planner, capacity, within=within)
+    if not optimizer.markets:
+        return []
+    here = data['nav']['waypointSymbol']
+    approach = planner.travel_times(capacity, origin=here, fuel=data['fuel']['current'])
+    approach = approach[[planner.index[symbol] for symbol in optimizer.markets]].astype(np.float64)
+    approach[approach >= np.iinfo(np.int64).max] = np.inf
+    if here in optimizer.index:
+        approach[optimizer.index[here]] = 0
+    units, hold = ship.cargo_status
+    credits = ship.agent.credits if ship.agent is not None else None
+    return optimizer.routes(hold - units, credits, n, approach, max_transactions)
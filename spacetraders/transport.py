@@ -0,0 +1,242 @@
+from collections import Counter, deque
+from pathlib import Path
+from threading import Lock, local
+from urllib3 import HTTPResponse, PoolManager
+from urllib3.response import BaseHTTPResponse
+from xdg_base_dirs import xdg_runtime_dir
+import asyncio
+import gzip
+import socket
+import tempfile
+import time
+from .codec import encode, loads
+from .dispatch import Priority
+from .ratelimit import RateBudget, RateLimiter
+
+# response headers kept in recordings, the ones the client reads
+KEPT_HEADERS = ("content-type", "retry-after", "x-ratelimit-type", "x-ratelimit-limit-per-second", "x-ratelimit-limit-burst",
+                "x-ratelimit-remaining", "x-ratelimit-reset")
+UNLIMITED = ((1_000_000_000, 1),)
+
+
+class ReplayError(LookupError):
+    pass
+
+
+class Transport:
+    """Sends a RateLimitedPoolManager's requests; this one over the network through the pool itself.
+
+    asend is the same for an AsyncClient, whose own connections this one uses. priority is the one the request was
+    dispatched with, for transports that queue requests further on.
+    """
+
+    def send(self, pm: PoolManager, method: str, url: str, priority: Priority | None = None, **kw) -> BaseHTTPResponse:
+        return PoolManager.urlopen(pm, method, url, **kw)
+
+    async def asend(self, client, method: str, url: str, body: bytes | None, priority: Priority | None = None):
+        return await client._send(method, url, body or b"")
+
+    def limiter(self) -> RateLimiter | None:
+        """Limiter for clients of this transport, or None for the token's shared one."""
+        return None
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _key(pm: PoolManager, method: str, url: str, body) -> tuple[str, str, str | None]:
+    if isinstance(body, bytes):
+        body = body.decode() or None
+    return method, url.removeprefix(pm.base_url), body
+
+
+class Recorder(Transport):
+    """Sends through another transport and appends every exchange to a gzipped JSON lines file."""
+
+    def __init__(self, path: Path | str, inner: Transport | None = None):
+        self.inner = inner if inner is not None else Transport()
+        self.path = path
+        self.recorded = 0
+        self._file = gzip.open(path, "ab")
+        self._lock = Lock()
+
+    def send(self, pm: PoolManager, method: str, url: str, priority: Priority | None = None, **kw) -> BaseHTTPResponse:
+        started = time.perf_counter()
+        response = self.inner.send(pm, method, url, priority, **kw)
+        self._record(_key(pm, method, url, kw.get("body")), response, time.perf_counter() - started)
+        return response
+
+    async def asend(self, client, method: str, url: str, body: bytes | None, priority: Priority | None = None):
+        started = time.perf_counter()
+        response = await self.inner.asend(client, method, url, body, priority)
+        self._record(_key(client, method, url, body), response, time.perf_counter() - started)
+        return response
+
+    def _record(self, key: tuple[str, str, str | None], response, elapsed: float):
+        method, path, body = key
+        headers = {name: response.headers[name] for name in KEPT_HEADERS if name in response.headers}
+        line = encode({"m": method, "u": path, "b": body, "s": response.status, "h": headers,
+                       "d": response.data.decode(), "t": round(elapsed, 6)}) + b"\n"
+        with self._lock:
+            self._file.write(line)
+            self.recorded += 1
+
+    def limiter(self) -> RateLimiter | None:
+        return self.inner.limiter()
+
+    def flush(self):
+        with self._lock:
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+        self.inner.close()
+
+
+class Replayer(Transport):
+    """Answers requests from a recording instead of the network.
+
+    Exchanges with the same method, path and body are served in recorded order; once they run out the last one
+    is repeated. latency sleeps that many seconds per request, or the recorded time with latency=True.
+    rate_limits simulates the server's limits with RateBudget windows and answers 429 like it, and clients
+    then pace themselves against the same windows; without it clients are not limited at all.
+    """
+
+    def __init__(self, path: Path | str, latency: float | bool = 0.0, rate_limits: tuple[tuple[int, float], ...] | None = None):
+        self.latency = latency
+        self.rate_limits = rate_limits
+        self.budget = RateBudget(rate_limits, margin=0.0) if rate_limits is not None else None
+        self.exchanges: dict[tuple, deque[dict]] = {}
+        self.last: dict[tuple, dict] = {}
+        self.stats: Counter[str] = Counter()
+        self._lock = Lock()
+        with gzip.open(path, "rb") as f:
+            for line in f:
+                exchange = loads(line)
+                self.exchanges.setdefault((exchange["m"], exchange["u"], exchange["b"]), deque()).append(exchange)
+
+    def __len__(self) -> int:
+        return sum(len(queue) for queue in self.exchanges.values())
+
+    def _next(self, key: tuple) -> dict:
+        with self._lock:
+            queue = self.exchanges.get(key)
+            if queue:
+                exchange = self.last[key] = queue.popleft()
+                self.stats["served"] += 1
+                return exchange
+            exchange = self.last.get(key)
+            if exchange is None:
+                self.stats["missing"] += 1
+                raise ReplayError(f"no recorded response for {key[0]} {key[1]}")
+            self.stats["repeated"] += 1
+            return exchange
+
+    def _respond(self, key: tuple[str, str, str | None]) -> tuple[BaseHTTPResponse, float]:
+        if self.budget is not None:
+            with self._lock:
+                delay = self.budget.try_acquire(self.budget.clock())
+            if delay > 0:
+                self.stats["throttled"] += 1
+                body = encode({"error": {"message": "You have reached your API limit.", "code": 429, "data": {"retryAfter": delay}}})
+                return HTTPResponse(body, {"retry-after": f"{delay:.3f}", "content-type": "application/json"}, 429, preload_content=True), 0.0
+        exchange = self._next(key)
+        latency = exchange["t"] if self.latency is True else self.latency
+        return HTTPResponse(exchange["d"].encode(), exchange["h"], exchange["s"], preload_content=True), latency
+
+    def send(self, pm: PoolManager, method: str, url: str, priority: Priority | None = None, **kw) -> BaseHTTPResponse:
+        response, latency = self._respond(_key(pm, method, url, kw.get("body")))
+        if latency:
+            time.sleep(latency)
+        return response
+
+    async def asend(self, client, method: str, url: str, body: bytes | None, priority: Priority | None = None):
+        response, latency = self._respond(_key(client, method, url, body))
+        if latency:
+            await asyncio.sleep(latency)
+        return response
+
+    def limiter(self) -> RateLimiter | None:
+        return RateLimiter(RateBudget(self.rate_limits if self.rate_limits is not None else UNLIMITED))
+
+
+def socket_path(symbol: str) -> Path:
+    """Where the daemon for an agent listens unless told otherwise."""
+    return (xdg_runtime_dir() or Path(tempfile.gettempdir())) / f"spacetraders-{symbol.upper()}.sock"
+
+
+class DaemonTransport(Transport):
+    """Sends requests to a local daemon, which owns the token, its rate limit budget and the response caches.
+
+    Each thread keeps its own connection to the daemon's Unix socket; requests and replies are JSON lines. Requests
+    carry their priority, so the daemon orders every client's requests against its one budget.
+    """
+
+    def __init__(self, path: Path | str):
+        self.path = str(path)
+        self._local = local()
+        self._connections: list[socket.socket] = []
+        self._streams: deque[tuple[asyncio.StreamReader, asyncio.StreamWriter]] = deque()
+        self._lock = Lock()
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.connect(self.path)
+            connection = self._local.connection = (sock, sock.makefile("rb"))
+            with self._lock:
+                self._connections.append(sock)
+        return connection
+
+    @staticmethod
+    def _request(key: tuple[str, str, str | None], priority: Priority | None) -> bytes:
+        method, path, body = key
+        return encode({"m": method, "u": path, "b": body, "p": priority}) + b"\n"
+
+    def _reply(self, line: bytes) -> BaseHTTPResponse:
+        if not line:
+            raise ConnectionError(f"daemon at {self.path} closed the connection")
+        reply = loads(line)
+        return HTTPResponse(reply["d"].encode(), reply["h"], reply["s"], preload_content=True)
+
+    def send(self, pm: PoolManager, method: str, url: str, priority: Priority | None = None, **kw) -> BaseHTTPResponse:
+        sock, reader = self._connection()
+        sock.sendall(self._request(_key(pm, method, url, kw.get("body")), priority))
+        try:
+            return self._reply(reader.readline())
+        except ConnectionError:
+            self._local.connection = None
+            raise
+
+    async def asend(self, client, method: str, url: str, body: bytes | None, priority: Priority | None = None):
+        # one request at a time per connection, so concurrent tasks each take an idle one or open another
+        reader, writer = self._streams.popleft() if self._streams else await asyncio.open_unix_connection(self.path)
+        try:
+            writer.write(self._request(_key(client, method, url, body), priority))
+            await writer.drain()
+            response = self._reply(await reader.readline())
+        except BaseException:
+            writer.close()
+            raise
+        self._streams.append((reader, writer))
+        return response
+
+    def limiter(self) -> RateLimiter | None:
+        # the daemon enforces the budget for every client
+        return RateLimiter(RateBudget(UNLIMITED))
+
+    def close(self):
+        with self._lock:
+            for sock in self._connections:
+                sock.close()
+            self._connections.clear()
+        while self._streams:
+            self._streams.popleft()[1].close()
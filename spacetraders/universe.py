@@ -0,0 +1,199 @@
+from array import array
+from json import JSONDecoder
+from math import hypot, sqrt
+from typing import Callable, IO, Iterable, Iterator
+import codecs
+import heapq
+import sys
+from urllib3 import PoolManager
+from .enums import SystemType
+from .utils import paginate
+
+SYSTEM_TYPES = tuple(SystemType)
+SYSTEM_TYPE_INDEX = {str(t).upper(): i for i, t in enumerate(SYSTEM_TYPES)}
+
+
+def iter_json_array(fp: IO, chunk_size: int = 1 << 16) -> Iterator[dict]:
+    """Yields the elements of a top level JSON array without loading the whole document."""
+    decoder = JSONDecoder()
+    # a chunk can end inside a multi-byte character, so bytes are decoded incrementally
+    text = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    started = False
+    eof = False
+    while True:
+        buffer = buffer.lstrip(" \t\r\n,")
+        if not started and buffer:
+            if buffer[0] != "[":
+                raise ValueError("expected a JSON array")
+            buffer = buffer[1:].lstrip(" \t\r\n")
+            started = True
+            continue
+        if started and buffer.startswith("]"):
+            return
+        if buffer:
+            try:
+                item, end = decoder.raw_decode(buffer)
+            except ValueError:
+                if eof:
+                    raise
+            else:
+                yield item
+                buffer = buffer[end:]
+                continue
+        if eof:
+            return
+        chunk = fp.read(chunk_size)
+        if not chunk:
+            eof = True
+        if isinstance(chunk, bytes):
+            chunk = text.decode(chunk, final=eof)
+        buffer += chunk
+
+
+class Universe:
+    """Compact, array backed table of systems with a uniform grid index over their coordinates."""
+
+    def __init__(self, cell_size: int | None = None):
+        self.symbols: list[str] = []
+        self.types = array("B")
+        self.xs = array("i")
+        self.ys = array("i")
+        self.waypoint_counts = array("H")
+        self.index: dict[str, int] = {}
+        self.cell_size = cell_size
+        self._grid: dict[tuple[int, int], array] | None = None
+        self._cells = (0, 0, 0, 0)
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self.index
+
+    def add(self, system: dict):
+        symbol = sys.intern(system['symbol'])
+        if symbol in self.index:
+            return
+        self.index[symbol] = len(self.symbols)
+        self.symbols.append(symbol)
+        self.types.append(SYSTEM_TYPE_INDEX[system['type']])
+        self.xs.append(system['x'])
+        self.ys.append(system['y'])
+        waypoints = system.get('waypoints', ())
+        self.waypoint_counts.append(waypoints if isinstance(waypoints, int) else len(waypoints))
+        self._grid = None
+
+    def extend(self, systems: Iterable[dict]):
+        for system in systems:
+            self.add(system)
+
+    @classmethod
+    def from_api(cls, pm: PoolManager, prefetch: int = 2) -> "Universe":
+        universe = cls()
+        universe.extend(paginate(pm, "/systems", 20, prefetch))
+        return universe
+
+    @classmethod
+    def from_bulk(cls, pm: PoolManager) -> "Universe":
+        response = pm.request("GET", pm.base_url + "/systems.json", preload_content=False)
+        try:
+            if response.status != 200:
+                raise ValueError(f"bulk systems download failed with status {response.status}")
+            return cls.from_json(response)
+        finally:
+            response.release_conn()
+
+    @classmethod
+    def from_json(cls, fp: IO) -> "Universe":
+        universe = cls()
+        universe.extend(iter_json_array(fp))
+        return universe
+
+    def type(self, symbol: str) -> SystemType:
+        return SYSTEM_TYPES[self.types[self.index[symbol]]]
+
+    def position(self, symbol: str) -> tuple[int, int]:
+        i = self.index[symbol]
+        return self.xs[i], self.ys[i]
+
+    def distance(self, a: str, b: str) -> float:
+        (ax, ay), (bx, by) = self.position(a), self.position(b)
+        return hypot(ax - bx, ay - by)
+
+    def _build(self):
+        if self.cell_size is None:
+            if self.symbols:
+                area = max(max(self.xs) - min(self.xs), 1) * max(max(self.ys) - min(self.ys), 1)
+                self.cell_size = max(int(sqrt(area / len(self.symbols)) * 2), 1)
+            else:
+                self.cell_size = 1
+        grid: dict[tuple[int, int], array] = {}
+        size = self.cell_size
+        for i, (x, y) in enumerate(zip(self.xs, self.ys)):
+            grid.setdefault((x // size, y // size), array("I")).append(i)
+        self._grid = grid
+        self._cells = (min(grid)[0], max(grid)[0], min(c[1] for c in grid), max(c[1] for c in grid)) if grid else (0, 0, 0, 0)
+
+    def _filter(self, system_type: SystemType | None, where: Callable[[int], bool] | None) -> Callable[[int], bool] | None:
+        if system_type is None:
+            return where
+        wanted = SYSTEM_TYPE_INDEX[str(system_type).upper()]
+        types = self.types
+        if where is None:
+            return lambda i: types[i] == wanted
+        return lambda i: types[i] == wanted and where(i)
+
+    def within(self, x: int, y: int, radius: float, system_type: SystemType | None = None, where: Callable[[int], bool] | None = None) -> list[tuple[str, float]]:
+        """Systems within radius of (x, y), nearest first. where receives the row index."""
+        if self._grid is None:
+            self._build()
+        size = self.cell_size
+        accept = self._filter(system_type, where)
+        xs, ys, grid = self.xs, self.ys, self._grid
+        found = []
+        for cx in range(int((x - radius) // size), int((x + radius) // size) + 1):
+            for cy in range(int((y - radius) // size), int((y + radius) // size) + 1):
+                for i in grid.get((cx, cy), ()):
+                    d = hypot(xs[i] - x, ys[i] - y)
+                    if d <= radius and (accept is None or accept(i)):
+                        found.append((d, i))
+        found.sort()
+        return [(self.symbols[i], d) for d, i in found]
+
+    def nearest(self, x: int, y: int, n: int = 1, system_type: SystemType | None = None, where: Callable[[int], bool] | None = None) -> list[tuple[str, float]]:
+        """The n systems closest to (x, y), searching outwards ring by ring through the grid."""
+        if self._grid is None:
+            self._build()
+        if not self.symbols or n <= 0:
+            return []
+        size = self.cell_size
+        accept = self._filter(system_type, where)
+        xs, ys, grid = self.xs, self.ys, self._grid
+        cx, cy = int(x // size), int(y // size)
+        min_cx, max_cx, min_cy, max_cy = self._cells
+        span = max(cx - min_cx, max_cx - cx, cy - min_cy, max_cy - cy)
+        best: list[tuple[float, int]] = []
+        for ring in range(span + 1):
+            if ring == 0:
+                cells = [(cx, cy)]
+            else:
+                cells = [(cx + dx, cy + dy) for dx in range(-ring, ring + 1) for dy in (-ring, ring)]
+                cells += [(cx + dx, cy + dy) for dx in (-ring, ring) for dy in range(-ring + 1, ring)]
+            for cell in cells:
+                for i in grid.get(cell, ()):
+                    if accept is not None and not accept(i):
+                        continue
+                    d = hypot(xs[i] - x, ys[i] - y)
+                    if len(best) < n:
+                        heapq.heappush(best, (-d, i))
+                    elif d < -best[0][0]:
+                        heapq.heapreplace(best, (-d, i))
+            if len(best) == n and -best[0][0] <= ring * size:
+                break
+        return [(self.symbols[i], -d) for d, i in sorted(best, reverse=True)]
+
+    def near(self, symbol: str, n: int = 1, system_type: SystemType | None = None) -> list[tuple[str, float]]:
+        x, y = self.position(symbol)
+        i = self.index[symbol]
+        return self.nearest(x, y, n, system_type, lambda j: j != i)
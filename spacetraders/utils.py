@@ -1,10 +1,18 @@
 from urllib3 import PoolManager
 from urllib3.response import BaseHTTPResponse
-from threading import Thread, Lock
+from threading import Lock, RLock
 from abc import ABC, abstractmethod
-from functools import cache
-from json import JSONDecodeError
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from typing import Callable, Iterator
 import time
+from .codec import decode, decode_error
+from .metrics import CACHE_STATS, CacheStats, Metrics
+from .ratelimit import RateLimiter
+from .dispatch import Dispatcher, Priority
+from .store import StaticStore
+from .transport import Transport
 
 URL_BASE = "https://api.spacetraders.io/v2"
 
@@ -36,95 +44,260 @@ def wp_to_system(waypoint_symbol: str) -> str:
 def handle_error(response: BaseHTTPResponse, expected: int = 200):
     if response.status == expected:
         return response
-    elif response.status == 429:
-        try:
-            raise RateLimitException(response.retries, response.json()['error'])
-        except JSONDecodeError:
-            raise RateLimitException(response.retries, response.data)
+    try:
+        error = decode(response)['error']
+    except (decode_error(), ValueError, KeyError, TypeError):
+        error = response.data
+    code = error.get('code') if isinstance(error, dict) else None
+    if response.status == 429:
+        raise RateLimitException(response.retries, error)
     elif 400 <= response.status <= 499:
-        code = response.json()['error']['code']
         if code == 4000:
-            raise CooldownError(response.json()['error']['data'])
+            raise CooldownError(error['data'])
         elif code == 4203:
-            raise InsufficientFuelError(response.json()['error']['data'])
+            raise InsufficientFuelError(error['data'])
         elif code == 4204:
             return response
         else:
-            raise ClientError(response.json()['error'])
+            raise ClientError(error)
     else:
-        print(response.status)
+        raise APIError(error)
+
+
+def response_data(response: BaseHTTPResponse, expected: int = 200):
+    return decode(handle_error(response, expected))['data']
+
+
+def paginate(pm: PoolManager, path: str, limit: int = 20, prefetch: int = 0) -> Iterator[dict]:
+    if not 1 <= limit <= 20:
+        raise ValueError("limit must be between 1 and 20")
+
+    def page(n: int) -> tuple[list[dict], int]:
+        body = decode(handle_error(pm.request("GET", pm.base_url + path, fields={"page": n, "limit": limit}, priority=Priority.SCAN)))
+        return body['data'], body['meta']['total']
+
+    data, total = page(1)
+    yield from data
+    if not data:
+        return
+    pages = -(-total // limit)
+    if prefetch <= 0:
+        for n in range(2, pages + 1):
+            data, _ = page(n)
+            if not data:
+                return
+            yield from data
+        return
+    with ThreadPoolExecutor(max_workers=prefetch) as executor:
+        pending = deque()
+        next_page = 2
         try:
-            raise APIError(response.json()['error'])
-        except JSONDecodeError:
-            raise APIError(response.data)
-
-
-class Bucket:
-    def __init__(self, max: int, period: int):
-        self.max = max
-        self.current = max
-        self.period = period
-        self.refill_end = None
-        self.lock = Lock()
-
-    def take(self) -> bool:
-        with self.lock:
-            if self.current == self.max:
-                self.refill_end = time.time() + self.period + 0.1
-                self.refill()
-            if self.current > 0:
-                self.current -= 1
-                return True
+            while True:
+                while next_page <= pages and len(pending) < prefetch:
+                    pending.append(executor.submit(page, next_page))
+                    next_page += 1
+                if not pending:
+                    return
+                data, _ = pending.popleft().result()
+                if not data:
+                    return
+                yield from data
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def store_for(pm) -> StaticStore | None:
+    """The static store attached to pm, else the one enabled last in this process."""
+    store = getattr(pm, "store", None)
+    return store if store is not None else StaticGameObject.STORE
+
+
+def stored_list(pm: PoolManager, path: str, item_path: Callable[[dict], str]) -> list[dict]:
+    store = store_for(pm)
+    data = store.get(path) if store is not None else None
+    if data is None:
+        data = list(paginate(pm, path))
+        if store is not None:
+            store.put_many({path: data, **{item_path(d): d for d in data}})
+    return data
+
+
+class RateLimitedPoolManager(PoolManager):
+    """PoolManager that sends every request through its token's rate limiter.
+
+    The server limits each token separately, so clients share a limiter only when they share a token.
+    Requests go out through transport, the network by default, or a Recorder or Replayer.
+    """
+
+    LIMITERS: dict[str | None, RateLimiter] = {}
+    _limiters_lock = Lock()
+    max_throttled_retries = 3
+
+    def __init__(self, *args, base_url: str = URL_BASE, token: str | None = None, limiter: RateLimiter | None = None,
+                 transport: Transport | None = None, **kw):
+        super().__init__(*args, **kw)
+        self.base_url = base_url
+        self.transport = transport if transport is not None else Transport()
+        if limiter is None:
+            limiter = self.transport.limiter()
+        self.limiter = limiter if limiter is not None else self.limiter_for(token)
+        self.dispatcher = Dispatcher(self.limiter)
+        self.metrics: Metrics | None = None
+        self.store: StaticStore | None = None
+
+    @classmethod
+    def limiter_for(cls, token: str | None) -> RateLimiter:
+        with cls._limiters_lock:
+            limiter = cls.LIMITERS.get(token)
+            if limiter is None:
+                limiter = cls.LIMITERS[token] = RateLimiter()
+            return limiter
+
+    def priority(self, priority: Priority):
+        return self.dispatcher.priority(priority)
+
+    def urlopen(self, method, url, redirect=True, priority: Priority | None = None, **kw):
+        if priority is None:
+            priority = self.dispatcher.priority_for(method)
+        if method != "GET" or kw.get("body") is not None:
+            return self._send(method, url, redirect, priority, **kw)
+        return self.dispatcher.coalesce(url, lambda: self._send(method, url, redirect, priority, **kw))
+
+    def _send(self, method, url, redirect, priority, **kw):
+        metrics = self.metrics
+        for attempt in range(self.max_throttled_retries + 1):
+            if metrics is None:
+                self.dispatcher.acquire(priority)
+                response = self.transport.send(self, method, url, redirect=redirect, priority=priority, **kw)
             else:
-                return False
-        return False
+                started = time.perf_counter()
+                self.dispatcher.acquire(priority)
+                acquired = time.perf_counter()
+                response = self.transport.send(self, method, url, redirect=redirect, priority=priority, **kw)
+                # Agent pre-seeds the retry history with blank entries to scale the backoff; only count real ones
+                history = response.retries.history if response.retries is not None else ()
+                retried = sum(1 for entry in history if entry.method is not None)
+                metrics.record(method, url, response.status, started, acquired, time.perf_counter(), attempt, retried)
+            self.limiter.observe(response.status, response.headers)
+            if response.status != 429:
+                break
+        return response
 
-    def refill(self):
-        self.refill_thread = Thread(target=self._refill)
-        self.refill_thread.start()
 
-    def _refill(self):
-        time.sleep(self.period + 0.1)
-        with self.lock:
-            self.current = self.max
+class GameObject(ABC):
+    TTL: float | None = 2.0
+    MODEL = None
+
+    def __init__(self, pm: RateLimitedPoolManager, id: str, data: dict | None = None):
+        self.pm = pm
+        self.id = id
+        self._data = data
+        self._data_time = time.monotonic()
+        self._snapshots = 0
+        self._lock = RLock()
+        self._model = None
 
     @property
-    def time_remaining(self) -> float:
-        return max(self.refill_end - time.time(), 0)
+    @abstractmethod
+    def url(self) -> str:
+        pass
 
+    @classmethod
+    def cache_stats(cls) -> CacheStats:
+        return CACHE_STATS.setdefault(cls.__name__, CacheStats())
 
-def rate_limit(f):
-    buckets = [
-        Bucket(2, 1),
-        Bucket(10, 10)
-    ]
+    def fetch(self) -> dict:
+        return response_data(self.pm.request("GET", self.pm.base_url + self.url))
 
-    def rate_limited_func(*args, **kwargs):
-        while True:
-            for bucket in buckets:
-                if bucket.take():
-                    return f(*args, **kwargs)
-            time.sleep(min(bucket.time_remaining for bucket in buckets))
-    return rate_limited_func
+    def seed(self, data: dict):
+        with self._lock:
+            self._data = data
+            self._data_time = time.monotonic()
 
+    @property
+    def expired(self) -> bool:
+        if self._data is None:
+            return True
+        if self._snapshots or self.TTL is None:
+            return False
+        return time.monotonic() - self._data_time > self.TTL
+
+    def refresh(self) -> dict:
+        data = self.fetch()
+        self.seed(data)
+        self._store(data)
+        return data
+
+    def _stored(self) -> dict | None:
+        return None
+
+    def _store(self, data: dict):
+        pass
 
-class RateLimitedPoolManager(PoolManager):
-    urlopen = rate_limit(PoolManager.urlopen)
+    def _action(self, action: str, json: dict | None = None, expected: int = 200) -> dict:
+        data = response_data(self.pm.request(
+            "POST",
+            self.pm.base_url + self.url + "/" + action,
+            json=json
+        ), expected)
+        self.apply(data)
+        return data
 
+    def apply(self, data: dict):
+        pass
 
-class GameObject(ABC):
-    def __init__(self, pm: RateLimitedPoolManager, id: str):
-        self.pm = pm
-        self.id = id
+    def predict(self, data: dict) -> dict:
+        """Cached data moved on by the game's rules; returns data itself while nothing has changed."""
+        return data
+
+    def _advance(self) -> dict:
+        data = self._data
+        predicted = self.predict(data)
+        if predicted is not data:
+            self._data = predicted
+        return predicted
+
+    def update(self, data: dict):
+        with self._lock:
+            if self._data is not None and data:
+                self._data = {**self._data, **data}
+                self._data_time = time.monotonic()
+
+    def parse(self, data: dict):
+        return self.MODEL.from_json(data)
 
     @property
-    @abstractmethod
-    def url(self) -> str:
-        pass
+    def model(self):
+        """Typed view of the current data, parsed once per response."""
+        data = self.get_data()
+        cached = self._model
+        if cached is None or cached[0] is not data:
+            cached = self._model = (data, self.parse(data))
+        return cached[1]
+
+    def invalidate(self):
+        with self._lock:
+            self._data = None
 
     def get_data(self) -> dict:
-        r = handle_error(self.pm.request("GET", URL_BASE + self.url))
-        return r.json()['data']
+        with self._lock:
+            if self._data is None and (stored := self._stored()) is not None:
+                self.seed(stored)
+            hit = not self.expired
+            self.cache_stats().record(hit)
+            return self._advance() if hit else self.refresh()
+
+    @contextmanager
+    def snapshot(self):
+        with self._lock:
+            data = self.get_data()
+            self._snapshots += 1
+        try:
+            yield data
+        finally:
+            with self._lock:
+                self._snapshots -= 1
 
     def __repr__(self):
         try:
@@ -137,7 +310,13 @@ class GameObject(ABC):
 
 
 class StaticGameObject(GameObject):
-    @cache
-    def get_data(self) -> dict:
-        r = handle_error(self.pm.request("GET", URL_BASE + self.url))
-        return r.json()['data']
+    TTL = None
+    STORE: StaticStore | None = None
+
+    def _stored(self) -> dict | None:
+        store = store_for(self.pm)
+        return store.get(self.url) if store is not None else None
+
+    def _store(self, data: dict):
+        if (store := store_for(self.pm)) is not None:
+            store.put(self.url, data)
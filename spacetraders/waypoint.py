@@ -1,5 +1,6 @@
 from functools import cached_property
 from .enums import WaypointTrait, WaypointType
+from .models import WaypointInfo, trait_mask
 from .utils import StaticGameObject, wp_to_system
 from .shipyard import Shipyard
 from .market import Market
@@ -10,6 +11,8 @@ class TraitError(ValueError):
 
 
 class Waypoint(StaticGameObject):
+    MODEL = WaypointInfo
+
     @property
     def url(self) -> str:
         return f"/systems/{wp_to_system(self.id)}/waypoints/{self.id}"
@@ -21,9 +24,9 @@ class Waypoint(StaticGameObject):
             f"type={data['type']})"
         )
 
-    @cached_property
-    def traits(self):
-        return tuple(WaypointTrait(trait['symbol'].lower()) for trait in self.get_data()['traits'])
+    @property
+    def traits(self) -> tuple[WaypointTrait, ...]:
+        return self.model.traits
 
     @cached_property
     def shipyard(self):
@@ -39,6 +42,62 @@ class Waypoint(StaticGameObject):
         else:
             return TraitError("Trait MARKETPLACE not found at this waypoint")
 
-    @cached_property
-    def type(self):
-        return WaypointType(self.get_data()['type'].lower())
+    @property
+    def type(self) -> WaypointType:
+        return self.model.type
+
+
+class WaypointIndex:
+    """Type and trait indexes over a system's waypoints.
+
+    Each waypoint gets a trait bitmask, and each trait and type a bitset of the waypoints that have it, so
+    queries are a few integer operations regardless of how many traits they combine.
+    """
+
+    def __init__(self, waypoints: list[Waypoint]):
+        self.waypoints = list(waypoints)
+        self.positions = {wp.id: i for i, wp in enumerate(self.waypoints)}
+        self.masks = [wp.model.trait_mask for wp in self.waypoints]
+        self.by_trait: dict[WaypointTrait, int] = {}
+        self.by_type: dict[WaypointType, int] = {}
+        for i, wp in enumerate(self.waypoints):
+            bit = 1 << i
+            for trait in wp.traits:
+                self.by_trait[trait] = self.by_trait.get(trait, 0) | bit
+            self.by_type[wp.type] = self.by_type.get(wp.type, 0) | bit
+        self.all = (1 << len(self.waypoints)) - 1
+
+    def __len__(self) -> int:
+        return len(self.waypoints)
+
+    def select(self, traits=(), exclude=(), any_of=(), wp_type: WaypointType | None = None) -> int:
+        """Bitset of the waypoints with every trait in traits, none in exclude, at least one of any_of and of wp_type."""
+        found = self.all if wp_type is None else self.by_type.get(wp_type, 0)
+        for trait in traits:
+            found &= self.by_trait.get(trait, 0)
+        for trait in exclude:
+            found &= ~self.by_trait.get(trait, 0)
+        if any_of:
+            either = 0
+            for trait in any_of:
+                either |= self.by_trait.get(trait, 0)
+            found &= either
+        return found
+
+    def query(self, traits=(), exclude=(), any_of=(), wp_type: WaypointType | None = None) -> list[Waypoint]:
+        return self.members(self.select(traits, exclude, any_of, wp_type))
+
+    def members(self, bits: int) -> list[Waypoint]:
+        found = []
+        while bits:
+            low = bits & -bits
+            found.append(self.waypoints[low.bit_length() - 1])
+            bits ^= low
+        return found
+
+    def of_type(self, wp_type: WaypointType) -> list[Waypoint]:
+        return self.members(self.by_type.get(wp_type, 0))
+
+    def has(self, symbol: str, traits) -> bool:
+        need = trait_mask(traits)
+        return self.masks[self.positions[symbol]] & need == need